@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.database.session import get_read_db
+from app.core.deps import require_role, Principal
+from app.admin.snapshots import risk_counts, snapshot_job
+from app.insights.rollups import RISK_BUCKETS, STRESS_BUCKETS
+from app.models.models import UserRole, PlatformSnapshot
+from app.schemas.schemas import PlatformDay, PlatformAnalyticsResponse
+
+router = APIRouter(tags=["Admin"])
+
+
+def _average(total: float, count: int) -> Optional[float]:
+    return round(total / count, 1) if count else None
+
+
+# ===== Admin: Platform Analytics =====
+@router.get("/admin/analytics")
+async def admin_analytics(
+    range: str = "30d",
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Platform-wide activity and risk over the range, read from the daily snapshots."""
+    days = max(int(range.replace("d", "")) if range.endswith("d") else 30, 1)
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    result = await db.execute(
+        select(PlatformSnapshot).where(PlatformSnapshot.day >= since).order_by(PlatformSnapshot.day)
+    )
+    snapshots = result.scalars().all()
+
+    checkins = sum(s.checkins for s in snapshots)
+    stress = {
+        "Low": sum(s.stress_low for s in snapshots),
+        "Medium": sum(s.stress_medium for s in snapshots),
+        "High": sum(s.stress_high for s in snapshots),
+        "Critical": sum(s.stress_critical for s in snapshots),
+    }
+    risk = {name: 0 for name in RISK_BUCKETS}
+    series = []
+    for s in snapshots:
+        counts = risk_counts(s)
+        for name, count in counts.items():
+            risk[name] += count
+        series.append(PlatformDay(
+            day=s.day,
+            new_users=s.new_users,
+            active_users=s.active_users,
+            checkins=s.checkins,
+            avg_mood=_average(s.mood_sum, s.checkins),
+            avg_sleep=_average(s.sleep_sum, s.checkins),
+            analyses=s.analyses,
+            risk_distribution=counts,
+        ))
+
+    latest = snapshots[-1] if snapshots else None
+    data = PlatformAnalyticsResponse(
+        range_days=days,
+        computed_at=max((s.computed_at for s in snapshots), default=None),
+        total_users=latest.total_users if latest else 0,
+        total_checkins=latest.total_checkins if latest else 0,
+        new_users=sum(s.new_users for s in snapshots),
+        checkins=checkins,
+        # Snapshots are contiguous from the platform's first day, so this averages over
+        # the days of the range the platform existed
+        avg_daily_active_users=round(sum(s.active_users for s in snapshots) / len(snapshots), 1) if snapshots else 0.0,
+        avg_mood=_average(sum(s.mood_sum for s in snapshots), checkins),
+        avg_sleep=_average(sum(s.sleep_sum for s in snapshots), checkins),
+        stress_distribution=[{"name": name, "value": stress[name]} for name in STRESS_BUCKETS],
+        risk_distribution=[{"name": name, "value": risk[name]} for name in RISK_BUCKETS],
+        days=series,
+    )
+    return {"ok": True, "data": data, "error": None}
+
+
+@router.post("/admin/analytics/refresh")
+async def admin_refresh_analytics(current_user: Principal = Depends(require_role(UserRole.ADMIN))):
+    """Refresh today's snapshot now instead of waiting for the next scheduled run."""
+    written = await snapshot_job.run_once()
+    return {"ok": True, "data": {"days": written}, "error": None}
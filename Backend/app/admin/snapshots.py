@@ -0,0 +1,195 @@
+"""
+Daily platform snapshots behind the admin analytics page.
+
+One `PlatformSnapshot` row per UTC day holds that day's new users, active users
+(users with a daily rollup that day), check-in volume, mood/sleep sums and the stress
+and risk-score distributions, plus running user and check-in totals. The snapshot
+job refreshes incrementally: it recomputes the latest snapshotted day (it was
+probably taken before the day ended) and every day after it, reading only that
+day's rows through day-ranged indexes, and carries the totals forward from the
+previous snapshot. The admin endpoint then reads a few dozen small rows however
+large the check-in and analysis tables grow.
+
+Rows written into past days (bulk imports of old history) are not picked up by the
+incremental pass; `python -m app.cli rebuild-snapshots` recomputes every day.
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy import delete, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.database.session import async_session
+from app.insights.rollups import RISK_BUCKETS, risk_bucket_column, rollup_day
+from app.models.models import AIAnalysisResult, DailyRollup, PlatformSnapshot, User
+
+RISK_COLUMNS = {
+    "Low": "risk_low",
+    "Moderate": "risk_moderate",
+    "High": "risk_high",
+    "Critical": "risk_critical",
+}
+
+
+def day_bounds(day: date):
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+# ===== Per-day queries =====
+def new_users_query(day: date):
+    start, end = day_bounds(day)
+    return select(func.count(User.id)).where(User.created_at >= start, User.created_at < end)
+
+
+def day_rollups_query(day: date):
+    return select(
+        func.count(DailyRollup.id),
+        func.coalesce(func.sum(DailyRollup.checkin_count), 0),
+        func.coalesce(func.sum(DailyRollup.mood_sum), 0),
+        func.coalesce(func.sum(DailyRollup.sleep_sum), 0.0),
+        func.coalesce(func.sum(DailyRollup.stress_low), 0),
+        func.coalesce(func.sum(DailyRollup.stress_medium), 0),
+        func.coalesce(func.sum(DailyRollup.stress_high), 0),
+        func.coalesce(func.sum(DailyRollup.stress_critical), 0),
+    ).where(DailyRollup.day == day)
+
+
+def day_risk_query(day: date):
+    start, end = day_bounds(day)
+    bucket = risk_bucket_column().label("bucket")
+    return (
+        select(bucket, func.count(AIAnalysisResult.id))
+        .where(AIAnalysisResult.created_at >= start, AIAnalysisResult.created_at < end)
+        .group_by(bucket)
+    )
+
+
+async def compute_day(db: AsyncSession, day: date) -> Dict[str, Any]:
+    """Aggregates for `day` alone (no running totals)."""
+    new_users = (await db.execute(new_users_query(day))).scalar() or 0
+    active, checkins, mood_sum, sleep_sum, low, medium, high, critical = (
+        await db.execute(day_rollups_query(day))
+    ).one()
+    values: Dict[str, Any] = {
+        "new_users": new_users,
+        "active_users": active,
+        "checkins": checkins,
+        "mood_sum": mood_sum,
+        "sleep_sum": sleep_sum,
+        "stress_low": low,
+        "stress_medium": medium,
+        "stress_high": high,
+        "stress_critical": critical,
+        "analyses": 0,
+    }
+    values.update({column: 0 for column in RISK_COLUMNS.values()})
+    for bucket, count in (await db.execute(day_risk_query(day))).all():
+        values[RISK_COLUMNS[bucket]] = count
+        values["analyses"] += count
+    return values
+
+
+async def _first_day(db: AsyncSession) -> Optional[date]:
+    first_user = (await db.execute(select(func.min(User.created_at)))).scalar()
+    first_rollup = (await db.execute(select(func.min(DailyRollup.day)))).scalar()
+    if first_user is not None:
+        first_user = rollup_day(first_user)
+    days = [day for day in (first_user, first_rollup) if day is not None]
+    return min(days) if days else None
+
+
+# ===== Refresh =====
+async def refresh_snapshots(db: AsyncSession, today: Optional[date] = None) -> int:
+    """Bring snapshots up to `today` (UTC); returns the number of days written. Caller commits."""
+    today = today or datetime.now(timezone.utc).date()
+    result = await db.execute(select(PlatformSnapshot).order_by(desc(PlatformSnapshot.day)).limit(1))
+    snapshot = result.scalar_one_or_none()
+    if snapshot is None:
+        day = await _first_day(db)
+        if day is None:
+            return 0
+        total_users = total_checkins = 0
+    else:
+        day = snapshot.day
+        total_users = snapshot.total_users - snapshot.new_users
+        total_checkins = snapshot.total_checkins - snapshot.checkins
+
+    written = 0
+    while day <= today:
+        values = await compute_day(db, day)
+        total_users += values["new_users"]
+        total_checkins += values["checkins"]
+        if snapshot is None or snapshot.day != day:
+            snapshot = PlatformSnapshot(day=day)
+            db.add(snapshot)
+        for key, value in values.items():
+            setattr(snapshot, key, value)
+        snapshot.total_users = total_users
+        snapshot.total_checkins = total_checkins
+        snapshot.computed_at = datetime.now(timezone.utc)
+        written += 1
+        day += timedelta(days=1)
+    await db.flush()
+    return written
+
+
+async def rebuild_snapshots(db: AsyncSession) -> int:
+    await db.execute(delete(PlatformSnapshot))
+    return await refresh_snapshots(db)
+
+
+def risk_counts(snapshot: PlatformSnapshot) -> Dict[str, int]:
+    return {name: getattr(snapshot, RISK_COLUMNS[name]) for name in RISK_BUCKETS}
+
+
+# ===== Periodic job =====
+class SnapshotJob:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        interval: float = settings.SNAPSHOT_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        if self._task is not None or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Started platform snapshot job (every {self.interval:g}s)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self) -> int:
+        async with self.session_factory() as db:
+            written = await refresh_snapshots(db)
+            await db.commit()
+        self.runs += 1
+        self.last_run_at = datetime.now(timezone.utc)
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Another instance may have written the same day concurrently; the next run catches up
+                logger.error(f"Platform snapshot job error: {exc}")
+            await asyncio.sleep(self.interval)
+
+
+snapshot_job = SnapshotJob()
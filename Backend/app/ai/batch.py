@@ -0,0 +1,234 @@
+"""
+Vectorized scoring and history re-scoring.
+
+`score_batch` applies the same compiled rules as `app.ai.service.score_checkin` to
+whole NumPy columns of mood/sleep values. `rescore_checkins` streams check-ins in
+keyset-ordered chunks, scores each chunk in one pass and bulk-upserts the results
+under the rule set's `model_version`, committing per chunk (baseline labels from
+`app.insights.baselines` are kept). The notes of a chunk are scanned for lexicon
+signals (`app.ai.notes`) in a process pool of `NOTES_ANALYZER_WORKERS` processes. Rows already at that
+version are skipped, so an interrupted run simply resumes when started again:
+
+    python -m app.cli rescore [--rules path/to/rules.json]
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import select, update, insert, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.notes import init_worker, note_label, worker_signals
+from app.ai.rules import RuleSet, current_rules
+from app.core.config import settings
+from app.core.etag import bump_data_versions
+from app.insights.baselines import BASELINE_LABELS
+from app.models.models import DailyCheckin, AIAnalysisResult
+
+
+Signals = List[Dict[str, int]]
+
+
+def score_batch(
+    mood: np.ndarray,
+    sleep: np.ndarray,
+    rules: Optional[RuleSet] = None,
+    signals: Optional[Signals] = None,
+) -> Dict[str, Any]:
+    """Score arrays of mood (int) and sleep hours (float), with per-row note signals; returns one column per output."""
+    rules = rules or current_rules()
+    size = len(mood)
+    counts = {
+        name: np.fromiter((row[name] for row in signals), dtype=np.int64, count=size)
+        if signals is not None else np.zeros(size, dtype=np.int64)
+        for name in rules.notes.categories
+    }
+    return rules.evaluate_batch({
+        "mood": np.asarray(mood, dtype=np.int64),
+        "sleep": np.asarray(sleep, dtype=np.float64),
+        **rules.note_inputs(counts),
+    })
+
+
+def batch_results(
+    checkin_ids: List[str],
+    user_ids: List[str],
+    mood: np.ndarray,
+    sleep: np.ndarray,
+    rules: Optional[RuleSet] = None,
+    notes: Optional[Sequence[Optional[str]]] = None,
+    signals: Optional[Signals] = None,
+) -> List[Dict[str, Any]]:
+    """Score a chunk and shape it as `AIAnalysisResult` column dicts for bulk writes.
+
+    Pass the chunk's `notes`, or their `signals` when already computed (e.g. in a pool).
+    """
+    rules = rules or current_rules()
+    if signals is None and notes is not None:
+        signals = rules.notes.signals_many(notes)
+    scores = score_batch(mood, sleep, rules, signals)
+    labels = {name: _as_list(scores[name]) for name in rules.labels}
+    summaries = _as_list(scores["summary"])
+    confidence = _as_list(scores["confidence"])
+    return [
+        {
+            "checkin_id": checkin_ids[i],
+            "user_id": user_ids[i],
+            "model_version": rules.model_version,
+            "summary": summaries[i],
+            "labels": {
+                **{name: column[i] for name, column in labels.items()},
+                "note_signals": note_label(signals[i]) if signals is not None else {},
+            },
+            "confidence": confidence[i],
+        }
+        for i in range(len(checkin_ids))
+    ]
+
+
+def _as_list(column: Any) -> List[Any]:
+    return column.tolist() if isinstance(column, np.ndarray) else column
+
+
+def _notes_pool(rules: RuleSet, workers: int) -> Optional[ProcessPoolExecutor]:
+    """Workers compile the rules' lexicon once at start-up; None means scan in-process.
+
+    Spawned rather than forked: the parent has an event loop and database threads running.
+    """
+    if workers <= 1 or not rules.notes.categories:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(rules.notes.spec,),
+    )
+
+
+async def _pool_signals(pool: ProcessPoolExecutor, workers: int, notes: Sequence[Optional[str]]) -> Signals:
+    loop = asyncio.get_running_loop()
+    step = -(-len(notes) // workers)
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(pool, worker_signals, notes[i:i + step]) for i in range(0, len(notes), step)
+    ))
+    return [row for part in parts for row in part]
+
+
+def _stale(model_version: str):
+    return or_(AIAnalysisResult.id.is_(None), AIAnalysisResult.model_version != model_version)
+
+
+async def rescore_checkins(
+    db: AsyncSession,
+    rules: Optional[RuleSet] = None,
+    chunk_size: int = 5000,
+    user_id: Optional[str] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+    workers: int = settings.NOTES_ANALYZER_WORKERS,
+) -> int:
+    """Re-score every check-in not yet at the rules' `model_version`; returns the number of rows written."""
+    rules = rules or current_rules()
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    pool = _notes_pool(rules, workers)
+    try:
+        return await _rescore(db, rules, chunk_size, user_id, progress, pool, workers)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+async def _rescore(
+    db: AsyncSession,
+    rules: RuleSet,
+    chunk_size: int,
+    user_id: Optional[str],
+    progress: Optional[Callable[[int, int, float], None]],
+    pool: Optional[ProcessPoolExecutor],
+    workers: int,
+) -> int:
+    model_version = rules.model_version
+    base = select(DailyCheckin.id).outerjoin(AIAnalysisResult, AIAnalysisResult.checkin_id == DailyCheckin.id)
+    if user_id:
+        base = base.where(DailyCheckin.user_id == user_id)
+    total_result = await db.execute(select(func.count()).select_from(base.where(_stale(model_version)).subquery()))
+    total = total_result.scalar() or 0
+
+    done = 0
+    last_id = ""
+    started = time.monotonic()
+    while True:
+        query = (
+            select(
+                DailyCheckin.id,
+                DailyCheckin.user_id,
+                DailyCheckin.mood,
+                DailyCheckin.sleep_hours,
+                DailyCheckin.notes,
+                AIAnalysisResult.id,
+                AIAnalysisResult.labels,
+            )
+            .outerjoin(AIAnalysisResult, AIAnalysisResult.checkin_id == DailyCheckin.id)
+            .where(DailyCheckin.id > last_id, _stale(model_version))
+            .order_by(DailyCheckin.id)
+            .limit(chunk_size)
+        )
+        if user_id:
+            query = query.where(DailyCheckin.user_id == user_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+
+        checkin_ids, user_ids, moods, sleeps, notes, analysis_ids, old_labels = zip(*rows)
+        if pool is not None:
+            signals = await _pool_signals(pool, workers, notes)
+        else:
+            signals = rules.notes.signals_many(notes)
+        results = batch_results(
+            list(checkin_ids),
+            list(user_ids),
+            np.fromiter(moods, dtype=np.int64, count=len(rows)),
+            np.fromiter(sleeps, dtype=np.float64, count=len(rows)),
+            rules,
+            signals=signals,
+        )
+
+        updates = []
+        inserts = []
+        for analysis_id, previous, values in zip(analysis_ids, old_labels, results):
+            if analysis_id is None:
+                inserts.append(values)
+            else:
+                if isinstance(previous, dict):
+                    values["labels"].update((k, previous[k]) for k in BASELINE_LABELS if k in previous)
+                updates.append({
+                    "id": analysis_id,
+                    "model_version": values["model_version"],
+                    "summary": values["summary"],
+                    "labels": values["labels"],
+                    "confidence": values["confidence"],
+                })
+        if updates:
+            await db.execute(update(AIAnalysisResult), updates)
+        if inserts:
+            await db.execute(insert(AIAnalysisResult), inserts)
+        await bump_data_versions(db, user_ids)
+        await db.commit()
+
+        done += len(rows)
+        last_id = checkin_ids[-1]
+        if progress:
+            progress(done, total, time.monotonic() - started)
+    return done
+
+
+def log_progress(done: int, total: int, elapsed: float) -> None:
+    rate = done / elapsed if elapsed else 0.0
+    remaining = (total - done) / rate if rate and total > done else 0.0
+    pct = done / total * 100 if total else 100.0
+    logger.info(f"Re-scored {done}/{total} check-ins ({pct:.1f}%) at {rate:,.0f} rows/s, ~{remaining:.0f}s left")
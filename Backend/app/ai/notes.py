@@ -0,0 +1,129 @@
+"""
+Lexicon signals from check-in notes.
+
+The `notes` section of the rules file lists term categories and negation cues:
+
+    "notes": {
+      "negation_scope": 3,
+      "negations": ["not", "no", "never", "without"],
+      "categories": {
+        "sleep": {"terms": ["insomnia", "couldn't sleep"]},
+        "crisis": {"terms": ["kill myself"], "negatable": false}
+      }
+    }
+
+`NotesAnalyzer` compiles every term into one Aho-Corasick automaton over word
+tokens, so a note is scanned in a single pass whatever the lexicon size and terms
+only match whole words. A match is negated when a negation cue (or any `...n't`
+word) appears up to `negation_scope` words before it in the same clause; negated
+matches are not counted unless the category is `"negatable": false` (crisis
+language is counted regardless). Overlapping matches of one category count once.
+
+`signals` returns a count per category. The rule set passes these to the rules as
+`notes_<category>` inputs and stores the non-zero ones as the `note_signals`
+analysis label.
+"""
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)*|[.!?;:,()]")
+_CLAUSE_BREAKS = frozenset(".!?;:,()") | {"but", "although", "though", "however"}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower().replace("’", "'"))
+
+
+class NotesAnalyzer:
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = spec or {}
+        self.spec = spec
+        self.scope = int(spec.get("negation_scope", 3))
+        self.negations = frozenset(word.lower() for word in spec.get("negations", []))
+        categories = spec.get("categories", {})
+        self.categories: Tuple[str, ...] = tuple(categories)
+        self._negatable = [bool(categories[name].get("negatable", True)) for name in self.categories]
+
+        # ===== Trie over word tokens =====
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[Tuple[int, int]]] = [[]]  # (category index, term length in tokens)
+        for index, name in enumerate(self.categories):
+            for term in categories[name].get("terms", []):
+                words = tokenize(term)
+                if not words or any(word in _CLAUSE_BREAKS for word in words):
+                    raise ValueError(f"notes category {name!r}: invalid term {term!r}")
+                state = 0
+                for word in words:
+                    nxt = self._goto[state].get(word)
+                    if nxt is None:
+                        nxt = self._goto[state][word] = len(self._goto)
+                        self._goto.append({})
+                        self._out.append([])
+                    state = nxt
+                if (index, len(words)) not in self._out[state]:
+                    self._out[state].append((index, len(words)))
+
+        # ===== Failure links (breadth first), outputs inherited from the fallback state =====
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(word, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def _is_negation(self, word: str) -> bool:
+        return word in self.negations or word.endswith("n't")
+
+    def signals(self, text: Optional[str]) -> Dict[str, int]:
+        """Count of (non-negated) matches per category."""
+        counts = [0] * len(self.categories)
+        if not text or not self.categories:
+            return dict(zip(self.categories, counts))
+        goto, fail, out = self._goto, self._fail, self._out
+        last_end = [-1] * len(self.categories)
+        negated_at: List[int] = []
+        state = 0
+        for position, word in enumerate(tokenize(text)):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for index, length in out[state]:
+                start = position - length + 1
+                if start <= last_end[index]:
+                    continue
+                if self._negatable[index] and any(start - self.scope <= at < start for at in negated_at):
+                    continue
+                counts[index] += 1
+                last_end[index] = position
+            if word in _CLAUSE_BREAKS:
+                negated_at.clear()
+            elif self._is_negation(word):
+                negated_at.append(position)
+        return dict(zip(self.categories, counts))
+
+    def signals_many(self, texts: Sequence[Optional[str]]) -> List[Dict[str, int]]:
+        return [self.signals(text) for text in texts]
+
+
+def note_label(signals: Dict[str, int]) -> Dict[str, int]:
+    """The `note_signals` analysis label: categories that matched."""
+    return {name: count for name, count in signals.items() if count}
+
+
+# ===== Process pool workers (see `app.ai.batch.rescore_checkins`) =====
+_worker_analyzer: Optional[NotesAnalyzer] = None
+
+
+def init_worker(spec: Dict[str, Any]) -> None:
+    global _worker_analyzer
+    _worker_analyzer = NotesAnalyzer(spec)
+
+
+def worker_signals(texts: Sequence[Optional[str]]) -> List[Dict[str, int]]:
+    return _worker_analyzer.signals_many(texts)
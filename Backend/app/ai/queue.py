@@ -0,0 +1,256 @@
+"""
+Durable analysis queue.
+
+`create_checkin` writes an `AnalysisJob` in the same transaction as the check-in, so
+work survives restarts. A pool of asyncio workers started with the app claims due
+jobs in batches, analyses the whole batch in one session and commits once. A batch
+that fails is retried job by job so one bad row cannot hold back the rest; failed
+jobs back off exponentially and move to the dead-letter state (`JobStatus.DEAD`)
+after `ANALYSIS_MAX_ATTEMPTS`. Jobs claimed by a worker that died are picked up
+again once their lease expires.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.ai.service import analyze_checkin
+from app.core.cache import invalidate_user_on_commit
+from app.core.etag import bump_data_versions
+from app.core.config import settings
+from app.database.session import async_session
+from app.insights.baselines import lock_baselines
+from app.models.models import AnalysisJob, AIAnalysisResult, DailyCheckin, JobStatus
+
+
+async def enqueue_analysis(db: AsyncSession, checkin: DailyCheckin) -> AnalysisJob:
+    """Queue analysis of `checkin`; commits with the caller's transaction."""
+    job = AnalysisJob(checkin_id=checkin.id, user_id=checkin.user_id)
+    db.add(job)
+    await db.flush()
+    return job
+
+
+class AnalysisWorkerPool:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        workers: int = settings.ANALYSIS_WORKERS,
+        batch_size: int = settings.ANALYSIS_BATCH_SIZE,
+        poll_interval: float = settings.ANALYSIS_POLL_INTERVAL_SECONDS,
+        max_attempts: int = settings.ANALYSIS_MAX_ATTEMPTS,
+        retry_backoff: float = settings.ANALYSIS_RETRY_BACKOFF_SECONDS,
+        lease_seconds: float = settings.ANALYSIS_JOB_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+        self.processed = 0
+        self.retried = 0
+        self.dead = 0
+        self.batches = 0
+
+    # ===== Lifecycle =====
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+        self._tasks = [asyncio.create_task(self._run(n)) for n in range(self.workers)]
+        logger.info(f"Started {self.workers} analysis workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers early (new jobs were enqueued)."""
+        self._wakeup.set()
+
+    async def _run(self, n: int) -> None:
+        while True:
+            try:
+                handled = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error(f"Analysis worker {n} error: {exc}")
+                handled = 0
+            if handled:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ===== Claiming =====
+    async def claim_batch(self) -> List[AnalysisJob]:
+        now = datetime.now(timezone.utc)
+        token = str(uuid.uuid4())
+        due = or_(
+            and_(AnalysisJob.status == JobStatus.PENDING, AnalysisJob.run_after <= now),
+            and_(
+                AnalysisJob.status == JobStatus.RUNNING,
+                AnalysisJob.claimed_at < now - timedelta(seconds=self.lease_seconds),
+            ),
+        )
+        # The lock serialises claims within this process; `skip_locked` (Postgres) and the
+        # re-checked `due` condition on the UPDATE keep other processes from double-claiming.
+        async with self._claim_lock, self.session_factory() as db:
+            result = await db.execute(
+                select(AnalysisJob.id)
+                .where(due)
+                .order_by(AnalysisJob.run_after)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                return []
+            await db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id.in_(ids), due)
+                .values(
+                    status=JobStatus.RUNNING,
+                    claimed_by=token,
+                    claimed_at=now,
+                    attempts=AnalysisJob.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            result = await db.execute(
+                select(AnalysisJob).where(AnalysisJob.id.in_(ids), AnalysisJob.claimed_by == token)
+            )
+            return list(result.scalars().all())
+
+    # ===== Processing =====
+    async def run_once(self) -> int:
+        """Claim and process one batch; returns the number of jobs handled."""
+        jobs = await self.claim_batch()
+        if not jobs:
+            return 0
+        self.batches += 1
+        try:
+            async with self.session_factory() as db:
+                await self._analyze(db, jobs)
+                await db.commit()
+            self.processed += len(jobs)
+        except Exception as exc:
+            logger.warning(f"Analysis batch of {len(jobs)} failed ({exc}); retrying jobs individually")
+            for job in jobs:
+                await self._run_single(job)
+        return len(jobs)
+
+    async def _analyze(self, db: AsyncSession, jobs: List[AnalysisJob]) -> None:
+        # Batches are claimed without regard to user, so two workers can hold jobs of the
+        # same user. Locking the users' baseline rows first (in id order) serializes their
+        # analysis: baseline, alert coalescing and rollups are each read and written by one
+        # transaction at a time, and `analyzed` below is read after the previous one committed.
+        await lock_baselines(db, [job.user_id for job in jobs])
+        checkin_ids = [job.checkin_id for job in jobs]
+        result = await db.execute(select(DailyCheckin).where(DailyCheckin.id.in_(checkin_ids)))
+        checkins = {c.id: c for c in result.scalars().all()}
+        result = await db.execute(
+            select(AIAnalysisResult.checkin_id).where(AIAnalysisResult.checkin_id.in_(checkin_ids))
+        )
+        analyzed = set(result.scalars().all())
+
+        for job in jobs:
+            checkin = checkins.get(job.checkin_id)
+            if checkin is None:
+                raise LookupError(f"Check-in {job.checkin_id} not found")
+            if checkin.id not in analyzed:
+                await analyze_checkin(checkin, db)
+            invalidate_user_on_commit(db, job.user_id)
+        await bump_data_versions(db, [job.user_id for job in jobs])
+        await db.execute(delete(AnalysisJob).where(AnalysisJob.id.in_([job.id for job in jobs])))
+
+    async def _run_single(self, job: AnalysisJob) -> None:
+        try:
+            async with self.session_factory() as db:
+                await self._analyze(db, [job])
+                await db.commit()
+            self.processed += 1
+        except Exception as exc:
+            await self._fail(job, exc)
+
+    async def _fail(self, job: AnalysisJob, exc: Exception) -> None:
+        values: Dict[str, Any] = {"last_error": f"{type(exc).__name__}: {exc}"[:2000], "claimed_by": None}
+        if job.attempts >= self.max_attempts:
+            values["status"] = JobStatus.DEAD
+            self.dead += 1
+            logger.error(f"Analysis job {job.id} moved to dead letter after {job.attempts} attempts: {exc}")
+        else:
+            delay = self.retry_backoff * (2 ** (job.attempts - 1))
+            values["status"] = JobStatus.PENDING
+            values["run_after"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            self.retried += 1
+        async with self.session_factory() as db:
+            await db.execute(update(AnalysisJob).where(AnalysisJob.id == job.id).values(**values))
+            await db.commit()
+
+    # ===== Metrics =====
+    async def stats(self, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        async def _collect(session: AsyncSession) -> Dict[str, Any]:
+            result = await session.execute(
+                select(AnalysisJob.status, func.count(AnalysisJob.id), func.min(AnalysisJob.created_at))
+                .group_by(AnalysisJob.status)
+            )
+            depth = {status.value: 0 for status in JobStatus}
+            oldest = None
+            for status, count, created_at in result.all():
+                depth[status.value] = count
+                if status == JobStatus.PENDING:
+                    oldest = created_at
+            return {"depth": depth, "oldest_pending_at": oldest}
+
+        if db is not None:
+            queue = await _collect(db)
+        else:
+            async with self.session_factory() as session:
+                queue = await _collect(session)
+        return {
+            **queue,
+            "workers": len(self._tasks),
+            "batches": self.batches,
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead,
+        }
+
+
+async def requeue_analysis(db: AsyncSession) -> Dict[str, int]:
+    """Reset dead-lettered jobs and queue check-ins that have neither an analysis nor a job."""
+    revived = await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.status == JobStatus.DEAD)
+        .values(status=JobStatus.PENDING, attempts=0, run_after=datetime.now(timezone.utc), last_error=None)
+    )
+    result = await db.execute(
+        select(DailyCheckin.id, DailyCheckin.user_id)
+        .outerjoin(AIAnalysisResult, AIAnalysisResult.checkin_id == DailyCheckin.id)
+        .outerjoin(AnalysisJob, AnalysisJob.checkin_id == DailyCheckin.id)
+        .where(AIAnalysisResult.id.is_(None), AnalysisJob.id.is_(None))
+    )
+    missing = result.all()
+    db.add_all([AnalysisJob(checkin_id=checkin_id, user_id=user_id) for checkin_id, user_id in missing])
+    await db.flush()
+    return {"revived": revived.rowcount or 0, "enqueued": len(missing)}
+
+
+worker_pool = AnalysisWorkerPool()
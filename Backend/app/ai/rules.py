@@ -0,0 +1,394 @@
+"""
+Declarative wellness scoring rules.
+
+The scoring thresholds, weights, summary texts and alert triggers live in a JSON
+file (`ANALYSIS_RULES_PATH`, by default `app/ai/wellness_rules.json`) that is
+compiled once into a `RuleSet`. Outputs are evaluated in file order, and each one
+may use the inputs (`mood`, `sleep`) and any output defined before it:
+
+    {"name": "stress_level", "linear": {"intercept": 11, "mood": -1}, "min": 1}
+        weighted sum, optionally clamped (`min`/`max`) and rounded (`round`)
+    {"name": "risk_score", "hit": "sum", "rules": [{"when": ..., "then": 4}], "default": 0}
+        decision table: `first` takes the first matching row, `sum` adds every match
+    {"name": "summary", "template": "{mood_summary} {sleep_summary}"}
+        text formatted from the values computed so far
+
+A condition maps names to comparisons and every comparison must hold:
+`{"mood": {">": 3, "<=": 5}, "sleep": {"<": 5}}`. Text values are formatted
+the same way as templates. Alert rows pair a condition with a payload in which
+`"$name"` stands for that value.
+
+An optional `notes` section holds the lexicon for check-in notes (`app.ai.notes`);
+its category counts are available as `notes_<category>` inputs, e.g.
+`"inputs": ["mood", "sleep", "notes_sleep"]`.
+
+The same compiled table scores one check-in (`evaluate`) or NumPy columns
+(`evaluate_batch`), with identical results. `current_rules()` re-reads the file
+when its mtime changes (checked at most every `ANALYSIS_RULES_RELOAD_SECONDS`). A
+file that fails to compile is logged and the previous rules stay active. Each
+rule set's `model_version` is `<version>+<sha256 prefix of the file>`, so
+analyses record exactly which rules produced them and `rescore` can find stale
+ones.
+"""
+import hashlib
+import json
+import operator
+import os
+import string
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from app.ai.notes import NotesAnalyzer
+from app.core.config import settings
+from app.models.models import AlertType
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wellness_rules.json")
+
+# Outputs the rest of the app reads (rollup stress buckets, risk buckets, the analysis row)
+REQUIRED_OUTPUTS = ("stress_level", "risk_score", "confidence", "summary")
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+Values = Dict[str, Any]
+Column = Union[np.ndarray, List[str]]
+
+
+class RuleError(ValueError):
+    pass
+
+
+# ===== Compiled pieces =====
+class Condition:
+    def __init__(self, spec: Dict[str, Dict[str, Any]], known: Sequence[str]):
+        self.checks: List[Tuple[str, Callable[[Any, Any], Any], Any]] = []
+        for name, comparisons in spec.items():
+            if name not in known:
+                raise RuleError(f"condition uses {name!r} before it is defined")
+            for op, value in comparisons.items():
+                if op not in OPERATORS:
+                    raise RuleError(f"unknown comparison {op!r} (use one of {' '.join(OPERATORS)})")
+                self.checks.append((name, OPERATORS[op], value))
+
+    def test(self, values: Values) -> bool:
+        return all(compare(values[name], value) for name, compare, value in self.checks)
+
+    def mask(self, columns: Dict[str, Column], size: int) -> np.ndarray:
+        mask = np.ones(size, dtype=bool)
+        for name, compare, value in self.checks:
+            mask &= compare(columns[name], value)
+        return mask
+
+
+def _format(text: str, values: Values) -> str:
+    return text.format(**values) if "{" in text else text
+
+
+def _fields(texts: Sequence[str]) -> List[str]:
+    """Names referenced by `{name}` placeholders in `texts`."""
+    names: List[str] = []
+    for text in texts:
+        for _, field, _, _ in string.Formatter().parse(text):
+            if field and field not in names:
+                names.append(field)
+    return names
+
+
+def _check_fields(owner: str, texts: Sequence[str], known: Sequence[str]) -> None:
+    """Fail at compile time, not on the first matching check-in, on an unknown `{name}`."""
+    for name in _fields(texts):
+        if name not in known:
+            raise RuleError(f"{owner}: text uses {{{name}}} before it is defined")
+
+
+def _format_rows(choices: Sequence[str], index: np.ndarray, columns: Dict[str, Column]) -> List[str]:
+    """Per row, the chosen text formatted with that row's values."""
+    names = _fields(choices)
+    if not names:
+        return [choices[i] for i in index.tolist()]
+    rows = zip(*(columns[name].tolist() if isinstance(columns[name], np.ndarray) else columns[name] for name in names))
+    # Check-in values repeat a lot (integer mood, sleep in tenths), so format each combination once
+    formatted: Dict[Tuple[int, Tuple[Any, ...]], str] = {}
+    texts = []
+    for key in zip(index.tolist(), rows):
+        text = formatted.get(key)
+        if text is None:
+            text = formatted[key] = _format(choices[key[0]], dict(zip(names, key[1])))
+        texts.append(text)
+    return texts
+
+
+class Output:
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec["name"]
+        self.min = spec.get("min")
+        self.max = spec.get("max")
+        self.round = spec.get("round")
+
+    def _finish(self, value: Any) -> Any:
+        if self.min is not None:
+            value = max(self.min, value)
+        if self.max is not None:
+            value = min(self.max, value)
+        if self.round is not None:
+            value = round(value, self.round)
+        return value
+
+    def _finish_batch(self, column: np.ndarray) -> np.ndarray:
+        if self.min is not None:
+            column = np.maximum(self.min, column)
+        if self.max is not None:
+            column = np.minimum(self.max, column)
+        if self.round is not None:
+            # np.round scales before rounding (8.95 -> 9.0); Python's round() is correctly
+            # rounded (8.95 -> 8.9), so use it to stay identical to `evaluate`
+            column = np.array([round(v, self.round) for v in column.tolist()])
+        return column
+
+
+class LinearOutput(Output):
+    def __init__(self, spec: Dict[str, Any], known: Sequence[str]):
+        super().__init__(spec)
+        weights = dict(spec["linear"])
+        self.intercept = weights.pop("intercept", 0)
+        for name in weights:
+            if name not in known:
+                raise RuleError(f"{self.name}: uses {name!r} before it is defined")
+        if not weights:
+            raise RuleError(f"{self.name}: linear output needs at least one term")
+        self.terms = list(weights.items())
+
+    def _combine(self, values: Dict[str, Any]) -> Any:
+        total = None
+        for name, weight in self.terms:
+            term = values[name] * weight
+            total = term if total is None else total + term
+        return self.intercept + total if self.intercept else total
+
+    def evaluate(self, values: Values) -> Any:
+        return self._finish(self._combine(values))
+
+    def evaluate_batch(self, columns: Dict[str, Column], size: int) -> Column:
+        return self._finish_batch(np.asarray(self._combine(columns)))
+
+
+class TableOutput(Output):
+    def __init__(self, spec: Dict[str, Any], known: Sequence[str]):
+        super().__init__(spec)
+        self.hit = spec.get("hit", "first")
+        if self.hit not in ("first", "sum"):
+            raise RuleError(f"{self.name}: hit policy must be 'first' or 'sum'")
+        self.rows = [(Condition(row["when"], known), row["then"]) for row in spec.get("rules", [])]
+        if "default" not in spec:
+            raise RuleError(f"{self.name}: decision table needs a default")
+        self.default = spec["default"]
+        results = [then for _, then in self.rows] + [self.default]
+        self.text = any(isinstance(value, str) for value in results)
+        if self.text and (self.hit == "sum" or not all(isinstance(value, str) for value in results)):
+            raise RuleError(f"{self.name}: text tables must use hit 'first' and only text results")
+        if self.text:
+            _check_fields(self.name, results, known)
+
+    def evaluate(self, values: Values) -> Any:
+        if self.hit == "sum":
+            total = self.default
+            for condition, then in self.rows:
+                if condition.test(values):
+                    total += then
+            return self._finish(total)
+        for condition, then in self.rows:
+            if condition.test(values):
+                return _format(then, values) if self.text else self._finish(then)
+        return _format(self.default, values) if self.text else self._finish(self.default)
+
+    def evaluate_batch(self, columns: Dict[str, Column], size: int) -> Column:
+        masks = [condition.mask(columns, size) for condition, _ in self.rows]
+        if self.hit == "sum":
+            total = np.full(size, self.default)
+            for mask, (_, then) in zip(masks, self.rows):
+                total = total + np.where(mask, then, 0)
+            return self._finish_batch(total)
+        if self.text:
+            index = np.select(masks, list(range(len(self.rows))), default=len(self.rows)) if masks else np.full(size, 0)
+            return _format_rows([then for _, then in self.rows] + [self.default], index, columns)
+        if not masks:
+            return self._finish_batch(np.full(size, self.default))
+        return self._finish_batch(np.select(masks, [then for _, then in self.rows], default=self.default))
+
+
+class TemplateOutput(Output):
+    def __init__(self, spec: Dict[str, Any], known: Sequence[str]):
+        super().__init__(spec)
+        self.template = spec["template"]
+        try:
+            self.template.format(**{name: 0 for name in known})
+        except (KeyError, IndexError) as exc:
+            raise RuleError(f"{self.name}: template uses {exc} before it is defined")
+
+    def evaluate(self, values: Values) -> str:
+        return self.template.format(**values)
+
+    def evaluate_batch(self, columns: Dict[str, Column], size: int) -> List[str]:
+        return _format_rows([self.template], np.zeros(size, dtype=np.int64), columns)
+
+
+class AlertRule:
+    def __init__(self, spec: Dict[str, Any], known: Sequence[str]):
+        try:
+            self.type = AlertType(spec["type"])
+        except ValueError:
+            raise RuleError(f"unknown alert type {spec['type']!r}")
+        self.condition = Condition(spec["when"], known)
+        self.payload = spec.get("payload", {})
+        for value in self.payload.values():
+            if not isinstance(value, str):
+                continue
+            if value.startswith("$"):
+                if value[1:] not in known:
+                    raise RuleError(f"{self.type.value} alert payload uses unknown {value!r}")
+            else:
+                _check_fields(f"{self.type.value} alert payload", [value], known)
+
+    def render(self, values: Values) -> Dict[str, Any]:
+        payload = {}
+        for key, value in self.payload.items():
+            if isinstance(value, str):
+                value = values[value[1:]] if value.startswith("$") else _format(value, values)
+            payload[key] = value
+        return payload
+
+
+def _compile_output(spec: Dict[str, Any], known: Sequence[str]) -> Output:
+    if "linear" in spec:
+        return LinearOutput(spec, known)
+    if "rules" in spec or "default" in spec:
+        return TableOutput(spec, known)
+    if "template" in spec:
+        return TemplateOutput(spec, known)
+    raise RuleError(f"{spec.get('name')!r}: output needs 'linear', 'rules' or 'template'")
+
+
+# ===== Rule sets =====
+class RuleSet:
+    def __init__(self, spec: Dict[str, Any], digest: str, path: Optional[str] = None):
+        self.version = str(spec["version"])
+        self.digest = digest
+        self.model_version = f"{self.version}+{digest[:8]}"
+        if len(self.model_version) > 50:  # AIAnalysisResult.model_version is String(50)
+            raise RuleError("version is too long")
+        self.path = path
+        self.inputs: Tuple[str, ...] = tuple(spec.get("inputs", ("mood", "sleep")))
+        try:
+            self.notes = NotesAnalyzer(spec.get("notes"))
+        except ValueError as exc:
+            raise RuleError(str(exc))
+        for name in self.inputs:
+            if name not in ("mood", "sleep") and name[len("notes_"):] not in self.notes.categories:
+                raise RuleError(f"unknown input {name!r} (mood, sleep or notes_<category>)")
+
+        known: List[str] = list(self.inputs)
+        self.outputs: List[Output] = []
+        for output_spec in spec["outputs"]:
+            if output_spec.get("name") in known:
+                raise RuleError(f"{output_spec.get('name')!r} is defined twice")
+            self.outputs.append(_compile_output(output_spec, known))
+            known.append(output_spec["name"])
+        missing = [name for name in REQUIRED_OUTPUTS if name not in known]
+        if missing:
+            raise RuleError(f"missing required outputs: {', '.join(missing)}")
+
+        self.labels: Tuple[str, ...] = tuple(spec.get("labels", ("stress_level", "risk_score")))
+        for name in self.labels:
+            if name not in known:
+                raise RuleError(f"label {name!r} is not an output")
+        self.alert_rules = [AlertRule(alert, known) for alert in spec.get("alerts", [])]
+
+    def note_inputs(self, signals: Dict[str, Any]) -> Dict[str, Any]:
+        """`notes_<category>` inputs from per-category counts (or count columns)."""
+        return {f"notes_{name}": value for name, value in signals.items()}
+
+    def evaluate(self, inputs: Dict[str, Any]) -> Values:
+        """Every input and output for one check-in."""
+        values = {name: inputs[name] for name in self.inputs}
+        for output in self.outputs:
+            values[output.name] = output.evaluate(values)
+        return values
+
+    def evaluate_batch(self, inputs: Dict[str, np.ndarray]) -> Dict[str, Column]:
+        """Every input and output for equally long input columns (text outputs as lists)."""
+        columns: Dict[str, Column] = {name: np.asarray(inputs[name]) for name in self.inputs}
+        size = len(columns[self.inputs[0]])
+        for output in self.outputs:
+            columns[output.name] = output.evaluate_batch(columns, size)
+        return columns
+
+    def alerts(self, values: Values) -> List[Tuple[AlertType, Dict[str, Any]]]:
+        return [(rule.type, rule.render(values)) for rule in self.alert_rules if rule.condition.test(values)]
+
+    def label_values(self, values: Values) -> Dict[str, Any]:
+        return {name: values[name] for name in self.labels}
+
+
+def parse_rules(raw: bytes, path: Optional[str] = None) -> RuleSet:
+    try:
+        spec = json.loads(raw)
+        return RuleSet(spec, hashlib.sha256(raw).hexdigest(), path)
+    except RuleError:
+        raise
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise RuleError(f"malformed rules: {exc!r}")
+
+
+def load_rules(path: str) -> RuleSet:
+    with open(path, "rb") as f:
+        return parse_rules(f.read(), path)
+
+
+# ===== Hot reload =====
+class RuleStore:
+    def __init__(self, path: str = "", reload_seconds: float = settings.ANALYSIS_RULES_RELOAD_SECONDS):
+        self.path = path or DEFAULT_RULES_PATH
+        self.reload_seconds = reload_seconds
+        self._rules: Optional[RuleSet] = None
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+
+    def get(self) -> RuleSet:
+        if self._rules is None:
+            self._load(os.stat(self.path).st_mtime_ns)
+        elif self.reload_seconds > 0 and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as exc:
+                logger.error(f"Cannot stat analysis rules {self.path}: {exc}; keeping {self._rules.model_version}")
+                return self._rules
+            if mtime != self._mtime:
+                try:
+                    self._load(mtime)
+                except (OSError, RuleError) as exc:
+                    self._mtime = mtime  # do not retry until the file changes again
+                    logger.error(f"Invalid analysis rules {self.path}: {exc}; keeping {self._rules.model_version}")
+        return self._rules
+
+    def _load(self, mtime: int) -> None:
+        self._rules = load_rules(self.path)
+        self._mtime = mtime
+        self._checked_at = time.monotonic()
+        logger.info(f"Loaded analysis rules {self._rules.model_version} from {self.path}")
+
+
+rule_store = RuleStore(settings.ANALYSIS_RULES_PATH)
+
+
+def current_rules() -> RuleSet:
+    return rule_store.get()
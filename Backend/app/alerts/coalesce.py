@@ -0,0 +1,132 @@
+"""
+Alert coalescing.
+
+A user stuck in a pattern (short sleep every night) would otherwise get a new
+`LOW_SLEEP` alert per check-in. `raise_alerts` instead folds a repeat into the
+user's open alert of the same type when that alert was last seen within
+`ALERT_COALESCE_WINDOW_HOURS`: the occurrence count goes up and `last_seen_at`,
+`payload` and `ai_result_id` move to the latest occurrence. Genuinely new alerts
+are inserted together in one flush.
+
+`compact_alerts` applies the same rule to history written before coalescing
+existed (`python -m app.cli compact-alerts`): consecutive alerts of one user, type
+and status less than a window apart are merged into the earliest of them.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Alert, AlertStatus, AlertType
+
+Candidate = Tuple[AlertType, Dict[str, Any]]
+
+_WRITE_CHUNK = 500
+
+
+async def raise_alerts(
+    db: AsyncSession,
+    user_id: str,
+    ai_result_id: Optional[str],
+    candidates: List[Candidate],
+    window_hours: float = settings.ALERT_COALESCE_WINDOW_HOURS,
+) -> List[Alert]:
+    """Create or coalesce one alert per `(type, payload)` candidate; returns the alerts touched."""
+    if not candidates:
+        return []
+    now = datetime.now(timezone.utc)
+
+    open_alerts: Dict[AlertType, Alert] = {}
+    if window_hours > 0:
+        result = await db.execute(
+            select(Alert)
+            .where(
+                Alert.user_id == user_id,
+                Alert.status == AlertStatus.OPEN,
+                Alert.type.in_([alert_type for alert_type, _ in candidates]),
+                Alert.last_seen_at >= now - timedelta(hours=window_hours),
+            )
+            .order_by(Alert.last_seen_at)
+        )
+        for alert in result.scalars().all():
+            open_alerts[alert.type] = alert  # most recently seen wins
+
+    alerts: List[Alert] = []
+    new_alerts: List[Alert] = []
+    for alert_type, payload in candidates:
+        alert = open_alerts.get(alert_type)
+        if alert is None:
+            alert = Alert(
+                user_id=user_id,
+                ai_result_id=ai_result_id,
+                type=alert_type,
+                payload=payload,
+                created_at=now,
+                last_seen_at=now,
+            )
+            new_alerts.append(alert)
+        else:
+            alert.occurrence_count += 1
+            alert.last_seen_at = now
+            alert.payload = payload
+            alert.ai_result_id = ai_result_id
+        alerts.append(alert)
+
+    db.add_all(new_alerts)
+    await db.flush()
+    return alerts
+
+
+async def compact_alerts(
+    db: AsyncSession,
+    window_hours: float = settings.ALERT_COALESCE_WINDOW_HOURS,
+    user_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """Merge historical duplicate alerts; returns counts of kept (updated) and removed rows. Caller commits."""
+    if window_hours <= 0:
+        return {"kept": 0, "removed": 0}
+    window = timedelta(hours=window_hours)
+    query = select(
+        Alert.id, Alert.user_id, Alert.type, Alert.status, Alert.created_at,
+        Alert.last_seen_at, Alert.occurrence_count, Alert.ai_result_id, Alert.payload,
+    )
+    if user_id:
+        query = query.where(Alert.user_id == user_id)
+    query = query.order_by(Alert.user_id, Alert.type, Alert.status, Alert.created_at, Alert.id)
+
+    updates: List[Dict[str, Any]] = []
+    removed: List[str] = []
+    keeper: Optional[Dict[str, Any]] = None
+    merged = False
+    stream = await db.stream(query.execution_options(yield_per=1000))
+    async for alert_id, owner, alert_type, status, created_at, last_seen_at, count, ai_result_id, payload in stream:
+        group = (owner, alert_type, status)
+        if keeper is not None and keeper["group"] == group and created_at - keeper["last_seen_at"] <= window:
+            keeper["occurrence_count"] += count
+            if last_seen_at >= keeper["last_seen_at"]:
+                keeper.update(last_seen_at=last_seen_at, ai_result_id=ai_result_id, payload=payload)
+            removed.append(alert_id)
+            merged = True
+            continue
+        if merged:
+            updates.append(keeper)
+        keeper = {
+            "group": group,
+            "id": alert_id,
+            "occurrence_count": count,
+            "last_seen_at": last_seen_at,
+            "ai_result_id": ai_result_id,
+            "payload": payload,
+        }
+        merged = False
+    if merged:
+        updates.append(keeper)
+
+    for start in range(0, len(updates), _WRITE_CHUNK):
+        chunk = [{k: v for k, v in row.items() if k != "group"} for row in updates[start:start + _WRITE_CHUNK]]
+        await db.execute(update(Alert), chunk)
+    for start in range(0, len(removed), _WRITE_CHUNK):
+        await db.execute(delete(Alert).where(Alert.id.in_(removed[start:start + _WRITE_CHUNK])))
+    return {"kept": len(updates), "removed": len(removed)}
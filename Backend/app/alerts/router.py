@@ -1,39 +1,114 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, and_, or_
+from datetime import datetime
+from typing import Optional, Tuple
 
-from app.database.session import get_db
-from app.core.deps import get_current_user
-from app.models.models import User, Alert, AlertStatus
+from app.database.session import get_db, get_read_db, async_read_session
+from app.core.deps import get_current_user, Principal
+from app.core.cache import response_cache, invalidate_user_on_commit
+from app.core.etag import bump_data_version, cache_etag, conditional_get
+from app.core.pagination import clamp_limit, decode_cursor, keyset_page, split_page, count_total, set_page_headers
+from app.core.config import settings
+from app.core.responses import RowSerializer, envelope_response
+from app.alerts.stream import alert_hub, alert_event, sse_events, StreamLimitExceeded
+from app.models.models import Alert, AlertStatus
 from app.schemas.schemas import AlertResponse, AlertUpdateRequest
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
+alert_rows = RowSerializer(AlertResponse)
 
-@router.get("")
+
+@router.get("", dependencies=[Depends(conditional_get())])
 async def list_alerts(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(Alert)
-        .where(Alert.user_id == current_user.id)
-        .order_by(desc(Alert.created_at))
-        .limit(50)
+    limit = clamp_limit(limit)
+    cache_key = (current_user.id, "alerts", (limit, cursor, include_total), cache_etag(request))
+    cached = response_cache.get(cache_key)
+    if cached is None:
+        query = select(*alert_rows.columns(Alert)).where(Alert.user_id == current_user.id)
+        # Most recently seen first: a coalesced repeat moves its alert back to the top
+        result = await db.execute(keyset_page(query, Alert.last_seen_at, Alert.id, cursor, limit))
+        alerts, next_cursor = split_page(result.all(), limit, "last_seen_at")
+        total = await count_total(db, query) if include_total else None
+        # Cache the serialized page: hits are served without encoding anything
+        cached = (alert_rows.dump_json(alerts), next_cursor, total)
+        response_cache.set(cache_key, cached, tag=current_user.id)
+
+    data, next_cursor, total = cached
+    response = envelope_response(data)
+    set_page_headers(response, next_cursor, total)
+    return response
+
+
+async def _replay_position(db: AsyncSession, user_id: str, last_event_id: str) -> Optional[Tuple[datetime, str]]:
+    """`(last_seen_at, id)` to resume after; a bare alert id (older clients) is looked up."""
+    try:
+        return decode_cursor(last_event_id)
+    except HTTPException:
+        pass
+    result = await db.execute(select(Alert.last_seen_at).where(Alert.id == last_event_id, Alert.user_id == user_id))
+    last_seen = result.scalar_one_or_none()
+    return None if last_seen is None else (last_seen, last_event_id)
+
+
+@router.get("/stream")
+async def stream_alerts(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-Sent Events: new alerts as they are created, replacing polling of `GET /alerts`."""
+    # Authenticate with a short-lived session: a `get_db` dependency would stay open
+    # (and could pin a pool connection) for as long as the stream does
+    async with async_read_session() as db:
+        current_user = await get_current_user(request, db)
+
+    try:
+        subscription = alert_hub.subscribe(current_user.id)
+    except StreamLimitExceeded:
+        raise HTTPException(status_code=429, detail="Too many open alert streams")
+
+    # Alerts created or coalesced while the client was reconnecting, in event id order
+    replay = []
+    if last_event_id:
+        async with async_read_session() as db:
+            position = await _replay_position(db, current_user.id, last_event_id)
+            if position is not None:
+                last_seen, last_id = position
+                result = await db.execute(
+                    select(Alert)
+                    .where(
+                        Alert.user_id == current_user.id,
+                        or_(
+                            Alert.last_seen_at > last_seen,
+                            and_(Alert.last_seen_at == last_seen, Alert.id > last_id),
+                        ),
+                    )
+                    .order_by(Alert.last_seen_at, Alert.id)
+                    .limit(settings.ALERT_STREAM_REPLAY_LIMIT)
+                )
+                replay = [alert_event(alert) for alert in result.scalars().all()]
+
+    return StreamingResponse(
+        sse_events(subscription, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    alerts = result.scalars().all()
-    return {
-        "ok": True,
-        "data": [AlertResponse.model_validate(a) for a in alerts],
-        "error": None,
-    }
 
 
 @router.patch("/{alert_id}")
 async def update_alert(
     alert_id: str,
     data: AlertUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -45,6 +120,8 @@ async def update_alert(
 
     alert.status = AlertStatus(data.status)
     await db.flush()
+    await bump_data_version(db, current_user.id)
+    invalidate_user_on_commit(db, current_user.id)
 
     return {
         "ok": True,
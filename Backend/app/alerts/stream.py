@@ -0,0 +1,268 @@
+"""
+Real-time alert fan-out for `GET /alerts/stream` (Server-Sent Events).
+
+Writers register new alerts with `publish_alerts_on_commit`; once the transaction
+commits they are handed to `alert_hub`, which delivers them to every open stream
+of the alert's owner. Each stream has a bounded queue: a client that falls
+`ALERT_STREAM_QUEUE_SIZE` events behind is sent a `resync` event and disconnected
+(it reconnects with `Last-Event-ID` and is replayed from the database), so one
+slow consumer never grows memory or delays the others.
+
+A coalesced repeat is sent again under the same alert id with a later
+`last_seen_at`, so events are identified by `(last_seen_at, id)` (`event_id`) rather
+than by the alert id: the id grows with every create and update, and replay
+resumes after it in that order.
+
+Delivery between processes goes through a broker (`ALERT_STREAM_BACKEND`):
+`memory` delivers in-process only (single worker), `postgres` publishes with
+`pg_notify` and every process `LISTEN`s on the channel, so a stream opened on one
+worker receives alerts created by another.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.models.models import Alert
+from app.schemas.schemas import AlertResponse
+
+Deliver = Callable[[str, Dict[str, Any]], None]
+
+# Queue sentinel: the subscriber overflowed and must resync
+RESYNC = object()
+
+
+class StreamLimitExceeded(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, user_id: str, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size + 1)  # +1 keeps room for RESYNC
+        self.queue_size = queue_size
+        self.overflowed = False
+
+    def offer(self, item: Dict[str, Any]) -> bool:
+        """Queue `item`; False once the subscriber is too far behind (it is then sent RESYNC)."""
+        if self.queue.qsize() >= self.queue_size:
+            self.overflowed = True
+            self.queue.put_nowait(RESYNC)
+            return False
+        self.queue.put_nowait(item)
+        return True
+
+
+# ===== Brokers =====
+class MemoryBroker:
+    """Delivers to streams of this process only."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    def publish(self, user_id: str, item: Dict[str, Any]) -> None:
+        if self._deliver is not None:
+            self._deliver(user_id, item)
+
+
+class PostgresBroker:
+    """`pg_notify` / `LISTEN` on one channel, so every app process sees every alert."""
+
+    channel = "mindpulse_alerts"
+
+    def __init__(self):
+        self._listener = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def start(self, deliver: Deliver) -> None:
+        from app.database.session import engine
+
+        def _on_notify(connection, pid, channel, payload):
+            message = json.loads(payload)
+            deliver(message["user_id"], message["alert"])
+
+        # A dedicated pooled connection stays checked out for the lifetime of the app
+        self._listener = await engine.connect()
+        raw = await self._listener.get_raw_connection()
+        await raw.driver_connection.add_listener(self.channel, _on_notify)
+
+    async def stop(self) -> None:
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    def publish(self, user_id: str, item: Dict[str, Any]) -> None:
+        task = asyncio.get_running_loop().create_task(self._notify(user_id, item))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _notify(self, user_id: str, item: Dict[str, Any]) -> None:
+        from app.database.session import engine
+
+        payload = json.dumps({"user_id": user_id, "alert": item}, separators=(",", ":"), default=str)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(select(func.pg_notify(self.channel, payload)))
+                await conn.commit()
+        except Exception as exc:
+            logger.error(f"Alert notify failed: {exc}")
+
+
+BROKERS = {"memory": MemoryBroker, "postgres": PostgresBroker}
+
+
+# ===== Hub =====
+class AlertHub:
+    def __init__(
+        self,
+        backend: str = settings.ALERT_STREAM_BACKEND,
+        queue_size: int = settings.ALERT_STREAM_QUEUE_SIZE,
+        max_streams_per_user: int = settings.ALERT_STREAM_MAX_PER_USER,
+    ):
+        if backend not in BROKERS:
+            raise ValueError(f"Unknown ALERT_STREAM_BACKEND {backend!r} (expected one of {', '.join(BROKERS)})")
+        self.broker = BROKERS[backend]()
+        self.queue_size = queue_size
+        self.max_streams_per_user = max_streams_per_user
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+
+    # ===== Lifecycle =====
+    async def start(self) -> None:
+        await self.broker.start(self._deliver)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.overflowed = True
+                subscription.queue.put_nowait(RESYNC)
+        self._subscribers.clear()
+
+    # ===== Subscribers =====
+    def subscribe(self, user_id: str) -> Subscription:
+        subscriptions = self._subscribers.setdefault(user_id, set())
+        if len(subscriptions) >= self.max_streams_per_user:
+            raise StreamLimitExceeded(user_id)
+        subscription = Subscription(user_id, self.queue_size)
+        subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    # ===== Publishing =====
+    def publish(self, user_id: str, item: Dict[str, Any]) -> None:
+        self.published += 1
+        self.broker.publish(user_id, item)
+
+    def _deliver(self, user_id: str, item: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers.get(user_id, ())):
+            if subscription.offer(item):
+                self.delivered += 1
+            else:
+                self.resyncs += 1
+                logger.warning(f"Alert stream for user {user_id} fell behind; asking it to resync")
+                self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "streams": self.subscriber_count(),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+        }
+
+
+alert_hub = AlertHub()
+
+
+# ===== SSE encoding =====
+def _last_seen(item: Dict[str, Any]) -> datetime:
+    # SQLite hands back naive timestamps; they are stored in UTC
+    last_seen_at = datetime.fromisoformat(item["last_seen_at"].replace("Z", "+00:00"))
+    return last_seen_at if last_seen_at.tzinfo else last_seen_at.replace(tzinfo=timezone.utc)
+
+
+def event_id(item: Dict[str, Any]) -> str:
+    """SSE event id of an alert event: its `(last_seen_at, id)` position as a cursor."""
+    return encode_cursor(_last_seen(item), item["id"])
+
+
+def _sse(item: Dict[str, Any]) -> str:
+    return f"id: {event_id(item)}\nevent: alert\ndata: {json.dumps(item, separators=(',', ':'))}\n\n"
+
+
+async def sse_events(
+    subscription: Subscription,
+    replay: List[Dict[str, Any]],
+    heartbeat: float = settings.ALERT_STREAM_HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """Replayed alerts, then live ones as they arrive, with a comment line as heartbeat."""
+    try:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        replayed: Dict[str, datetime] = {}
+        for item in replay:
+            replayed[item["id"]] = _last_seen(item)
+            yield _sse(item)
+        while True:
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if item is RESYNC:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            # Subscribed before the replay query, so a live event may repeat a replayed state
+            if item["id"] not in replayed or _last_seen(item) > replayed[item["id"]]:
+                yield _sse(item)
+    finally:
+        alert_hub.unsubscribe(subscription)
+
+
+_PENDING_KEY = "alert_publications"
+
+
+def alert_event(alert: Alert) -> Dict[str, Any]:
+    return AlertResponse.model_validate(alert).model_dump(mode="json")
+
+
+def publish_alerts_on_commit(db: AsyncSession, alerts: List[Alert]) -> None:
+    """Send `alerts` (flushed, so ids are set) to their owners' streams once `db` commits."""
+    db.info.setdefault(_PENDING_KEY, []).extend((alert.user_id, alert_event(alert)) for alert in alerts)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session):
+    for user_id, item in session.info.pop(_PENDING_KEY, ()):
+        alert_hub.publish(user_id, item)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
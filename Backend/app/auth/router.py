@@ -4,10 +4,13 @@ from sqlalchemy import select
 from datetime import datetime, timezone
 
 from app.database.session import get_db
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token
-from app.core.deps import get_current_user
+from app.core.security import (
+    hash_password_async, verify_and_update_password, create_access_token, create_refresh_token, decode_token,
+    PasswordHasherBusy,
+)
+from app.core.deps import get_current_user, Principal, invalidate_principal_on_commit
 from app.core.config import settings
-from app.models.models import User, UserSettings
+from app.models.models import User, UserSettings, UserDataVersion
 from app.schemas.schemas import LoginRequest, SignupRequest, UserResponse, AuthMessageResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -23,15 +26,15 @@ async def signup(data: SignupRequest, response: Response, db: AsyncSession = Dep
     # Create user
     user = User(
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=await _hash_or_503(data.password),
         full_name=data.full_name,
     )
     db.add(user)
     await db.flush()
 
-    # Create default settings
+    # Create default settings and the data version behind conditional GETs
     user_settings = UserSettings(user_id=user.id)
-    db.add(user_settings)
+    db.add_all([user_settings, UserDataVersion(user_id=user.id)])
     await db.flush()
 
     # Issue tokens
@@ -55,15 +58,25 @@ async def login(data: LoginRequest, response: Response, db: AsyncSession = Depen
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    try:
+        valid, new_hash = await verify_and_update_password(data.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is deactivated")
 
-    # Update last login
+    # Update last login (and rehash if BCRYPT_ROUNDS changed)
     user.last_login = datetime.now(timezone.utc)
+    if new_hash:
+        user.hashed_password = new_hash
     await db.flush()
+    invalidate_principal_on_commit(db, user.id)
 
     access_token = create_access_token(user.id, {"role": user.role.value})
     refresh_token = create_refresh_token(user.id)
@@ -113,7 +126,7 @@ async def logout(response: Response):
 
 
 @router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     return {
         "ok": True,
         "data": UserResponse.model_validate(current_user),
@@ -121,6 +134,21 @@ async def get_me(current_user: User = Depends(get_current_user)):
     }
 
 
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _hash_or_503(password: str) -> str:
+    try:
+        return await hash_password_async(password)
+    except PasswordHasherBusy:
+        raise _busy()
+
+
 def _set_auth_cookies(response: Response, access_token: str, refresh_token: str):
     response.set_cookie(
         key="access_token",
@@ -0,0 +1,180 @@
+"""
+Streaming export of a user's check-in history.
+
+`GET /checkins/export` writes every check-in, oldest first, with its analysis and
+the alerts raised from it, as NDJSON (one nested object per check-in) or CSV (one
+flat row per check-in). Rows are read as plain columns (no ORM objects or pydantic
+models) in keyset pages of `EXPORT_PAGE_SIZE` check-ins. Each page is streamed from
+a short-lived read session that is closed before the page is sent, so a slow
+client never pins a pool connection and memory stays bounded by the page size.
+Optional gzip compresses the stream on the fly.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+
+from app.core.config import settings
+from app.database.session import async_read_session
+from app.models.models import AIAnalysisResult, Alert, DailyCheckin
+
+CSV_COLUMNS = (
+    "id", "created_at", "mood", "sleep_hours", "notes",
+    "model_version", "stress_level", "risk_score", "overall_wellness", "confidence", "summary",
+    "alerts",
+)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# Bytes buffered before a chunk is handed to the server
+_FLUSH_BYTES = 64 * 1024
+
+
+def _iso(moment: Optional[datetime]) -> Optional[str]:
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+    return moment.isoformat()
+
+
+def _page_query(user_id: str, after: Optional[Tuple[datetime, str]], page_size: int):
+    page = select(DailyCheckin.id).where(DailyCheckin.user_id == user_id)
+    if after is not None:
+        created_at, checkin_id = after
+        page = page.where(or_(
+            DailyCheckin.created_at > created_at,
+            and_(DailyCheckin.created_at == created_at, DailyCheckin.id > checkin_id),
+        ))
+    page = page.order_by(DailyCheckin.created_at, DailyCheckin.id).limit(page_size).subquery()
+    return (
+        select(
+            DailyCheckin.id,
+            DailyCheckin.created_at,
+            DailyCheckin.mood,
+            DailyCheckin.sleep_hours,
+            DailyCheckin.notes,
+            AIAnalysisResult.id,
+            AIAnalysisResult.model_version,
+            AIAnalysisResult.summary,
+            AIAnalysisResult.labels,
+            AIAnalysisResult.confidence,
+            AIAnalysisResult.created_at,
+            Alert.id,
+            Alert.type,
+            Alert.status,
+            Alert.payload,
+            Alert.occurrence_count,
+            Alert.created_at,
+            Alert.last_seen_at,
+        )
+        .join(page, page.c.id == DailyCheckin.id)
+        .outerjoin(AIAnalysisResult, AIAnalysisResult.checkin_id == DailyCheckin.id)
+        .outerjoin(Alert, Alert.ai_result_id == AIAnalysisResult.id)
+        .order_by(DailyCheckin.created_at, DailyCheckin.id, Alert.created_at)
+    )
+
+
+async def iter_history(user_id: str, page_size: int = settings.EXPORT_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one dict per check-in (with `analysis` and `alerts`), oldest first."""
+    after: Optional[Tuple[datetime, str]] = None
+    while True:
+        records: List[Dict[str, Any]] = []
+        async with async_read_session() as db:
+            stream = await db.stream(_page_query(user_id, after, page_size).execution_options(yield_per=500))
+            async for row in stream:
+                (checkin_id, created_at, mood, sleep, notes,
+                 analysis_id, model_version, summary, labels, confidence, analysed_at,
+                 alert_id, alert_type, alert_status, payload, occurrences, alerted_at, last_seen_at) = row
+                # Consecutive rows of one check-in differ only in the joined alert
+                if not records or records[-1]["id"] != checkin_id:
+                    records.append({
+                        "id": checkin_id,
+                        "created_at": created_at,
+                        "mood": mood,
+                        "sleep_hours": sleep,
+                        "notes": notes,
+                        "analysis": None if analysis_id is None else {
+                            "id": analysis_id,
+                            "model_version": model_version,
+                            "summary": summary,
+                            "labels": labels,
+                            "confidence": confidence,
+                            "created_at": _iso(analysed_at),
+                        },
+                        "alerts": [],
+                    })
+                if alert_id is not None:
+                    records[-1]["alerts"].append({
+                        "id": alert_id,
+                        "type": alert_type.value,
+                        "status": alert_status.value,
+                        "payload": payload,
+                        "occurrence_count": occurrences,
+                        "created_at": _iso(alerted_at),
+                        "last_seen_at": _iso(last_seen_at),
+                    })
+        if not records:
+            return
+        after = (records[-1]["created_at"], records[-1]["id"])
+        for record in records:
+            record["created_at"] = _iso(record["created_at"])
+            yield record
+        if len(records) < page_size:
+            return
+
+
+# ===== Encoders =====
+def _ndjson_line(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+def _csv_row(record: Dict[str, Any]) -> List[Any]:
+    analysis = record["analysis"] or {}
+    labels = analysis.get("labels") or {}
+    return [
+        record["id"], record["created_at"], record["mood"], record["sleep_hours"], record["notes"],
+        analysis.get("model_version", ""), labels.get("stress_level", ""), labels.get("risk_score", ""),
+        labels.get("overall_wellness", ""), analysis.get("confidence", ""), analysis.get("summary", ""),
+        ";".join(f"{alert['type']}:{alert['status']}" for alert in record["alerts"]),
+    ]
+
+
+async def export_stream(user_id: str, fmt: str, compress: bool = False) -> AsyncIterator[bytes]:
+    """Encoded (and optionally gzipped) export body, in chunks of roughly 64 KiB."""
+    gzipper = zlib.compressobj(wbits=31) if compress else None
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n") if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(CSV_COLUMNS)
+
+    def _drain(final: bool = False) -> bytes:
+        data = text.getvalue().encode()
+        text.seek(0)
+        text.truncate()
+        if gzipper is not None:
+            data = gzipper.compress(data)
+            if final:
+                data += gzipper.flush()
+        return data
+
+    async for record in iter_history(user_id):
+        if writer is not None:
+            writer.writerow(_csv_row(record))
+        else:
+            text.write(_ndjson_line(record))
+        if text.tell() >= _FLUSH_BYTES:
+            chunk = _drain()
+            if chunk:
+                yield chunk
+    chunk = _drain(final=True)
+    if chunk:
+        yield chunk
+
+
+def export_filename(fmt: str, compress: bool) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return f"mindpulse-export-{stamp}.{fmt}" + (".gz" if compress else "")
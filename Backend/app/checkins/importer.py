@@ -0,0 +1,249 @@
+"""
+Bulk check-in import.
+
+`POST /checkins/import` reads the request body as a stream of CSV (header row with
+`mood`, `sleep_hours` and optionally `notes`, `created_at`) or NDJSON records. Rows
+are validated with `CheckinImportRow` and written in chunks of `IMPORT_CHUNK_SIZE`:
+one multi-row insert for the check-ins, one vectorized scoring pass
+(`app.ai.batch.batch_results`) and one insert for the analyses, the day rollups
+merged, then a commit. Memory is bounded by the chunk size and the longest accepted
+line or record (`IMPORT_MAX_RECORD_LENGTH`) whatever the file size.
+
+Imported rows are history: they are analysed inline (no queue jobs) and raise no
+alerts. Invalid rows are skipped and reported by line number.
+"""
+import codecs
+import csv
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.batch import batch_results
+from app.checkins.streaks import rebuild_streak
+from app.core.cache import invalidate_user_on_commit
+from app.core.etag import bump_data_version
+from app.core.config import settings
+from app.insights.baselines import rebuild_baselines
+from app.insights.rollups import fold_checkin, merge_rollups, new_rollup_row, rollup_day
+from app.models.models import AIAnalysisResult, DailyCheckin
+from app.schemas.schemas import CheckinImportRow
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+REQUIRED_COLUMNS = {"mood", "sleep_hours"}
+
+# Tolerated clock skew for `created_at` in the future
+_FUTURE_SKEW = timedelta(minutes=5)
+
+# (line number, parsed record); the record is a ValueError when the line could not be parsed
+Record = Tuple[int, Any]
+
+
+def import_format(content_type: str, requested: Optional[str] = None) -> str:
+    if requested:
+        fmt = requested.lower()
+    else:
+        media_type = content_type.split(";")[0].strip().lower()
+        fmt = "csv" if media_type in CSV_TYPES else "ndjson" if media_type in NDJSON_TYPES else ""
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson (or ?format=csv|ndjson)")
+    return fmt
+
+
+# ===== Parsing =====
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int = settings.IMPORT_MAX_RECORD_LENGTH
+) -> AsyncIterator[Tuple[int, str]]:
+    """Decode a UTF-8 byte stream into numbered lines without buffering the whole body.
+
+    A line longer than `max_length` characters rejects the body rather than being
+    buffered whole.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    number = 0
+
+    def too_long() -> HTTPException:
+        return HTTPException(status_code=400, detail=f"Line {number + 1} is longer than {max_length} characters")
+
+    try:
+        async for chunk in chunks:
+            *complete, rest = decoder.decode(chunk).split("\n")
+            if complete:
+                complete[0] = buffer + complete[0]
+                buffer = rest
+            else:
+                buffer += rest
+            for line in complete:
+                if len(line) > max_length:
+                    raise too_long()
+                number += 1
+                yield number, line.rstrip("\r")
+            if len(buffer) > max_length:
+                raise too_long()
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8 (after line {number})")
+    if buffer:
+        yield number + 1, buffer.rstrip("\r")
+
+
+async def csv_records(
+    lines: AsyncIterator[Tuple[int, str]], max_length: int = settings.IMPORT_MAX_RECORD_LENGTH
+) -> AsyncIterator[Record]:
+    """Parse CSV records, which may span lines inside quoted fields.
+
+    Lines are collected until the quotes balance, keeping a running count so each line
+    is scanned once, and the record's lines are then parsed by `csv.reader`. A record
+    longer than `max_length` characters (usually a stray quote that never closes) is
+    reported as one error, and parsing resumes on the next line.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    length = 0
+    quotes = 0
+    start = 0
+    async for number, line in lines:
+        if not pending:
+            start = number
+        pending.append(line + "\n")
+        length += len(line) + 1
+        quotes += line.count('"')
+        if length > max_length:
+            yield start, ValueError(
+                f"Record is longer than {max_length} characters (unbalanced quote?); lines {start}-{number} skipped"
+            )
+            pending, length, quotes = [], 0, 0
+            continue
+        if quotes % 2:
+            continue  # a quoted field continues on the next line
+        record, pending, length, quotes = pending, [], 0, 0
+        if len(record) == 1 and not record[0].strip():
+            continue
+        values = next(csv.reader(record))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            missing = REQUIRED_COLUMNS - set(header)
+            if missing:
+                raise HTTPException(status_code=400, detail=f"CSV header is missing: {', '.join(sorted(missing))}")
+            continue
+        # Empty cells mean "not given" (e.g. no created_at)
+        yield start, {name: value for name, value in zip(header, values) if value != ""}
+    if pending:
+        yield start, ValueError("Unterminated quoted field")
+
+
+async def ndjson_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Record]:
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def _validate(record: Any, now: datetime) -> CheckinImportRow:
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Malformed record")
+    row = CheckinImportRow.model_validate(record)
+    if row.created_at is not None:
+        if row.created_at.tzinfo is None:
+            row.created_at = row.created_at.replace(tzinfo=timezone.utc)
+        if row.created_at > now + _FUTURE_SKEW:
+            raise ValueError("created_at: must not be in the future")
+    return row
+
+
+# ===== Writing =====
+async def _write_chunk(db: AsyncSession, user_id: str, rows: List[CheckinImportRow], now: datetime) -> None:
+    checkins = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "mood": row.mood,
+            "sleep_hours": row.sleep_hours,
+            "notes": row.notes,
+            "created_at": row.created_at or now,
+        }
+        for row in rows
+    ]
+    await db.execute(insert(DailyCheckin), checkins)
+
+    mood = np.fromiter((c["mood"] for c in checkins), dtype=np.int64, count=len(checkins))
+    sleep = np.fromiter((c["sleep_hours"] for c in checkins), dtype=np.float64, count=len(checkins))
+    results = batch_results(
+        [c["id"] for c in checkins], [user_id] * len(checkins), mood, sleep, notes=[c["notes"] for c in checkins]
+    )
+    for checkin, result in zip(checkins, results):
+        result["created_at"] = checkin["created_at"]
+    await db.execute(insert(AIAnalysisResult), results)
+
+    days: Dict[date, Dict[str, Any]] = {}
+    for checkin, result in zip(checkins, results):
+        day = rollup_day(checkin["created_at"])
+        row = days.get(day)
+        if row is None:
+            row = days[day] = new_rollup_row(user_id, day, checkin["mood"], checkin["sleep_hours"])
+        fold_checkin(row, checkin["mood"], checkin["sleep_hours"], result["labels"]["stress_level"])
+    await merge_rollups(db, days)
+
+    await bump_data_version(db, user_id)
+    invalidate_user_on_commit(db, user_id)
+    await db.commit()
+
+
+async def import_records(
+    db: AsyncSession,
+    user_id: str,
+    records: AsyncIterator[Record],
+    chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Validate and store `records` chunk by chunk (committing each); returns a summary."""
+    now = datetime.now(timezone.utc)
+    imported = 0
+    skipped = 0
+    chunks = 0
+    errors: List[Dict[str, Any]] = []
+    batch: List[CheckinImportRow] = []
+
+    async for line, record in records:
+        try:
+            batch.append(_validate(record, now))
+        except ValueError as exc:  # includes pydantic's ValidationError
+            skipped += 1
+            if len(errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                message = _describe(exc) if isinstance(exc, ValidationError) else str(exc)
+                errors.append({"line": line, "error": message})
+            continue
+        if len(batch) >= chunk_size:
+            await _write_chunk(db, user_id, batch, now)
+            imported += len(batch)
+            chunks += 1
+            batch = []
+    if batch:
+        await _write_chunk(db, user_id, batch, now)
+        imported += len(batch)
+        chunks += 1
+
+    if imported:
+        await rebuild_streak(db, user_id)
+        await rebuild_baselines(db, user_id=user_id)
+        await bump_data_version(db, user_id)
+        invalidate_user_on_commit(db, user_id)
+    return {"imported": imported, "skipped": skipped, "chunks": chunks, "errors": errors}
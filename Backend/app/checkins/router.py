@@ -1,33 +1,33 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-from app.database.session import get_db
-from app.core.deps import get_current_user
-from app.models.models import User, DailyCheckin, AIAnalysisResult
+from app.database.session import get_db, get_read_db
+from app.core.deps import get_current_user, Principal
+from app.core.cache import invalidate_user_on_commit
+from app.core.etag import bump_data_version, conditional_get
+from app.core.pagination import clamp_limit, keyset_page, split_page, count_total, set_page_headers
+from app.core.responses import RowSerializer, envelope_response
+from app.models.models import DailyCheckin, AIAnalysisResult
 from app.schemas.schemas import CheckinRequest, CheckinResponse
-from app.ai.service import analyze_checkin
+from app.ai.queue import enqueue_analysis, worker_pool
+from app.insights.rollups import record_checkin
+from app.checkins.streaks import update_streak
+from app.checkins.importer import import_format, iter_lines, csv_records, ndjson_records, import_records
+from app.checkins.exporter import MEDIA_TYPES, export_stream, export_filename
 
 router = APIRouter(prefix="/checkins", tags=["Check-ins"])
 
-
-async def _run_analysis(checkin_id: str, user_id: str):
-    """Background task to run AI analysis on a check-in."""
-    from app.database.session import async_session
-    async with async_session() as db:
-        result = await db.execute(select(DailyCheckin).where(DailyCheckin.id == checkin_id))
-        checkin = result.scalar_one_or_none()
-        if checkin:
-            await analyze_checkin(checkin, db)
-            await db.commit()
+checkin_rows = RowSerializer(CheckinResponse)
 
 
 @router.post("")
 async def create_checkin(
     data: CheckinRequest,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     checkin = DailyCheckin(
@@ -38,9 +38,14 @@ async def create_checkin(
     )
     db.add(checkin)
     await db.flush()
+    await record_checkin(db, checkin)
+    await update_streak(db, checkin)
+    await bump_data_version(db, current_user.id)
+    invalidate_user_on_commit(db, current_user.id)
 
-    # Trigger AI analysis in background
-    background_tasks.add_task(_run_analysis, checkin.id, current_user.id)
+    # Queue AI analysis (committed with the check-in, picked up by the worker pool)
+    await enqueue_analysis(db, checkin)
+    worker_pool.notify()
 
     return {
         "ok": True,
@@ -52,35 +57,70 @@ async def create_checkin(
     }
 
 
-@router.get("")
+@router.post("/import")
+async def import_checkins(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Bulk-load check-in history from a streamed CSV or NDJSON body."""
+    fmt = import_format(request.headers.get("content-type", ""), format)
+    lines = iter_lines(request.stream())
+    records = csv_records(lines) if fmt == "csv" else ndjson_records(lines)
+    summary = await import_records(db, current_user.id, records)
+    return {"ok": True, "data": summary, "error": None}
+
+
+@router.get("/export")
+async def export_checkins(
+    format: str = "ndjson",
+    gzip: bool = False,
+    current_user: Principal = Depends(get_current_user),
+):
+    """Stream the user's full history (check-ins, analyses, alerts) as NDJSON or CSV."""
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    filename = export_filename(format, gzip)
+    return StreamingResponse(
+        export_stream(current_user.id, format, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("", dependencies=[Depends(conditional_get(time_relative=True))])
 async def list_checkins(
     range: str = "30d",
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     days = int(range.replace("d", "")) if range.endswith("d") else 30
     since = datetime.now(timezone.utc) - timedelta(days=days)
+    limit = clamp_limit(limit)
 
-    result = await db.execute(
-        select(DailyCheckin)
+    query = (
+        select(*checkin_rows.columns(DailyCheckin))
         .where(DailyCheckin.user_id == current_user.id)
         .where(DailyCheckin.created_at >= since)
-        .order_by(desc(DailyCheckin.created_at))
     )
-    checkins = result.scalars().all()
+    result = await db.execute(keyset_page(query, DailyCheckin.created_at, DailyCheckin.id, cursor, limit))
+    checkins, next_cursor = split_page(result.all(), limit)
+    total = await count_total(db, query) if include_total else None
 
-    return {
-        "ok": True,
-        "data": [CheckinResponse.model_validate(c) for c in checkins],
-        "error": None,
-    }
+    response = envelope_response(checkin_rows.dump_json(checkins))
+    set_page_headers(response, next_cursor, total)
+    return response
 
 
 @router.get("/{checkin_id}")
 async def get_checkin(
     checkin_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(DailyCheckin)
@@ -88,7 +128,6 @@ async def get_checkin(
     )
     checkin = result.scalar_one_or_none()
     if not checkin:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Check-in not found")
 
     return {
@@ -0,0 +1,115 @@
+"""
+Check-in streaks, maintained incrementally in the user's timezone.
+
+`update_streak` runs in the same transaction as `create_checkin` and only looks at
+the stored row (created if missing and locked, so concurrent check-ins of one user
+take turns), so reading or updating a streak costs the same regardless of how
+many check-ins a user has. Streak days are calendar days in the timezone from
+`UserSettings.preferences["timezone"]` (UTC when unset or unknown).
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.upsert import lock_rows
+from app.models.models import DailyCheckin, User, UserSettings, UserStreak
+
+
+def resolve_timezone(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def local_day(moment: datetime, tz: ZoneInfo) -> date:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(tz).date()
+
+
+def current_streak(streak: Optional[UserStreak], now: Optional[datetime] = None) -> int:
+    """Streak still alive as of `now`: the last check-in was today or yesterday locally."""
+    if streak is None or streak.last_checkin_day is None:
+        return 0
+    today = local_day(now or datetime.now(timezone.utc), resolve_timezone(streak.tz_name))
+    if streak.last_checkin_day >= today - timedelta(days=1):
+        return streak.current_streak
+    return 0
+
+
+async def _user_tz_name(db: AsyncSession, user_id: str) -> str:
+    result = await db.execute(select(UserSettings.preferences).where(UserSettings.user_id == user_id))
+    preferences = result.scalar_one_or_none() or {}
+    return resolve_timezone(preferences.get("timezone")).key
+
+
+async def _lock_streak(db: AsyncSession, user_id: str, tz_name: Optional[str] = None) -> UserStreak:
+    """The user's streak row, created if missing and locked until the transaction ends."""
+    (streak,) = await lock_rows(db, UserStreak, [{"user_id": user_id, "current_streak": 0, "longest_streak": 0}])
+    if streak.last_checkin_day is None:
+        # No streak day counted yet: count in the user's current timezone
+        streak.tz_name = tz_name or await _user_tz_name(db, user_id)
+    return streak
+
+
+async def update_streak(db: AsyncSession, checkin: DailyCheckin) -> UserStreak:
+    """Extend, restart or keep the user's streak for a newly created check-in."""
+    streak = await _lock_streak(db, checkin.user_id)
+
+    day = local_day(checkin.created_at, resolve_timezone(streak.tz_name))
+    last = streak.last_checkin_day
+    if last is None or day > last + timedelta(days=1):
+        streak.current_streak = 1
+        streak.last_checkin_day = day
+    elif day == last + timedelta(days=1):
+        streak.current_streak += 1
+        streak.last_checkin_day = day
+    # Same day (or a back-dated check-in) leaves the streak unchanged;
+    # back-dated history is folded in by `rebuild_streak`.
+    streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+    await db.flush()
+    return streak
+
+
+async def rebuild_streak(db: AsyncSession, user_id: str, tz_name: Optional[str] = None) -> UserStreak:
+    """Recompute a user's streak from their check-in history, e.g. after a timezone change."""
+    if tz_name is None:
+        tz_name = await _user_tz_name(db, user_id)
+    tz = resolve_timezone(tz_name)
+
+    current = longest = 0
+    last: Optional[date] = None
+    stream = await db.stream(
+        select(DailyCheckin.created_at)
+        .where(DailyCheckin.user_id == user_id)
+        .order_by(DailyCheckin.created_at)
+        .execution_options(yield_per=1000)
+    )
+    async for (created_at,) in stream:
+        day = local_day(created_at, tz)
+        if last is not None and day == last:
+            continue
+        current = current + 1 if last is not None and day == last + timedelta(days=1) else 1
+        longest = max(longest, current)
+        last = day
+
+    streak = await _lock_streak(db, user_id, tz.key)
+    streak.current_streak = current
+    streak.longest_streak = longest
+    streak.last_checkin_day = last
+    streak.tz_name = tz.key
+    await db.flush()
+    return streak
+
+
+async def rebuild_streaks(db: AsyncSession) -> int:
+    """Recompute every user's streak; returns the number of users processed."""
+    result = await db.execute(select(User.id))
+    user_ids = result.scalars().all()
+    for user_id in user_ids:
+        await rebuild_streak(db, user_id)
+    return len(user_ids)
@@ -0,0 +1,166 @@
+"""
+Maintenance commands.
+
+    python -m app.cli rebuild-rollups [--user-id ID]
+    python -m app.cli rebuild-streaks [--user-id ID]
+    python -m app.cli rebuild-baselines [--user-id ID]
+    python -m app.cli rescore [--rules PATH] [--chunk-size N] [--workers N] [--user-id ID] [--skip-rollups]
+    python -m app.cli requeue-analysis
+    python -m app.cli rebuild-snapshots
+    python -m app.cli compact-alerts [--window-hours H] [--user-id ID]
+"""
+import argparse
+import asyncio
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.etag import bump_data_versions
+from app.database.session import async_session, engine, init_db
+
+
+def _users(args: argparse.Namespace):
+    """Users whose data a command rewrote (None = everyone), for `bump_data_versions`."""
+    return [args.user_id] if args.user_id else None
+
+
+async def _rebuild_rollups(args: argparse.Namespace):
+    from app.insights.rollups import rebuild_rollups
+
+    async with async_session() as db:
+        written = await rebuild_rollups(db, user_id=args.user_id)
+        await bump_data_versions(db, _users(args))
+        await db.commit()
+    logger.info(f"Rebuilt {written} daily rollup rows")
+
+
+async def _rebuild_streaks(args: argparse.Namespace):
+    from app.checkins.streaks import rebuild_streak, rebuild_streaks
+
+    async with async_session() as db:
+        if args.user_id:
+            await rebuild_streak(db, args.user_id)
+            count = 1
+        else:
+            count = await rebuild_streaks(db)
+        await bump_data_versions(db, _users(args))
+        await db.commit()
+    logger.info(f"Rebuilt check-in streaks for {count} users")
+
+
+async def _rebuild_baselines(args: argparse.Namespace):
+    from app.insights.baselines import rebuild_baselines
+
+    async with async_session() as db:
+        count = await rebuild_baselines(db, user_id=args.user_id)
+        await bump_data_versions(db, _users(args))
+        await db.commit()
+    logger.info(f"Rebuilt mood/sleep baselines for {count} users")
+
+
+async def _rescore(args: argparse.Namespace):
+    from app.ai.batch import rescore_checkins, log_progress
+    from app.ai.rules import current_rules, load_rules
+    from app.insights.rollups import rebuild_rollups
+
+    rules = load_rules(args.rules) if args.rules else current_rules()
+    async with async_session() as db:
+        written = await rescore_checkins(
+            db,
+            rules,
+            chunk_size=args.chunk_size,
+            user_id=args.user_id,
+            progress=log_progress,
+            workers=args.workers,
+        )
+        logger.info(f"Re-scored {written} check-ins as {rules.model_version}")
+        if written and not args.skip_rollups:
+            # Stress buckets in the rollups derive from the analysis labels
+            rows = await rebuild_rollups(db, user_id=args.user_id)
+            await bump_data_versions(db, _users(args))
+            await db.commit()
+            logger.info(f"Rebuilt {rows} daily rollup rows")
+
+
+async def _requeue_analysis(args: argparse.Namespace):
+    from app.ai.queue import requeue_analysis
+
+    async with async_session() as db:
+        counts = await requeue_analysis(db)
+        await db.commit()
+    logger.info(f"Revived {counts['revived']} dead-lettered jobs, queued {counts['enqueued']} unanalysed check-ins")
+
+
+async def _rebuild_snapshots(args: argparse.Namespace):
+    from app.admin.snapshots import rebuild_snapshots
+
+    async with async_session() as db:
+        written = await rebuild_snapshots(db)
+        await db.commit()
+    logger.info(f"Rebuilt {written} daily platform snapshots")
+
+
+async def _compact_alerts(args: argparse.Namespace):
+    from app.alerts.coalesce import compact_alerts
+
+    async with async_session() as db:
+        counts = await compact_alerts(db, window_hours=args.window_hours, user_id=args.user_id)
+        await bump_data_versions(db, _users(args))
+        await db.commit()
+    logger.info(f"Removed {counts['removed']} duplicate alerts, merged into {counts['kept']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="MindPulse maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups = commands.add_parser("rebuild-rollups", help="Recompute per-user daily dashboard rollups")
+    rollups.add_argument("--user-id", help="Only rebuild this user's rollups")
+    rollups.set_defaults(handler=_rebuild_rollups)
+
+    streaks = commands.add_parser("rebuild-streaks", help="Recompute check-in streaks in each user's timezone")
+    streaks.add_argument("--user-id", help="Only rebuild this user's streak")
+    streaks.set_defaults(handler=_rebuild_streaks)
+
+    baselines = commands.add_parser("rebuild-baselines", help="Recompute per-user mood/sleep baselines")
+    baselines.add_argument("--user-id", help="Only rebuild this user's baseline")
+    baselines.set_defaults(handler=_rebuild_baselines)
+
+    rescore = commands.add_parser("rescore", help="Re-score check-in history not yet scored by the current rules")
+    rescore.add_argument("--rules", help="Score with this rules file instead of the active one")
+    rescore.add_argument("--chunk-size", type=int, default=5000)
+    rescore.add_argument(
+        "--workers", type=int, default=settings.NOTES_ANALYZER_WORKERS,
+        help="Processes scanning notes (0 = one per CPU, 1 = in-process)",
+    )
+    rescore.add_argument("--user-id", help="Only re-score this user's check-ins")
+    rescore.add_argument("--skip-rollups", action="store_true", help="Do not rebuild daily rollups afterwards")
+    rescore.set_defaults(handler=_rescore)
+
+    requeue = commands.add_parser(
+        "requeue-analysis", help="Retry dead-lettered analysis jobs and queue check-ins missing an analysis"
+    )
+    requeue.set_defaults(handler=_requeue_analysis)
+
+    snapshots = commands.add_parser("rebuild-snapshots", help="Recompute daily platform snapshots from scratch")
+    snapshots.set_defaults(handler=_rebuild_snapshots)
+
+    compact = commands.add_parser("compact-alerts", help="Merge repeated alerts written before coalescing")
+    compact.add_argument("--window-hours", type=float, default=settings.ALERT_COALESCE_WINDOW_HOURS)
+    compact.add_argument("--user-id", help="Only compact this user's alerts")
+    compact.set_defaults(handler=_compact_alerts)
+
+    args = parser.parse_args(argv)
+
+    async def _run():
+        try:
+            await init_db()
+            await args.handler(args)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select, delete, func, case, desc, distinct
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+
+from app.database.session import get_db, get_read_db
+from app.core.deps import require_role, Principal
+from app.models.models import (
+    User, UserRole, AIAnalysisResult, Alert, AlertStatus, AlertType, DailyRollup, CoachAssignment,
+)
+from app.insights.rollups import RISK_BUCKETS, STRESS_BUCKETS, risk_bucket_column
+from app.schemas.schemas import (
+    CoachAssignmentRequest, CoachAssignmentResponse, CoachClientSummary, CohortWindow, CohortResponse,
+)
+
+router = APIRouter(tags=["Coach"])
+
+
+def _range_days(range: str) -> int:
+    return int(range.replace("d", "")) if range.endswith("d") else 7
+
+
+# ===== Queries (one grouped statement each, over the coach's active clients) =====
+def client_ids(coach_id: str) -> Select:
+    return (
+        select(CoachAssignment.client_id)
+        .join(User, User.id == CoachAssignment.client_id)
+        .where(CoachAssignment.coach_id == coach_id, User.is_active.is_(True))
+    )
+
+
+def cohort_rollups_query(coach_id: str, since: date, previous_since: date) -> Select:
+    """Rollup totals for the current window and the one before it, one row per window."""
+    window = case((DailyRollup.day >= since, "current"), else_="previous").label("window")
+    return (
+        select(
+            window,
+            func.count(distinct(DailyRollup.user_id)),
+            func.sum(DailyRollup.checkin_count),
+            func.sum(DailyRollup.mood_sum),
+            func.sum(DailyRollup.sleep_sum),
+            func.sum(DailyRollup.stress_low),
+            func.sum(DailyRollup.stress_medium),
+            func.sum(DailyRollup.stress_high),
+            func.sum(DailyRollup.stress_critical),
+        )
+        .where(DailyRollup.user_id.in_(client_ids(coach_id)), DailyRollup.day >= previous_since)
+        .group_by(window)
+    )
+
+
+def risk_distribution_query(coach_id: str, since: datetime) -> Select:
+    bucket = risk_bucket_column().label("bucket")
+    return (
+        select(bucket, func.count(AIAnalysisResult.id), func.count(distinct(AIAnalysisResult.user_id)))
+        .where(AIAnalysisResult.user_id.in_(client_ids(coach_id)), AIAnalysisResult.created_at >= since)
+        .group_by(bucket)
+    )
+
+
+def at_risk_clients_query(coach_id: str) -> Select:
+    latest = func.max(Alert.created_at)
+    return (
+        select(User.id, User.full_name, func.count(Alert.id), latest)
+        .join(Alert, Alert.user_id == User.id)
+        .where(
+            User.id.in_(client_ids(coach_id)),
+            Alert.status == AlertStatus.OPEN,
+            Alert.type == AlertType.RISK_DETECTED,
+        )
+        .group_by(User.id, User.full_name)
+        .order_by(desc(latest))
+    )
+
+
+def client_summaries_query(coach_id: str, since: date) -> Select:
+    clients = client_ids(coach_id)
+    rollups = (
+        select(
+            DailyRollup.user_id,
+            func.sum(DailyRollup.checkin_count).label("checkins"),
+            func.sum(DailyRollup.mood_sum).label("mood_sum"),
+            func.sum(DailyRollup.sleep_sum).label("sleep_sum"),
+            func.max(DailyRollup.day).label("last_day"),
+        )
+        .where(DailyRollup.user_id.in_(clients), DailyRollup.day >= since)
+        .group_by(DailyRollup.user_id)
+        .subquery()
+    )
+    alerts = (
+        select(
+            Alert.user_id,
+            func.count(Alert.id).label("open_alerts"),
+            func.sum(case((Alert.type == AlertType.RISK_DETECTED, 1), else_=0)).label("open_risk_alerts"),
+        )
+        .where(Alert.user_id.in_(clients), Alert.status == AlertStatus.OPEN)
+        .group_by(Alert.user_id)
+        .subquery()
+    )
+    return (
+        select(
+            User.id, User.full_name, User.email,
+            rollups.c.checkins, rollups.c.mood_sum, rollups.c.sleep_sum, rollups.c.last_day,
+            alerts.c.open_alerts, alerts.c.open_risk_alerts,
+        )
+        .where(User.id.in_(clients))
+        .outerjoin(rollups, rollups.c.user_id == User.id)
+        .outerjoin(alerts, alerts.c.user_id == User.id)
+        .order_by(User.full_name)
+    )
+
+
+def _average(total: Optional[float], count: Optional[int]) -> Optional[float]:
+    return round(total / count, 1) if count else None
+
+
+def _delta(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    if current is None or previous is None:
+        return None
+    return round(current - previous, 1)
+
+
+def _window(row: Optional[Any]) -> CohortWindow:
+    if row is None:
+        return CohortWindow(
+            active_clients=0, checkins=0, avg_mood=None, avg_sleep=None,
+            stress_distribution=[{"name": name, "value": 0} for name in STRESS_BUCKETS],
+        )
+    _, active, checkins, mood_sum, sleep_sum, *stress = row
+    return CohortWindow(
+        active_clients=active,
+        checkins=checkins or 0,
+        avg_mood=_average(mood_sum, checkins),
+        avg_sleep=_average(sleep_sum, checkins),
+        stress_distribution=[{"name": name, "value": value or 0} for name, value in zip(STRESS_BUCKETS, stress)],
+    )
+
+
+async def _get_user(db: AsyncSession, user_id: str, label: str) -> User:
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    return user
+
+
+async def _cohort_coach_id(db: AsyncSession, current_user: Principal, coach_id: Optional[str]) -> str:
+    """The coach whose clients are shown: the caller, or for admins the coach named by `coach_id`."""
+    if current_user.role != UserRole.ADMIN:
+        if coach_id is not None and coach_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Coaches can only view their own clients")
+        return current_user.id
+    if coach_id is None:
+        raise HTTPException(status_code=400, detail="coach_id is required for admins")
+    coach = await _get_user(db, coach_id, "Coach")
+    if coach.role != UserRole.COACH:
+        raise HTTPException(status_code=400, detail="User is not a coach")
+    return coach.id
+
+
+# ===== Coach: Cohort Analytics =====
+@router.get("/coach/cohort")
+async def get_cohort(
+    range: str = "7d",
+    coach_id: Optional[str] = None,
+    current_user: Principal = Depends(require_role(UserRole.COACH, UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Cohort aggregates over the coach's clients, compared with the preceding window.
+
+    Admins pass `coach_id` to view a coach's cohort.
+    """
+    coach_id = await _cohort_coach_id(db, current_user, coach_id)
+    days = _range_days(range)
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=days)
+
+    client_count = (await db.execute(select(func.count()).select_from(client_ids(coach_id).subquery()))).scalar() or 0
+
+    rows = (await db.execute(cohort_rollups_query(coach_id, since.date(), since.date() - timedelta(days=days)))).all()
+    windows = {row[0]: row for row in rows}
+    current = _window(windows.get("current"))
+    previous = _window(windows.get("previous"))
+
+    risk_rows = {bucket: (checkins, users) for bucket, checkins, users in (await db.execute(
+        risk_distribution_query(coach_id, since)
+    )).all()}
+    risk_distribution = [
+        {"name": name, "value": risk_rows.get(name, (0, 0))[0], "clients": risk_rows.get(name, (0, 0))[1]}
+        for name in RISK_BUCKETS
+    ]
+
+    at_risk = [
+        {"id": user_id, "full_name": full_name, "open_risk_alerts": count, "latest_alert_at": latest}
+        for user_id, full_name, count, latest in (await db.execute(at_risk_clients_query(coach_id))).all()
+    ]
+
+    data = CohortResponse(
+        range_days=days,
+        clients=client_count,
+        current=current,
+        previous=previous,
+        deltas={
+            "avg_mood": _delta(current.avg_mood, previous.avg_mood),
+            "avg_sleep": _delta(current.avg_sleep, previous.avg_sleep),
+            "checkins": float(current.checkins - previous.checkins),
+            "active_clients": float(current.active_clients - previous.active_clients),
+        },
+        risk_distribution=risk_distribution,
+        at_risk_clients=at_risk,
+    )
+    return {"ok": True, "data": data, "error": None}
+
+
+@router.get("/coach/clients")
+async def list_coach_clients(
+    range: str = "7d",
+    coach_id: Optional[str] = None,
+    current_user: Principal = Depends(require_role(UserRole.COACH, UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    coach_id = await _cohort_coach_id(db, current_user, coach_id)
+    since = datetime.now(timezone.utc) - timedelta(days=_range_days(range))
+    result = await db.execute(client_summaries_query(coach_id, since.date()))
+    clients = [
+        CoachClientSummary(
+            id=user_id,
+            full_name=full_name,
+            email=email,
+            checkins=checkins or 0,
+            avg_mood=_average(mood_sum, checkins),
+            avg_sleep=_average(sleep_sum, checkins),
+            last_checkin_day=last_day,
+            open_alerts=open_alerts or 0,
+            open_risk_alerts=open_risk_alerts or 0,
+        )
+        for user_id, full_name, email, checkins, mood_sum, sleep_sum, last_day, open_alerts, open_risk_alerts
+        in result.all()
+    ]
+    return {"ok": True, "data": clients, "error": None}
+
+
+# ===== Admin: Coach Assignments =====
+@router.get("/admin/coaches/{coach_id}/clients")
+async def admin_list_assignments(
+    coach_id: str,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(
+        select(User.id, User.full_name, User.email, CoachAssignment.created_at)
+        .join(CoachAssignment, CoachAssignment.client_id == User.id)
+        .where(CoachAssignment.coach_id == coach_id)
+        .order_by(User.full_name)
+    )
+    assignments = [
+        CoachAssignmentResponse(client_id=client_id, full_name=full_name, email=email, assigned_at=assigned_at)
+        for client_id, full_name, email, assigned_at in result.all()
+    ]
+    return {"ok": True, "data": assignments, "error": None}
+
+
+@router.post("/admin/coaches/{coach_id}/clients")
+async def admin_assign_client(
+    coach_id: str,
+    data: CoachAssignmentRequest,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db),
+):
+    coach = await _get_user(db, coach_id, "Coach")
+    if coach.role != UserRole.COACH:
+        raise HTTPException(status_code=400, detail="User is not a coach")
+    client = await _get_user(db, data.client_id, "Client")
+    if client.id == coach.id:
+        raise HTTPException(status_code=400, detail="A coach cannot be their own client")
+
+    existing = await db.execute(
+        select(CoachAssignment.id).where(CoachAssignment.coach_id == coach.id, CoachAssignment.client_id == client.id)
+    )
+    if existing.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="Client already assigned to this coach")
+
+    assignment = CoachAssignment(coach_id=coach.id, client_id=client.id)
+    db.add(assignment)
+    await db.flush()
+    return {
+        "ok": True,
+        "data": CoachAssignmentResponse(
+            client_id=client.id, full_name=client.full_name, email=client.email, assigned_at=assignment.created_at
+        ),
+        "error": None,
+    }
+
+
+@router.delete("/admin/coaches/{coach_id}/clients/{client_id}")
+async def admin_unassign_client(
+    coach_id: str,
+    client_id: str,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        delete(CoachAssignment).where(CoachAssignment.coach_id == coach_id, CoachAssignment.client_id == client_id)
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    return {"ok": True, "data": {"message": "Client unassigned"}, "error": None}
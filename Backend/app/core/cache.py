@@ -0,0 +1,132 @@
+"""
+Bounded in-process LRU cache with per-entry TTL and tag-based invalidation.
+
+`response_cache` holds rendered read-endpoint payloads keyed by
+`(user_id, endpoint, variant, etag)` and tagged with the user id. The ETag carries the
+user's data version (`app.core.etag`), so a read that computed its payload before a
+write committed stores it under the old version, where no newer request looks it up.
+Writers call `invalidate_user_on_commit` (or `invalidate_on_commit` for other caches)
+so superseded entries are dropped once the transaction that changed the data commits
+instead of waiting for their TTL.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Optional[Hashable]]]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, tag: Optional[Hashable] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl is None else ttl)
+        self._entries[key] = (expires_at, value, tag)
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+            self.invalidations += 1
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tag = self._entries.pop(key)
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+response_cache = TTLCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+_PENDING_KEY = "cache_invalidations"
+
+
+def invalidate_on_commit(db: AsyncSession, cache: TTLCache, tag: Hashable) -> None:
+    """Drop `cache` entries tagged `tag` once `db` commits."""
+    db.info.setdefault(_PENDING_KEY, set()).add((cache, tag))
+
+
+def invalidate_user_on_commit(db: AsyncSession, user_id: str) -> None:
+    """Drop the user's cached responses once `db` commits."""
+    invalidate_on_commit(db, response_cache, user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    for cache, tag in session.info.pop(_PENDING_KEY, ()):
+        cache.invalidate_tag(tag)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -10,6 +10,25 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./mindpulse.db"
+    # Apply pending Alembic migrations at startup (otherwise refuse to start on an old schema)
+    DB_AUTO_MIGRATE: bool = True
+    # Optional read replica for GET handlers (empty = use DATABASE_URL)
+    DATABASE_READ_URL: str = ""
+
+    # Engine profile: SQLite
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Engine profile: pooled servers (Postgres via asyncpg)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache per connection; set 0 behind PgBouncer (transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     # JWT
     SECRET_KEY: str = "your-super-secret-key-change-in-production-32chars"
@@ -17,6 +36,75 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Analysis
+    # Scoring rules file (empty = bundled app/ai/wellness_rules.json); re-read when its mtime changes
+    ANALYSIS_RULES_PATH: str = ""
+    ANALYSIS_RULES_RELOAD_SECONDS: float = 5.0
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_BATCH_SIZE: int = 50
+    ANALYSIS_POLL_INTERVAL_SECONDS: float = 1.0
+    ANALYSIS_MAX_ATTEMPTS: int = 5
+    ANALYSIS_RETRY_BACKOFF_SECONDS: float = 5.0
+    ANALYSIS_JOB_LEASE_SECONDS: float = 300.0
+
+    # Notes lexicon scan during `rescore`: worker processes (0 = one per CPU, 1 = in-process)
+    NOTES_ANALYZER_WORKERS: int = 0
+
+    # Conditional GET: ETags of time-relative endpoints (dashboard, check-in ranges) also
+    # change every ETAG_TIME_BUCKET_SECONDS, so date windows and streaks roll over
+    ETAG_TIME_BUCKET_SECONDS: int = 3600
+
+    # Per-user baselines: z-scores need BASELINE_MIN_CHECKINS earlier check-ins; a trend is
+    # improving/declining once the 7-day EWMA is this far from the 30-day one
+    BASELINE_MIN_CHECKINS: int = 5
+    BASELINE_TREND_THRESHOLD_MOOD: float = 0.5
+    BASELINE_TREND_THRESHOLD_SLEEP: float = 0.5
+
+    # Bulk check-in import
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 50
+    # Longest accepted line or CSV record (a record spans lines inside a quoted field), in characters
+    IMPORT_MAX_RECORD_LENGTH: int = 16384
+
+    # History export (check-ins per read session)
+    EXPORT_PAGE_SIZE: int = 1000
+
+    # Alert coalescing: a repeat of an open alert of the same type within the window
+    # updates it (occurrence_count, last_seen_at) instead of adding a row; 0 disables
+    ALERT_COALESCE_WINDOW_HOURS: float = 72.0
+
+    # Real-time alert stream (SSE): "memory" for one process, "postgres" for LISTEN/NOTIFY across workers
+    ALERT_STREAM_BACKEND: str = "memory"
+    ALERT_STREAM_QUEUE_SIZE: int = 100
+    ALERT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    ALERT_STREAM_MAX_PER_USER: int = 5
+    ALERT_STREAM_REPLAY_LIMIT: int = 100
+
+    # Platform snapshots for admin analytics (0 disables the in-process job)
+    SNAPSHOT_INTERVAL_SECONDS: float = 300.0
+
+    # Verified token cache (decode_token)
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # Authenticated principal cache (get_current_user)
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # Observability
+    METRICS_ENABLED: bool = True
+
+    # Pagination
+    MAX_PAGE_SIZE: int = 100
+
+    # Response cache (dashboard, insights, alerts)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:5173", 
@@ -1,15 +1,55 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database.session import get_db
+from app.core.cache import TTLCache, invalidate_on_commit
+from app.core.config import settings
 from app.core.security import decode_token
 from app.models.models import User, UserRole
 
 
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user, safe to cache across requests."""
+    id: str
+    email: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    last_login: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            last_login=user.last_login,
+        )
+
+
+# Keyed and tagged by the JWT `sub`. Entries are dropped when the user row changes
+# in this process; other processes see the change within the TTL.
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal_on_commit(db: AsyncSession, user_id: str) -> None:
+    invalidate_on_commit(db, principal_cache, user_id)
+
+
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> Principal:
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
@@ -19,17 +59,22 @@ async def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     user_id = payload.get("sub")
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user:
+            principal = Principal.from_user(user)
+            principal_cache.set(user_id, principal, tag=user_id)
 
-    if not user or not user.is_active:
+    if not principal or not principal.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return user
+    return principal
 
 
 def require_role(*roles: UserRole):
-    async def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
         return current_user
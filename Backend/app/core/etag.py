@@ -0,0 +1,139 @@
+"""
+Conditional GET for per-user read endpoints.
+
+Every user has a `UserDataVersion` counter (created at signup). Whatever writes the
+user's check-ins, analyses, alerts or settings calls `bump_data_version` in the same
+transaction, next to `invalidate_user_on_commit`. Read endpoints opt in with
+
+    @router.get("/alerts", dependencies=[Depends(conditional_get())])
+
+The dependency looks the version up (one indexed row, on the endpoint's own read
+session so it is never newer than the data that follows) and derives a weak ETag
+from the user, the version and the request URL. A matching `If-None-Match` raises
+`NotModified`, answered with a bare 304 before the endpoint runs any of its queries.
+Otherwise `ETagMiddleware` adds the ETag to the 200 response.
+
+Endpoints that keep payloads in `response_cache` put `cache_etag(request)` in the
+cache key. A payload is then only ever served under the ETag of the version it was
+built from, even when it is stored after a newer write already invalidated the cache.
+
+Endpoints whose result also depends on the clock (date ranges, streaks) pass
+`time_relative=True`, which adds the current `ETAG_TIME_BUCKET_SECONDS` bucket to the
+ETag so their responses roll over without a write.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.deps import Principal, get_current_user
+from app.database.session import get_read_db
+from app.models.models import UserDataVersion
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+# ===== Versions =====
+async def bump_data_versions(db: AsyncSession, user_ids: Optional[Iterable[str]] = None) -> None:
+    """Advance the data version of `user_ids` (every user when None); takes effect on commit."""
+    statement = update(UserDataVersion).values(
+        version=UserDataVersion.version + 1,
+        updated_at=datetime.now(timezone.utc),
+    )
+    if user_ids is not None:
+        ids = sorted(set(user_ids))
+        if not ids:
+            return
+        statement = statement.where(UserDataVersion.user_id.in_(ids))
+    await db.execute(statement)
+
+
+async def bump_data_version(db: AsyncSession, user_id: str) -> None:
+    await bump_data_versions(db, [user_id])
+
+
+async def data_version(db: AsyncSession, user_id: str) -> Optional[int]:
+    result = await db.execute(select(UserDataVersion.version).where(UserDataVersion.user_id == user_id))
+    return result.scalar_one_or_none()
+
+
+# ===== ETags =====
+def make_etag(user_id: str, version: int, request: Request, time_relative: bool = False) -> str:
+    parts = [settings.APP_VERSION, user_id, str(version), request.url.path, request.url.query]
+    if time_relative:
+        parts.append(str(int(time.time() // max(settings.ETAG_TIME_BUCKET_SECONDS, 1))))
+    return 'W/"' + hashlib.sha256("|".join(parts).encode()).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an `If-None-Match` header (a list of ETags or `*`)."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def conditional_get(time_relative: bool = False):
+    """Dependency: 304 when the client's ETag is current, else tag the response."""
+
+    async def check(
+        request: Request,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_read_db),
+    ) -> None:
+        version = await data_version(db, current_user.id)
+        if version is None:
+            return
+        etag = make_etag(current_user.id, version, request, time_relative)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise NotModified(etag)
+        request.state.etag = etag
+
+    return check
+
+
+def cache_etag(request: Request) -> Optional[str]:
+    """The ETag `conditional_get` chose for this request, as part of a `response_cache` key."""
+    return getattr(request.state, "etag", None)
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": CACHE_CONTROL})
+
+
+class ETagMiddleware:
+    """Adds the ETag chosen by `conditional_get` to successful responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                if etag:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"etag", etag.encode()),
+                        (b"cache-control", CACHE_CONTROL.encode()),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,184 @@
+"""
+Per-request latency and database instrumentation.
+
+Engine event hooks count every statement and its wall time into the stats of the
+request that issued it (tracked in a context variable). `MetricsMiddleware` records
+them per route template into histograms, served in Prometheus text format on
+`/metrics`, and reports them to the client in a `Server-Timing` header.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_db_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        # counts per bucket (non-cumulative), then +Inf, sum, count
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative:g}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {cumulative:g}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]:g}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_latency = Histogram(
+    "mindpulse_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+request_statements = Histogram(
+    "mindpulse_db_statements_per_request",
+    "SQL statements issued per HTTP request.",
+    ("method", "route"),
+    STATEMENT_BUCKETS,
+)
+request_db_time = Histogram(
+    "mindpulse_db_time_per_request_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+
+# Extra gauges appended to /metrics: name -> (help, callable returning {labels: value}),
+# where labels is a tuple of (label, value) pairs.
+GaugeCollector = Callable[[], Dict[Tuple[Tuple[str, str], ...], float]]
+_gauges: Dict[str, Tuple[str, GaugeCollector]] = {}
+
+
+def register_gauge(name: str, help_text: str, collect: GaugeCollector) -> None:
+    _gauges[name] = (help_text, collect)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for histogram in (request_latency, request_statements, request_db_time):
+        lines.extend(histogram.render())
+    for name, (help_text, collect) in _gauges.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in collect().items():
+            rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+            lines.append(f"{name}{{{rendered}}} {value:g}" if rendered else f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+# ===== SQLAlchemy hooks =====
+def instrument_engine(engine: Engine) -> None:
+    """Attribute statement count and time to the current request (pass `async_engine.sync_engine`)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += time.perf_counter() - started
+
+
+# ===== ASGI middleware =====
+def route_template(scope) -> str:
+    """Route template of the matched endpoint, e.g. `/api/v1/checkins/{checkin_id}`.
+
+    Some FastAPI versions keep router-level templates without the `include_router`
+    prefix, so the prefix is recovered from the concrete path.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "<unmatched>"
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    path = scope.get("path", "")
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + path_format
+    return path_format
+
+
+class MetricsMiddleware:
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                    f"app;dur={total_ms:.2f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            template = route_template(scope)
+            method = scope.get("method", "GET")
+            request_latency.observe((method, template, str(status)), time.perf_counter() - started)
+            request_statements.observe((method, template), stats.statements)
+            request_db_time.observe((method, template), stats.db_seconds)
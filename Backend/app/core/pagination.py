@@ -0,0 +1,94 @@
+"""
+Keyset (cursor) pagination over `(created_at, id)`, newest first. Lists ordered by
+another timestamp (alerts, by `last_seen_at`) pass that column and attribute instead.
+
+Cursors are opaque url-safe strings encoding the last row of the previous page, so
+fetching page N costs the same index range scan as page 1. List endpoints return the
+cursor for the next page in the `X-Next-Cursor` response header (absent on the last
+page) and keep the body shape unchanged. Exact totals cost an extra count and are
+only computed on request (`include_total=true`, returned as `X-Total-Count`).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["t"]), str(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Cursor for ranked results (e.g. search), which have no stable keyset order."""
+    raw = json.dumps({"o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode()))["o"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, settings.MAX_PAGE_SIZE))
+
+
+def keyset_page(query: Select, time_col: Any, id_col: Any, cursor: Optional[str], limit: int) -> Select:
+    """Order `query` newest first and restrict it to the page after `cursor`.
+
+    Fetches one extra row so `split_page` can tell whether another page exists.
+    """
+    if cursor:
+        seen_at, row_id = decode_cursor(cursor)
+        query = query.where(or_(time_col < seen_at, and_(time_col == seen_at, id_col < row_id)))
+    return query.order_by(desc(time_col), desc(id_col)).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, time_attr: str = "created_at") -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row; returns the page and the cursor for the next one.
+
+    `time_attr` names the row attribute holding the `keyset_page` time column.
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(getattr(last, time_attr), last.id)
+
+
+async def count_total(db: AsyncSession, query: Select) -> int:
+    """Exact row count of the unpaginated `query` (filters only, no ordering/limit)."""
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar() or 0
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int] = None) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
@@ -0,0 +1,56 @@
+"""
+JSON response helpers.
+
+`ORJSONResponse` is the app's default response class: anything an endpoint returns
+is rendered with orjson instead of the standard library encoder. (FastAPI's own
+class of that name is deprecated.)
+
+List endpoints skip the per-row work entirely: they select only the columns of their
+response schema and `RowSerializer` dumps the whole page in one pydantic-core call
+through a `TypeAdapter` over a `TypedDict` mirroring the schema, so rows are not
+validated or turned into models first. `envelope_response` wraps the serialized
+`data` in the `{"ok", "data", "error"}` envelope without parsing it again, and the
+bytes can be cached as they are.
+"""
+from typing import Any, Dict, Iterable, List, Type
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict
+
+_ENVELOPE_HEAD = b'{"ok":true,"data":'
+_ENVELOPE_TAIL = b',"error":null}'
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def envelope_json(data: bytes) -> bytes:
+    """A successful envelope around already serialized `data`."""
+    return _ENVELOPE_HEAD + data + _ENVELOPE_TAIL
+
+
+def envelope_response(data: bytes, status_code: int = 200) -> Response:
+    return Response(content=envelope_json(data), status_code=status_code, media_type="application/json")
+
+
+class RowSerializer:
+    """Bulk JSON dump of result rows shaped like `schema` (one column per field)."""
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        fields: Dict[str, Any] = {name: info.annotation for name, info in schema.model_fields.items()}
+        self._adapter = TypeAdapter(List[TypedDict(f"{schema.__name__}Row", fields)])
+
+    def columns(self, model: Any) -> List[Any]:
+        """The ORM columns to select for this schema."""
+        return [getattr(model, name) for name in self.fields]
+
+    def dump_json(self, rows: Iterable[Row]) -> bytes:
+        """Rows of a `select(*serializer.columns(Model))` as a JSON array."""
+        return self._adapter.dump_json([row._asdict() for row in rows])
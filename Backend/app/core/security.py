@@ -1,12 +1,60 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Tuple, TypeVar
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# min == max == default: hashes made with any other cost report `needs_update`,
+# so changing BCRYPT_ROUNDS rehashes passwords on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashing operations are already queued; the caller should retry later."""
+
+
+# bcrypt releases the GIL, so a small thread pool keeps ~250ms hashes off the event loop.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
+
+def _executor() -> Optional[ThreadPoolExecutor]:
+    global _hash_executor
+    if _hash_executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+
+async def _offload(fn: Callable[..., T], *args: Any) -> T:
+    """Run `fn` in the hashing pool, refusing work beyond PASSWORD_HASH_MAX_PENDING."""
+    global _hash_pending
+    executor = _executor()
+    if executor is None:
+        return fn(*args)
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _hash_pending -= 1
 
 
 def hash_password(password: str) -> str:
@@ -17,6 +65,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    return await _offload(hash_password, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash when the stored cost is outdated."""
+    return await _offload(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(subject: str, extra: Optional[dict[str, Any]] = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {
@@ -41,9 +98,22 @@ def create_refresh_token(subject: str) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+# SHA-256 of the raw token -> verified claims, each entry expiring at the token's `exp`.
+# Only successfully verified tokens are cached, so a forged token is always re-checked.
+token_cache = TTLCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
 def decode_token(token: str) -> Optional[dict]:
+    """Verify and decode a JWT. The returned claims may be shared; treat them as read-only."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
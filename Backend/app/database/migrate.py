@@ -0,0 +1,45 @@
+"""
+Schema revision check for startup.
+
+The schema is owned by the Alembic migrations in `migrations/`. `init_db` no longer
+creates tables; it compares the database's revision with the migration head and,
+when `DB_AUTO_MIGRATE` is on, applies the pending migrations on the app's own
+connection. Otherwise it refuses to start on an out-of-date schema. Databases created
+by `create_all` before migrations existed have no revision; the baseline migration
+adopts them (see migrations/versions/0001_baseline_schema.py).
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from loguru import logger
+from sqlalchemy import Connection
+
+from app.core.config import settings
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+def alembic_config() -> Config:
+    return Config(ALEMBIC_INI)
+
+
+def ensure_schema(conn: Connection) -> None:
+    """Verify (or bring) the schema to the migration head (run via `conn.run_sync`)."""
+    config = alembic_config()
+    head = ScriptDirectory.from_config(config).get_current_head()
+    current = MigrationContext.configure(conn).get_current_revision()
+    if current == head:
+        return
+
+    if not settings.DB_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at revision {current or '<empty>'}, expected {head}; run `alembic upgrade head`"
+        )
+
+    logger.info(f"Migrating database schema {current or '<empty>'} -> {head}")
+    config.attributes["connection"] = conn
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
@@ -0,0 +1,119 @@
+"""
+EXPLAIN check for the queries on the request path (see tests/test_query_plans.py).
+
+`QueryRecorder` captures the SELECT statements an engine actually runs (with their
+bound parameters) while requests are served, and `explain` runs one of them under
+EXPLAIN and reports every full table scan. The test drives the API endpoints and the
+analysis worker against a scratch database and fails on any scan that is not listed
+as expected, so a router query that stops using an index fails the suite.
+
+SQLite: `EXPLAIN QUERY PLAN`, a bare `SCAN <table>` (no index) is a table scan.
+Postgres: `EXPLAIN (FORMAT JSON)` with `enable_seqscan` off, so a `Seq Scan` node
+means no usable index exists rather than that the planner preferred one. The statement
+is prepared and explained as a generic plan: asyncpg caches prepared statements, which
+Postgres plans generically after a few executions, and an index that only matches once
+parameter values are inlined is no use to those.
+"""
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def _table_scans_sqlite(rows: List[Tuple[Any, ...]]) -> List[str]:
+    scans = []
+    # Subqueries and CTEs SQLite evaluates into temporary tables; scanning those is fine
+    derived = {
+        str(row[-1]).split(" ", 1)[1] for row in rows if str(row[-1]).startswith(("MATERIALIZE ", "CO-ROUTINE "))
+    }
+    for row in rows:
+        detail = str(row[-1])
+        if not detail.startswith("SCAN "):
+            continue
+        target = detail[len("SCAN "):]
+        if target.startswith("(") or target == "CONSTANT ROW" or " USING " in detail or "VIRTUAL TABLE" in detail:
+            continue
+        if target in derived:
+            continue
+        scans.append(detail)
+    return scans
+
+
+def _plan_lines_postgres(rows: List[Tuple[Any, ...]]) -> List[str]:
+    lines = []
+
+    def walk(node: Dict[str, Any]):
+        line = node.get("Node Type", "?")
+        if node.get("Relation Name"):
+            line += f" on {node['Relation Name']}"
+        if node.get("Index Name"):
+            line += f" using {node['Index Name']}"
+        lines.append(line)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    for row in rows:
+        for plan in row[0]:
+            walk(plan["Plan"])
+    return lines
+
+
+def _table_scans_postgres(rows: List[Tuple[Any, ...]]) -> List[str]:
+    return [line for line in _plan_lines_postgres(rows) if line.startswith("Seq Scan")]
+
+
+class QueryRecorder:
+    """Records the distinct SELECT statements run on `engines` while active.
+
+    `statements` maps each statement's SQL to the parameters it first ran with.
+    """
+
+    def __init__(self, *engines: AsyncEngine):
+        self.engines = {id(engine.sync_engine): engine.sync_engine for engine in engines}.values()
+        self.statements: Dict[str, Any] = {}
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:7].upper().startswith(("SELECT", "WITH ")):
+            self.statements.setdefault(statement, parameters)
+
+    def __enter__(self) -> "QueryRecorder":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+
+def _literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+async def explain(engine: AsyncEngine, statement: str, parameters: Any) -> Tuple[List[str], List[str]]:
+    """Plan of one recorded statement; returns (plan lines, table scans)."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+            rows = [tuple(row) for row in result.all()]
+            await conn.rollback()
+        return [str(row[-1]) for row in rows], _table_scans_sqlite(rows)
+    if dialect != "postgresql":
+        raise RuntimeError(f"Query plan check does not support {dialect}")
+
+    # EXECUTE takes no bind parameters; untyped literals take the prepared parameter types
+    arguments = ", ".join(_literal(value) for value in parameters or ())
+    async with engine.connect() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        await conn.execute(text("SET LOCAL plan_cache_mode = force_generic_plan"))
+        await conn.exec_driver_sql(f"PREPARE recorded_statement AS {statement}")
+        result = await conn.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) EXECUTE recorded_statement" + (f"({arguments})" if arguments else "")
+        )
+        rows = [tuple(row) for row in result.all()]
+        # A prepared statement outlives the transaction; drop the connection rather than the pool's
+        await conn.invalidate()
+    return _plan_lines_postgres(rows), _table_scans_postgres(rows)
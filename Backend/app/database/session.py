@@ -1,14 +1,67 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+
+
+# ===== Engine profiles =====
+def engine_options(url: str) -> Dict[str, Any]:
+    """`create_async_engine` keyword arguments for the database behind `url`."""
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {"echo": settings.DEBUG, "future": True}
+    if backend == "sqlite":
+        # One file, one writer: pooling knobs do not apply; the busy timeout
+        # makes concurrent writers wait for the lock instead of failing.
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    elif backend == "postgresql":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        if make_url(url).get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            }
+    return options
+
+
+def _tune_sqlite(engine: AsyncEngine) -> None:
+    database = engine.url.database
+    in_memory = not database or database == ":memory:" or database.startswith("file::memory:")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_WAL and not in_memory:
+            # Readers no longer block the writer (and vice versa); NORMAL only fsyncs at checkpoints
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
+
+
+def build_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        _tune_sqlite(engine)
+    instrument_engine(engine.sync_engine)
+    return engine
+
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-)
+engine = build_engine(settings.DATABASE_URL)
+read_engine = build_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -27,6 +80,23 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Session for read-only handlers; served by the replica when DATABASE_READ_URL is set.
+
+    Never committed. Replicas lag the primary slightly, so handlers that write (or must
+    see their own writes) use `get_db`.
+    """
+    async with async_read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
+
+
 async def init_db():
+    """Check the schema is at the latest migration (applying it if DB_AUTO_MIGRATE)."""
+    from app.database.migrate import ensure_schema
+
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_schema)
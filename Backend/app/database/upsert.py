@@ -0,0 +1,52 @@
+"""
+`INSERT ... ON CONFLICT` for counter tables maintained next to each write.
+
+Such counters must not read a row, change it in Python and
+write it back: two transactions for the same user would both read the old values.
+`insert_for` returns the dialect's insert construct, whose `on_conflict_do_update`
+lets the addition happen in SQL. State that has to be computed in Python (streaks,
+baselines) is updated under `lock_rows` instead.
+"""
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_for(db: AsyncSession, model: Any):
+    """`insert(model)` with the dialect's `on_conflict_*` methods (SQLite or Postgres)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def least(a: Any, b: Any):
+    return case((a <= b, a), else_=b)
+
+
+def greatest(a: Any, b: Any):
+    return case((a >= b, a), else_=b)
+
+
+
+async def lock_rows(db: AsyncSession, model: Any, rows: Iterable[Dict[str, Any]]) -> List[Any]:
+    """Create missing per-user rows of `model` and return them locked until the transaction ends.
+
+    `rows` are the values inserted for users without a row (one per `user_id`). Users
+    are locked in id order so transactions touching several of them cannot deadlock.
+    On SQLite, `FOR UPDATE` does nothing, but the INSERT takes the database write
+    lock, so the SELECT that follows sees the latest committed row.
+    """
+    rows = sorted(rows, key=lambda row: row["user_id"])
+    if not rows:
+        return []
+    await db.execute(insert_for(db, model).on_conflict_do_nothing(index_elements=["user_id"]), rows)
+    result = await db.execute(
+        select(model)
+        .where(model.user_id.in_([row["user_id"] for row in rows]))
+        .order_by(model.user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
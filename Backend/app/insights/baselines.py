@@ -0,0 +1,162 @@
+"""
+Per-user mood/sleep baselines for personalized analysis.
+
+Every analysed check-in is folded into the user's `UserBaseline` row in O(1): a
+Welford running mean/variance and two time-decayed EWMAs (7- and 30-day time
+constants, so irregular check-in gaps weigh correctly). `baseline_labels` scores a
+check-in against the baseline as it stood *before* that check-in:
+
+    mood_z / sleep_z         deviation from the user's own mean in standard deviations
+                             (None until BASELINE_MIN_CHECKINS earlier check-ins)
+    mood_trend / sleep_trend 7-day EWMA against the 30-day one: improving, declining,
+                             stable or insufficient_data
+    baseline_n               number of check-ins the baseline was built from
+
+`rebuild_baselines` recomputes rows from check-in history
+(`python -m app.cli rebuild-baselines`).
+"""
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database.upsert import lock_rows
+from app.models.models import DailyCheckin, UserBaseline
+
+BASELINE_LABELS = ("mood_z", "sleep_z", "mood_trend", "sleep_trend", "baseline_n")
+
+_METRICS = ("mood", "sleep")
+_EWMA_DAYS = (7, 30)
+_STATE_COLUMNS = (
+    "count", "mood_mean", "mood_m2", "sleep_mean", "sleep_m2",
+    "mood_ewma_7", "mood_ewma_30", "sleep_ewma_7", "sleep_ewma_30", "last_checkin_at",
+)
+_WRITE_CHUNK = 500
+
+
+def _utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def new_baseline_row(user_id: str) -> Dict[str, Any]:
+    row: Dict[str, Any] = {name: 0.0 for name in _STATE_COLUMNS}
+    row.update(user_id=user_id, count=0, last_checkin_at=None)
+    return row
+
+
+def fold_baseline(row: Dict[str, Any], mood: float, sleep: float, at: datetime) -> None:
+    """Add one check-in to a baseline row in place (Welford update plus EWMA decay)."""
+    at = _utc(at)
+    last = row["last_checkin_at"]
+    count = row["count"] + 1
+    # A back-dated check-in counts for mean/variance but does not move the EWMAs back in time.
+    gap_days = max((at - _utc(last)).total_seconds() / 86400, 0.0) if last is not None else 0.0
+    for metric, value in zip(_METRICS, (float(mood), float(sleep))):
+        delta = value - row[f"{metric}_mean"]
+        row[f"{metric}_mean"] += delta / count
+        row[f"{metric}_m2"] += delta * (value - row[f"{metric}_mean"])
+        for days in _EWMA_DAYS:
+            key = f"{metric}_ewma_{days}"
+            if last is None:
+                row[key] = value
+            else:
+                row[key] += (1.0 - math.exp(-gap_days / days)) * (value - row[key])
+    row["count"] = count
+    if last is None or at > _utc(last):
+        row["last_checkin_at"] = at
+
+
+def baseline_labels(row: Optional[Dict[str, Any]], mood: float, sleep: float) -> Dict[str, Any]:
+    """Z-scores and trends of a check-in against the baseline before it was folded in."""
+    count = row["count"] if row else 0
+    labels: Dict[str, Any] = {"baseline_n": count}
+    thresholds = {
+        "mood": settings.BASELINE_TREND_THRESHOLD_MOOD,
+        "sleep": settings.BASELINE_TREND_THRESHOLD_SLEEP,
+    }
+    enough = count >= max(settings.BASELINE_MIN_CHECKINS, 2)
+    for metric, value in zip(_METRICS, (float(mood), float(sleep))):
+        z = None
+        trend = "insufficient_data"
+        if enough:
+            std = math.sqrt(row[f"{metric}_m2"] / (count - 1))
+            if std > 0:
+                z = round((value - row[f"{metric}_mean"]) / std, 2)
+            drift = row[f"{metric}_ewma_7"] - row[f"{metric}_ewma_30"]
+            if drift >= thresholds[metric]:
+                trend = "improving"
+            elif drift <= -thresholds[metric]:
+                trend = "declining"
+            else:
+                trend = "stable"
+        labels[f"{metric}_z"] = z
+        labels[f"{metric}_trend"] = trend
+    return labels
+
+
+def _as_row(baseline: UserBaseline) -> Dict[str, Any]:
+    row = {name: getattr(baseline, name) for name in _STATE_COLUMNS}
+    row["user_id"] = baseline.user_id
+    return row
+
+
+async def lock_baselines(db: AsyncSession, user_ids: List[str]) -> List[UserBaseline]:
+    """Create missing baseline rows and lock them until the transaction ends, in user id order."""
+    return await lock_rows(db, UserBaseline, [new_baseline_row(user_id) for user_id in set(user_ids)])
+
+
+async def update_baseline(db: AsyncSession, checkin: DailyCheckin) -> Dict[str, Any]:
+    """Fold a check-in into its user's baseline; returns the labels scored against the prior baseline."""
+    (baseline,) = await lock_baselines(db, [checkin.user_id])
+    row = _as_row(baseline)
+    labels = baseline_labels(row, checkin.mood, checkin.sleep_hours)
+    fold_baseline(row, checkin.mood, checkin.sleep_hours, checkin.created_at)
+    for name in _STATE_COLUMNS:
+        setattr(baseline, name, row[name])
+    await db.flush()
+    return labels
+
+
+async def rebuild_baselines(db: AsyncSession, user_id: Optional[str] = None, chunk_size: int = 1000) -> int:
+    """Recompute baselines from check-in history; returns the number of users written.
+
+    Streams check-ins ordered by user and time so only one row per user is built at a time.
+    """
+    wipe = delete(UserBaseline)
+    query = (
+        select(DailyCheckin.user_id, DailyCheckin.created_at, DailyCheckin.mood, DailyCheckin.sleep_hours)
+        .order_by(DailyCheckin.user_id, DailyCheckin.created_at)
+        .execution_options(yield_per=chunk_size)
+    )
+    if user_id:
+        wipe = wipe.where(UserBaseline.user_id == user_id)
+        query = query.where(DailyCheckin.user_id == user_id)
+    await db.execute(wipe)
+
+    written = 0
+    pending: List[Dict[str, Any]] = []
+    row: Optional[Dict[str, Any]] = None
+
+    async def _flush():
+        nonlocal written
+        if pending:
+            await db.execute(insert(UserBaseline), pending)
+            written += len(pending)
+            pending.clear()
+
+    stream = await db.stream(query)
+    async for uid, created_at, mood, sleep in stream:
+        if row is None or row["user_id"] != uid:
+            if row is not None:
+                pending.append(row)
+                if len(pending) >= _WRITE_CHUNK:
+                    await _flush()
+            row = new_baseline_row(uid)
+        fold_baseline(row, mood, sleep, created_at)
+    if row is not None:
+        pending.append(row)
+    await _flush()
+    return written
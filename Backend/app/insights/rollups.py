@@ -0,0 +1,188 @@
+"""
+Per-user daily rollups backing the dashboard.
+
+Each check-in adds to its day's row in the same transaction that creates it, and the
+analysis adds the stress bucket, so the dashboard reads one small row per day instead
+of every check-in in the range. Both are increments done in SQL (`INSERT ... ON
+CONFLICT DO UPDATE`), so concurrent check-ins of one user and day add up. `rebuild_rollups` recomputes rows from scratch for
+existing data (`python -m app.cli rebuild-rollups`).
+"""
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.upsert import greatest, insert_for, least
+from app.models.models import DailyCheckin, AIAnalysisResult, DailyRollup
+
+STRESS_BUCKETS = ("Low", "Medium", "High", "Critical")
+RISK_BUCKETS = ("Low", "Moderate", "High", "Critical")
+
+_BUCKET_COLUMNS = {
+    "Low": "stress_low",
+    "Medium": "stress_medium",
+    "High": "stress_high",
+    "Critical": "stress_critical",
+}
+
+
+def stress_bucket(stress_level: int) -> str:
+    if stress_level <= 3:
+        return "Low"
+    if stress_level <= 5:
+        return "Medium"
+    if stress_level <= 7:
+        return "High"
+    return "Critical"
+
+
+def risk_bucket_column():
+    """SQL expression bucketing an analysis' `risk_score` label into `RISK_BUCKETS`."""
+    risk = AIAnalysisResult.labels["risk_score"].as_integer()
+    return case((risk >= 8, "Critical"), (risk >= 6, "High"), (risk >= 3, "Moderate"), else_="Low")
+
+
+def rollup_day(created_at: datetime) -> date:
+    """UTC calendar day a check-in is rolled up under (SQLite hands back naive UTC)."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def stress_counts(rollup: DailyRollup) -> Dict[str, int]:
+    return {name: getattr(rollup, column) or 0 for name, column in _BUCKET_COLUMNS.items()}
+
+
+async def record_checkin(db: AsyncSession, checkin: DailyCheckin) -> None:
+    """Fold a newly created check-in into its day's rollup."""
+    day = rollup_day(checkin.created_at)
+    row = new_rollup_row(checkin.user_id, day, checkin.mood, checkin.sleep_hours)
+    fold_checkin(row, checkin.mood, checkin.sleep_hours)
+    await _add_rollups(db, [row])
+
+
+async def record_analysis(db: AsyncSession, checkin: DailyCheckin, stress_level: int) -> None:
+    """Count an analysis' stress bucket on the day of the check-in it scored.
+
+    A check-in that predates rollups has no row; `rebuild_rollups` will pick it up.
+    """
+    column = getattr(DailyRollup, _BUCKET_COLUMNS[stress_bucket(stress_level)])
+    await db.execute(
+        update(DailyRollup)
+        .where(DailyRollup.user_id == checkin.user_id, DailyRollup.day == rollup_day(checkin.created_at))
+        .values({column: func.coalesce(column, 0) + 1})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def new_rollup_row(user_id: str, day: date, mood: int, sleep: float) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "day": day,
+        "checkin_count": 0,
+        "mood_sum": 0,
+        "mood_min": mood,
+        "mood_max": mood,
+        "sleep_sum": 0.0,
+        "sleep_min": sleep,
+        "sleep_max": sleep,
+        "stress_low": 0,
+        "stress_medium": 0,
+        "stress_high": 0,
+        "stress_critical": 0,
+    }
+
+
+def fold_checkin(row: Dict[str, Any], mood: int, sleep: float, stress_level: Optional[int] = None) -> None:
+    """Add one check-in (and its stress level, if analysed) to a rollup row dict."""
+    row["checkin_count"] += 1
+    row["mood_sum"] += mood
+    row["mood_min"] = min(row["mood_min"], mood)
+    row["mood_max"] = max(row["mood_max"], mood)
+    row["sleep_sum"] += sleep
+    row["sleep_min"] = min(row["sleep_min"], sleep)
+    row["sleep_max"] = max(row["sleep_max"], sleep)
+    if stress_level is not None:
+        row[_BUCKET_COLUMNS[stress_bucket(stress_level)]] += 1
+
+
+async def _add_rollups(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert rollup rows, or add them to the stored ones, in one `INSERT ... ON CONFLICT`.
+
+    The additions happen in SQL, so concurrent writers for one user and day cannot
+    lose each other's counts or trip the `(user_id, day)` unique constraint.
+    """
+    statement = insert_for(db, DailyRollup)
+    new = statement.excluded
+    added = {
+        column: func.coalesce(getattr(DailyRollup, column), 0) + getattr(new, column)
+        for column in ("checkin_count", "mood_sum", "sleep_sum", *_BUCKET_COLUMNS.values())
+    }
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={
+            **added,
+            "mood_min": least(DailyRollup.mood_min, new.mood_min),
+            "mood_max": greatest(DailyRollup.mood_max, new.mood_max),
+            "sleep_min": least(DailyRollup.sleep_min, new.sleep_min),
+            "sleep_max": greatest(DailyRollup.sleep_max, new.sleep_max),
+            "updated_at": datetime.now(timezone.utc),
+        },
+    )
+    await db.execute(statement, rows)
+
+
+async def merge_rollups(db: AsyncSession, rows: Dict[date, Dict[str, Any]]) -> None:
+    """Add partial per-day aggregates (from `fold_checkin`) to the stored rollups."""
+    if rows:
+        await _add_rollups(db, list(rows.values()))
+
+
+async def rebuild_rollups(db: AsyncSession, user_id: Optional[str] = None, chunk_size: int = 1000) -> int:
+    """Recompute rollups from check-ins and analyses; returns the number of rows written.
+
+    Streams check-ins ordered by user so only one user's days are held in memory.
+    """
+    wipe = delete(DailyRollup)
+    query = (
+        select(
+            DailyCheckin.user_id,
+            DailyCheckin.created_at,
+            DailyCheckin.mood,
+            DailyCheckin.sleep_hours,
+            AIAnalysisResult.labels,
+        )
+        .outerjoin(AIAnalysisResult, AIAnalysisResult.checkin_id == DailyCheckin.id)
+        .order_by(DailyCheckin.user_id, DailyCheckin.created_at)
+        .execution_options(yield_per=chunk_size)
+    )
+    if user_id:
+        wipe = wipe.where(DailyRollup.user_id == user_id)
+        query = query.where(DailyCheckin.user_id == user_id)
+    await db.execute(wipe)
+
+    written = 0
+    current_user: Optional[str] = None
+    rows: Dict[date, Dict[str, Any]] = {}
+
+    async def _flush_user():
+        nonlocal written
+        if rows:
+            await db.execute(insert(DailyRollup), list(rows.values()))
+            written += len(rows)
+            rows.clear()
+
+    stream = await db.stream(query)
+    async for uid, created_at, mood, sleep, labels in stream:
+        if uid != current_user:
+            await _flush_user()
+            current_user = uid
+        day = rollup_day(created_at)
+        row = rows.get(day)
+        if row is None:
+            row = rows[day] = new_rollup_row(uid, day, mood, sleep)
+        stress_level = labels.get("stress_level") if isinstance(labels, dict) else None
+        fold_checkin(row, mood, sleep, stress_level)
+    await _flush_user()
+    return written
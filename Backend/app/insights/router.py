@@ -1,47 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta, timezone
-
-from app.database.session import get_db
-from app.core.deps import get_current_user
-from app.models.models import User, DailyCheckin, AIAnalysisResult, Alert, AlertStatus
+from typing import Optional
+
+from app.database.session import get_read_db
+from app.core.deps import get_current_user, Principal
+from app.core.cache import response_cache
+from app.core.etag import cache_etag, conditional_get
+from app.core.pagination import clamp_limit, keyset_page, split_page, set_page_headers
+from app.models.models import DailyCheckin, AIAnalysisResult, Alert, AlertStatus, DailyRollup, UserStreak
+from app.insights.rollups import STRESS_BUCKETS, stress_counts
+from app.checkins.streaks import current_streak
 from app.schemas.schemas import CheckinResponse, AnalysisResponse, DashboardResponse
 
 router = APIRouter(tags=["Insights & Dashboard"])
 
 
-@router.get("/dashboard")
+@router.get("/dashboard", dependencies=[Depends(conditional_get(time_relative=True))])
 async def get_dashboard(
+    request: Request,
     range: str = "30d",
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    cache_key = (current_user.id, "dashboard", range, cache_etag(request))
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     days = int(range.replace("d", "")) if range.endswith("d") else 30
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    # Get checkins
+    # Daily rollups (one row per day with check-ins)
     result = await db.execute(
-        select(DailyCheckin)
-        .where(DailyCheckin.user_id == current_user.id, DailyCheckin.created_at >= since)
-        .order_by(DailyCheckin.created_at)
+        select(DailyRollup)
+        .where(DailyRollup.user_id == current_user.id, DailyRollup.day >= since.date())
+        .order_by(DailyRollup.day)
     )
-    checkins = result.scalars().all()
+    rollups = result.scalars().all()
 
     # Averages
-    avg_mood = sum(c.mood for c in checkins) / len(checkins) if checkins else 0
-    avg_sleep = sum(c.sleep_hours for c in checkins) / len(checkins) if checkins else 0
-
-    # Streak (consecutive days)
-    streak = 0
-    if checkins:
-        today = datetime.now(timezone.utc).date()
-        for i in range(30):
-            day = today - timedelta(days=i)
-            if any(c.created_at.date() == day for c in checkins):
-                streak += 1
-            else:
-                break
+    total = sum(r.checkin_count for r in rollups)
+    avg_mood = sum(r.mood_sum for r in rollups) / total if total else 0
+    avg_sleep = sum(r.sleep_sum for r in rollups) / total if total else 0
+
+    # Streak (maintained per check-in in the user's timezone)
+    streak_result = await db.execute(select(UserStreak).where(UserStreak.user_id == current_user.id))
+    streak = streak_result.scalar_one_or_none()
 
     # Open alerts count
     alert_result = await db.execute(
@@ -50,39 +57,36 @@ async def get_dashboard(
     )
     open_alerts = alert_result.scalar() or 0
 
-    # Trends
-    mood_trend = [{"date": c.created_at.strftime("%a"), "mood": c.mood} for c in checkins[-7:]]
-    sleep_trend = [{"date": c.created_at.strftime("%a"), "hours": c.sleep_hours} for c in checkins[-7:]]
-
-    # Stress distribution from analyses
-    analysis_result = await db.execute(
-        select(AIAnalysisResult)
-        .where(AIAnalysisResult.user_id == current_user.id)
-        .order_by(desc(AIAnalysisResult.created_at))
-        .limit(30)
+    # Trends (daily averages over the last 7 days with check-ins)
+    mood_trend = [
+        {"date": r.day.strftime("%a"), "mood": round(r.mood_sum / r.checkin_count, 1)} for r in rollups[-7:]
+    ]
+    sleep_trend = [
+        {"date": r.day.strftime("%a"), "hours": round(r.sleep_sum / r.checkin_count, 1)} for r in rollups[-7:]
+    ]
+
+    # Stress distribution over the range
+    stress_totals = {name: 0 for name in STRESS_BUCKETS}
+    for r in rollups:
+        for name, count in stress_counts(r).items():
+            stress_totals[name] += count
+    stress_distribution = [{"name": k, "value": v} for k, v in stress_totals.items()]
+
+    recent_result = await db.execute(
+        select(DailyCheckin)
+        .where(DailyCheckin.user_id == current_user.id, DailyCheckin.created_at >= since)
+        .order_by(desc(DailyCheckin.created_at))
+        .limit(5)
     )
-    analyses = analysis_result.scalars().all()
-    stress_counts = {"Low": 0, "Medium": 0, "High": 0, "Critical": 0}
-    for a in analyses:
-        sl = a.labels.get("stress_level", 5) if isinstance(a.labels, dict) else 5
-        if sl <= 3:
-            stress_counts["Low"] += 1
-        elif sl <= 5:
-            stress_counts["Medium"] += 1
-        elif sl <= 7:
-            stress_counts["High"] += 1
-        else:
-            stress_counts["Critical"] += 1
-    stress_distribution = [{"name": k, "value": v} for k, v in stress_counts.items()]
-
-    recent = [CheckinResponse.model_validate(c) for c in list(reversed(checkins))[:5]]
+    recent = [CheckinResponse.model_validate(c) for c in recent_result.scalars().all()]
 
-    return {
+    payload = {
         "ok": True,
         "data": {
             "avg_mood": round(avg_mood, 1),
             "avg_sleep": round(avg_sleep, 1),
-            "checkin_streak": streak,
+            "checkin_streak": current_streak(streak),
+            "longest_streak": streak.longest_streak if streak else 0,
             "open_alerts": open_alerts,
             "mood_trend": mood_trend,
             "sleep_trend": sleep_trend,
@@ -91,51 +95,69 @@ async def get_dashboard(
         },
         "error": None,
     }
+    response_cache.set(cache_key, payload, tag=current_user.id)
+    return payload
 
 
-@router.get("/insights/recent")
+@router.get("/insights/recent", dependencies=[Depends(conditional_get())])
 async def list_recent_insights(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
+    limit = clamp_limit(limit)
+    cache_key = (current_user.id, "insights", (limit, cursor), cache_etag(request))
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        payload, next_cursor = cached
+        set_page_headers(response, next_cursor)
+        return payload
+
+    # Analyses and their check-ins in one round trip
+    query = (
         select(AIAnalysisResult)
+        .options(joinedload(AIAnalysisResult.checkin, innerjoin=True))
         .where(AIAnalysisResult.user_id == current_user.id)
-        .order_by(desc(AIAnalysisResult.created_at))
-        .limit(10)
     )
-    analyses = result.scalars().all()
+    result = await db.execute(
+        keyset_page(query, AIAnalysisResult.created_at, AIAnalysisResult.id, cursor, limit)
+    )
+    analyses, next_cursor = split_page(result.scalars().all(), limit)
 
-    insights = []
-    for a in analyses:
-        checkin_result = await db.execute(select(DailyCheckin).where(DailyCheckin.id == a.checkin_id))
-        checkin = checkin_result.scalar_one_or_none()
-        if checkin:
-            insights.append({
-                "id": a.id,
-                "checkin": CheckinResponse.model_validate(checkin),
-                "analysis": AnalysisResponse.model_validate(a),
-            })
+    insights = [
+        {
+            "id": a.id,
+            "checkin": CheckinResponse.model_validate(a.checkin),
+            "analysis": AnalysisResponse.model_validate(a),
+        }
+        for a in analyses
+    ]
 
-    return {"ok": True, "data": insights, "error": None}
+    payload = {"ok": True, "data": insights, "error": None}
+    response_cache.set(cache_key, (payload, next_cursor), tag=current_user.id)
+    set_page_headers(response, next_cursor)
+    return payload
 
 
-@router.get("/insights/{insight_id}")
+@router.get("/insights/{insight_id}", dependencies=[Depends(conditional_get())])
 async def get_insight(
     insight_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(AIAnalysisResult)
+        .options(joinedload(AIAnalysisResult.checkin))
         .where(AIAnalysisResult.id == insight_id, AIAnalysisResult.user_id == current_user.id)
     )
     analysis = result.scalar_one_or_none()
     if not analysis:
         raise HTTPException(status_code=404, detail="Insight not found")
 
-    checkin_result = await db.execute(select(DailyCheckin).where(DailyCheckin.id == analysis.checkin_id))
-    checkin = checkin_result.scalar_one_or_none()
+    checkin = analysis.checkin
 
     return {
         "ok": True,
@@ -1,16 +1,28 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
 from loguru import logger
 
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.core.responses import ORJSONResponse
+from app.core.etag import ETagMiddleware, NotModified, not_modified_handler
+from app.core.metrics import MetricsMiddleware, register_gauge, render_metrics
+from app.core.cache import response_cache
+from app.core.deps import principal_cache
+from app.core.security import token_cache
 from app.database.session import init_db
+from app.ai.queue import worker_pool
+from app.admin.snapshots import snapshot_job
+from app.alerts.stream import alert_hub
 from app.auth.router import router as auth_router
 from app.checkins.router import router as checkins_router
 from app.insights.router import router as insights_router
 from app.alerts.router import router as alerts_router
 from app.users.router import router as users_router
+from app.coach.router import router as coach_router
+from app.admin.router import router as admin_router
 
 
 @asynccontextmanager
@@ -18,7 +30,13 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting MindPulse API...")
     await init_db()
     logger.info("✅ Database initialized")
+    await alert_hub.start()
+    worker_pool.start()
+    snapshot_job.start()
     yield
+    await snapshot_job.stop()
+    await worker_pool.stop()
+    await alert_hub.stop()
     logger.info("👋 Shutting down MindPulse API")
 
 
@@ -26,6 +44,7 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -37,21 +56,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, "ETag"],
 )
 
+# ETag on conditional read endpoints (the 304s are raised as NotModified)
+app.add_middleware(ETagMiddleware)
+app.add_exception_handler(NotModified, not_modified_handler)
+
+# Per-route latency / SQL metrics (outermost, so it times the whole stack)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(checkins_router, prefix="/api/v1")
 app.include_router(insights_router, prefix="/api/v1")
 app.include_router(alerts_router, prefix="/api/v1")
 app.include_router(users_router, prefix="/api/v1")
+app.include_router(coach_router, prefix="/api/v1")
+app.include_router(admin_router, prefix="/api/v1")
 
 
 # Global error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "ok": False,
@@ -64,6 +94,37 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Metrics
+def _cache_counters():
+    counters = {}
+    for name, cache in (("responses", response_cache), ("principals", principal_cache), ("tokens", token_cache)):
+        for key in ("hits", "misses", "evictions", "entries"):
+            counters[(("cache", name), ("counter", key))] = cache.stats()[key]
+    return counters
+
+
+def _analysis_worker_counters():
+    return {
+        (("counter", key),): getattr(worker_pool, key)
+        for key in ("batches", "processed", "retried", "dead")
+    }
+
+
+def _alert_stream_counters():
+    return {(("counter", key),): value for key, value in alert_hub.stats().items()}
+
+
+register_gauge("mindpulse_cache", "In-process cache counters.", _cache_counters)
+register_gauge("mindpulse_analysis_workers", "Analysis worker pool counters.", _analysis_worker_counters)
+register_gauge("mindpulse_alert_stream", "Alert stream hub counters.", _alert_stream_counters)
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Health check
 @app.get("/health")
 async def health():
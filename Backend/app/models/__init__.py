@@ -1,3 +1,9 @@
-from app.models.models import User, DailyCheckin, AIAnalysisResult, Alert, UserSettings
+from app.models.models import (
+    User, DailyCheckin, AIAnalysisResult, Alert, UserSettings, DailyRollup, UserStreak, AnalysisJob, CoachAssignment,
+    PlatformSnapshot, UserBaseline, UserDataVersion,
+)
 
-__all__ = ["User", "DailyCheckin", "AIAnalysisResult", "Alert", "UserSettings"]
+__all__ = [
+    "User", "DailyCheckin", "AIAnalysisResult", "Alert", "UserSettings", "DailyRollup", "UserStreak", "AnalysisJob",
+    "CoachAssignment", "PlatformSnapshot", "UserBaseline", "UserDataVersion",
+]
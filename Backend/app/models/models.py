@@ -1,7 +1,7 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional, List, Dict
-from sqlalchemy import String, Integer, Float, Text, Enum, ForeignKey, DateTime, JSON, Boolean
+from sqlalchemy import String, Integer, Float, Text, Enum, ForeignKey, DateTime, Date, JSON, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.session import Base
 import enum
@@ -26,8 +26,15 @@ class AlertStatus(str, enum.Enum):
     CLOSED = "closed"
 
 
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DEAD = "dead"
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at", "created_at", "id"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
@@ -46,9 +53,10 @@ class User(Base):
 
 class DailyCheckin(Base):
     __tablename__ = "daily_checkins"
+    __table_args__ = (Index("ix_daily_checkins_user_created", "user_id", "created_at"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
     mood: Mapped[int] = mapped_column(Integer, nullable=False)
     sleep_hours: Mapped[float] = mapped_column(Float, nullable=False)
     notes: Mapped[str] = mapped_column(Text, default="")
@@ -60,10 +68,14 @@ class DailyCheckin(Base):
 
 class AIAnalysisResult(Base):
     __tablename__ = "ai_analysis_results"
+    __table_args__ = (
+        Index("ix_ai_analysis_results_user_created", "user_id", "created_at"),
+        Index("ix_ai_analysis_results_created_at", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     checkin_id: Mapped[str] = mapped_column(String(36), ForeignKey("daily_checkins.id"), nullable=False, unique=True)
-    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
     model_version: Mapped[str] = mapped_column(String(50), default="rule-v1")
     summary: Mapped[str] = mapped_column(Text, nullable=False)
     labels: Mapped[Dict] = mapped_column(JSON, nullable=False)
@@ -75,14 +87,23 @@ class AIAnalysisResult(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_user_created", "user_id", "created_at"),
+        Index("ix_alerts_user_status", "user_id", "status"),
+        Index("ix_alerts_user_last_seen", "user_id", "last_seen_at"),
+        Index("ix_alerts_ai_result_id", "ai_result_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
     ai_result_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("ai_analysis_results.id"), nullable=True)
     type: Mapped[AlertType] = mapped_column(Enum(AlertType), nullable=False)
     status: Mapped[AlertStatus] = mapped_column(Enum(AlertStatus), default=AlertStatus.OPEN)
     payload: Mapped[Dict] = mapped_column(JSON, default=dict)
+    # Repeats of an open alert within ALERT_COALESCE_WINDOW_HOURS update this row instead of adding one
+    occurrence_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     user: Mapped["User"] = relationship(back_populates="alerts")
 
@@ -101,3 +122,123 @@ class UserSettings(Base):
     })
 
     user: Mapped["User"] = relationship(back_populates="settings")
+
+
+class DailyRollup(Base):
+    """Per-user, per-day (UTC) aggregate of check-ins and their analyses."""
+    __tablename__ = "daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_daily_rollups_user_day"),
+        Index("ix_daily_rollups_day", "day"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    checkin_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mood_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mood_min: Mapped[int] = mapped_column(Integer, nullable=False)
+    mood_max: Mapped[int] = mapped_column(Integer, nullable=False)
+    sleep_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sleep_min: Mapped[float] = mapped_column(Float, nullable=False)
+    sleep_max: Mapped[float] = mapped_column(Float, nullable=False)
+    stress_low: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stress_medium: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stress_high: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stress_critical: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class UserStreak(Base):
+    """Check-in streak per user, counted in calendar days of `timezone`."""
+    __tablename__ = "user_streaks"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), unique=True, nullable=False)
+    current_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    longest_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_checkin_day: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    tz_name: Mapped[str] = mapped_column(String(64), default="UTC", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class AnalysisJob(Base):
+    """Durable queue entry for analysing a check-in; removed once the analysis commits."""
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (Index("ix_analysis_jobs_status_run_after", "status", "run_after"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    checkin_id: Mapped[str] = mapped_column(String(36), ForeignKey("daily_checkins.id"), unique=True, nullable=False)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    run_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class CoachAssignment(Base):
+    """A coach's client; coaches see cohort analytics over their assigned clients."""
+    __tablename__ = "coach_assignments"
+    __table_args__ = (UniqueConstraint("coach_id", "client_id", name="uq_coach_assignments_coach_client"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    coach_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
+    client_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class PlatformSnapshot(Base):
+    """Platform-wide aggregates for one UTC day, maintained by the snapshot job."""
+    __tablename__ = "platform_snapshots"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    day: Mapped[date] = mapped_column(Date, unique=True, nullable=False)
+    new_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    active_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    checkins: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_checkins: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mood_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sleep_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    stress_low: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stress_medium: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stress_high: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stress_critical: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    analyses: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    risk_low: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    risk_moderate: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    risk_high: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    risk_critical: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class UserBaseline(Base):
+    """Running mood/sleep statistics per user (Welford mean/variance, time-decayed EWMAs)."""
+    __tablename__ = "user_baselines"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), unique=True, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mood_mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    mood_m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sleep_mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sleep_m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    mood_ewma_7: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    mood_ewma_30: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sleep_ewma_7: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sleep_ewma_30: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    last_checkin_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class UserDataVersion(Base):
+    """Per-user counter bumped by every write to the user's data; the ETag of their read endpoints."""
+    __tablename__ = "user_data_versions"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), unique=True, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -2,10 +2,12 @@ from app.schemas.schemas import *
 
 __all__ = [
     "LoginRequest", "SignupRequest", "UserResponse", "AuthMessageResponse",
-    "CheckinRequest", "CheckinResponse", "CheckinWithAnalysis",
+    "CheckinRequest", "CheckinImportRow", "CheckinResponse", "CheckinWithAnalysis",
     "AnalysisResponse", "InsightResponse",
     "AlertResponse", "AlertUpdateRequest",
     "DashboardResponse",
+    "CoachAssignmentRequest", "CoachAssignmentResponse", "CoachClientSummary", "CohortWindow", "CohortResponse",
+    "PlatformDay", "PlatformAnalyticsResponse",
     "UserUpdateRequest", "UserSettingsResponse", "UserSettingsUpdateRequest",
     "RoleUpdateRequest", "PaginatedUsersResponse",
     "ApiResponse",
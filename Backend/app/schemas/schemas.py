@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, Union, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 
 # ===== Auth Schemas =====
@@ -39,6 +39,11 @@ class CheckinRequest(BaseModel):
     notes: str = Field(default="", max_length=1000)
 
 
+class CheckinImportRow(CheckinRequest):
+    """One row of a bulk import; `created_at` defaults to the time of the import."""
+    created_at: Optional[datetime] = None
+
+
 class CheckinResponse(BaseModel):
     id: str
     user_id: str
@@ -83,7 +88,9 @@ class AlertResponse(BaseModel):
     type: str
     status: str
     payload: Dict[str, Any]
+    occurrence_count: int = 1
     created_at: datetime
+    last_seen_at: Optional[datetime] = None
 
     model_config = {"from_attributes": True}
 
@@ -97,6 +104,7 @@ class DashboardResponse(BaseModel):
     avg_mood: float
     avg_sleep: float
     checkin_streak: int
+    longest_streak: int = 0
     open_alerts: int
     mood_trend: List[Dict[str, Any]]
     sleep_trend: List[Dict[str, Any]]
@@ -104,6 +112,75 @@ class DashboardResponse(BaseModel):
     recent_checkins: List[CheckinResponse]
 
 
+# ===== Coach Schemas =====
+class CoachAssignmentRequest(BaseModel):
+    client_id: str
+
+
+class CoachAssignmentResponse(BaseModel):
+    client_id: str
+    full_name: str
+    email: str
+    assigned_at: datetime
+
+
+class CoachClientSummary(BaseModel):
+    id: str
+    full_name: str
+    email: str
+    checkins: int
+    avg_mood: Optional[float]
+    avg_sleep: Optional[float]
+    last_checkin_day: Optional[date]
+    open_alerts: int
+    open_risk_alerts: int
+
+
+class CohortWindow(BaseModel):
+    active_clients: int
+    checkins: int
+    avg_mood: Optional[float]
+    avg_sleep: Optional[float]
+    stress_distribution: List[Dict[str, Any]]
+
+
+class CohortResponse(BaseModel):
+    range_days: int
+    clients: int
+    current: CohortWindow
+    previous: CohortWindow
+    deltas: Dict[str, Optional[float]]
+    risk_distribution: List[Dict[str, Any]]
+    at_risk_clients: List[Dict[str, Any]]
+
+
+# ===== Admin Analytics Schemas =====
+class PlatformDay(BaseModel):
+    day: date
+    new_users: int
+    active_users: int
+    checkins: int
+    avg_mood: Optional[float]
+    avg_sleep: Optional[float]
+    analyses: int
+    risk_distribution: Dict[str, int]
+
+
+class PlatformAnalyticsResponse(BaseModel):
+    range_days: int
+    computed_at: Optional[datetime]
+    total_users: int
+    total_checkins: int
+    new_users: int
+    checkins: int
+    avg_daily_active_users: float
+    avg_mood: Optional[float]
+    avg_sleep: Optional[float]
+    stress_distribution: List[Dict[str, Any]]
+    risk_distribution: List[Dict[str, Any]]
+    days: List[PlatformDay]
+
+
 # ===== User Update Schemas =====
 class UserUpdateRequest(BaseModel):
     full_name: Optional[str] = None
@@ -133,10 +210,10 @@ class RoleUpdateRequest(BaseModel):
 
 class PaginatedUsersResponse(BaseModel):
     items: List[UserResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
     per_page: int
     has_next: bool
+    next_cursor: Optional[str] = None
 
 
 # ===== Generic API Envelope =====
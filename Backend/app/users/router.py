@@ -1,9 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-
-from app.database.session import get_db
-from app.core.deps import get_current_user, require_role
+from sqlalchemy import select
+from typing import Optional
+
+from app.database.session import get_db, get_read_db
+from app.core.deps import get_current_user, require_role, Principal, invalidate_principal_on_commit, principal_cache
+from app.core.security import token_cache
+from app.core.pagination import (
+    clamp_limit, keyset_page, split_page, count_total, encode_offset_cursor, decode_offset_cursor,
+)
+from app.core.cache import response_cache, invalidate_user_on_commit
+from app.core.etag import bump_data_version
+from app.checkins.streaks import rebuild_streak
+from app.ai.queue import worker_pool
+from app.users.search import search_users
 from app.models.models import User, UserRole, UserSettings
 from app.schemas.schemas import (
     UserResponse, UserUpdateRequest, UserSettingsResponse, UserSettingsUpdateRequest,
@@ -15,32 +25,35 @@ router = APIRouter(tags=["Users"])
 
 # ===== User Profile =====
 @router.get("/users/profile")
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: Principal = Depends(get_current_user)):
     return {"ok": True, "data": UserResponse.model_validate(current_user), "error": None}
 
 
 @router.put("/users/profile")
 async def update_profile(
     data: UserUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one()
     if data.full_name:
-        current_user.full_name = data.full_name
+        user.full_name = data.full_name
     if data.email:
         # Check uniqueness
         existing = await db.execute(select(User).where(User.email == data.email, User.id != current_user.id))
         if existing.scalar_one_or_none():
             raise HTTPException(status_code=400, detail="Email already taken")
-        current_user.email = data.email
+        user.email = data.email
     await db.flush()
-    return {"ok": True, "data": UserResponse.model_validate(current_user), "error": None}
+    invalidate_principal_on_commit(db, user.id)
+    return {"ok": True, "data": UserResponse.model_validate(user), "error": None}
 
 
 # ===== User Settings =====
 @router.get("/users/settings")
 async def get_settings(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(UserSettings).where(UserSettings.user_id == current_user.id))
@@ -55,7 +68,7 @@ async def get_settings(
 @router.put("/users/settings")
 async def update_settings(
     data: UserSettingsUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(UserSettings).where(UserSettings.user_id == current_user.id))
@@ -65,10 +78,17 @@ async def update_settings(
         db.add(settings)
 
     prefs = dict(settings.preferences)
+    previous_tz = prefs.get("timezone")
     for key, val in data.model_dump(exclude_none=True).items():
         prefs[key] = val
     settings.preferences = prefs
     await db.flush()
+    await bump_data_version(db, current_user.id)
+
+    # Streak days are counted in the user's timezone
+    if prefs.get("timezone") != previous_tz:
+        await rebuild_streak(db, current_user.id, prefs.get("timezone"))
+        invalidate_user_on_commit(db, current_user.id)
 
     return {"ok": True, "data": UserSettingsResponse.model_validate(settings), "error": None}
 
@@ -76,35 +96,34 @@ async def update_settings(
 # ===== Admin: User Management =====
 @router.get("/admin/users")
 async def admin_list_users(
-    page: int = 1,
     per_page: int = 20,
+    cursor: Optional[str] = None,
     search: str = "",
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
-    db: AsyncSession = Depends(get_db),
+    include_total: bool = False,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(User)
-    if search:
-        query = query.where(
-            User.full_name.ilike(f"%{search}%") | User.email.ilike(f"%{search}%")
-        )
-
-    # Count total
-    count_result = await db.execute(select(func.count()).select_from(query.subquery()))
-    total = count_result.scalar() or 0
-
-    # Paginate
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    result = await db.execute(query)
-    users = result.scalars().all()
+    per_page = clamp_limit(per_page)
+    if search.strip():
+        # Ranked index search; cursors carry the offset into the ranking
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        users, has_more, total = await search_users(db, search, per_page, offset, with_total=include_total)
+        next_cursor = encode_offset_cursor(offset + per_page) if has_more else None
+    else:
+        # Keyset page (newest first); exact total only on request
+        query = select(User)
+        result = await db.execute(keyset_page(query, User.created_at, User.id, cursor, per_page))
+        users, next_cursor = split_page(result.scalars().all(), per_page)
+        total = await count_total(db, query) if include_total else None
 
     return {
         "ok": True,
         "data": {
             "items": [UserResponse.model_validate(u) for u in users],
             "total": total,
-            "page": page,
             "per_page": per_page,
-            "has_next": (page * per_page) < total,
+            "has_next": next_cursor is not None,
+            "next_cursor": next_cursor,
         },
         "error": None,
     }
@@ -114,7 +133,7 @@ async def admin_list_users(
 async def admin_update_role(
     user_id: str,
     data: RoleUpdateRequest,
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
@@ -124,6 +143,7 @@ async def admin_update_role(
 
     user.role = UserRole(data.role)
     await db.flush()
+    invalidate_principal_on_commit(db, user.id)
 
     return {"ok": True, "data": UserResponse.model_validate(user), "error": None}
 
@@ -131,7 +151,7 @@ async def admin_update_role(
 @router.delete("/admin/users/{user_id}")
 async def admin_delete_user(
     user_id: str,
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
@@ -143,5 +163,27 @@ async def admin_delete_user(
 
     user.is_active = False  # soft delete
     await db.flush()
+    invalidate_principal_on_commit(db, user.id)
 
     return {"ok": True, "data": {"message": "User deactivated"}, "error": None}
+
+
+@router.get("/admin/cache/stats")
+async def admin_cache_stats(current_user: Principal = Depends(require_role(UserRole.ADMIN))):
+    return {
+        "ok": True,
+        "data": {
+            "responses": response_cache.stats(),
+            "principals": principal_cache.stats(),
+            "tokens": token_cache.stats(),
+        },
+        "error": None,
+    }
+
+
+@router.get("/admin/queue/stats")
+async def admin_queue_stats(
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return {"ok": True, "data": await worker_pool.stats(db), "error": None}
@@ -0,0 +1,85 @@
+"""
+Indexed admin user search over name and email.
+
+SQLite: an FTS5 table (`users_fts`) kept in sync with `users` by triggers, so signups,
+profile edits and deletes are indexed in the same transaction. `users` has a string
+primary key, and its implicit rowid may be renumbered by VACUUM. So FTS rows are
+keyed by `users_fts_keys`, whose INTEGER PRIMARY KEY is stable, and matches join
+back to `users` through it. Deactivation is a soft delete that keeps the row (and its searchable text), so it
+needs no index change. Queries are token-prefix matches ranked by bm25.
+
+Postgres: a GIN trigram index on `lower(full_name) || ' ' || lower(email)`; each token
+must appear as a substring and results are ranked by trigram similarity.
+
+Other databases (or SQLite without FTS5) fall back to an unindexed ILIKE scan. The
+indexes are created by migrations 0002 and 0008.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import String, and_, column, func, literal_column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import User
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+users_fts = table("users_fts", column("rowid"))
+users_fts_keys = table("users_fts_keys", column("id"), column("user_id"))
+
+
+def search_tokens(term: str) -> List[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(term)]
+
+
+async def _has_fts(db: AsyncSession) -> bool:
+    result = await db.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"))
+    return result.first() is not None
+
+
+async def search_users(
+    db: AsyncSession,
+    term: str,
+    limit: int,
+    offset: int = 0,
+    with_total: bool = False,
+) -> Tuple[List[User], bool, Optional[int]]:
+    """Best matches for `term`; returns (users, has_more, total or None)."""
+    tokens = search_tokens(term)
+    if not tokens:
+        return [], False, 0 if with_total else None
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite" and await _has_fts(db):
+        match = " ".join(f'"{token}"*' for token in tokens)
+        query = (
+            select(User)
+            .join(users_fts_keys, users_fts_keys.c.user_id == User.id)
+            .join(users_fts, users_fts.c.rowid == users_fts_keys.c.id)
+            .where(literal_column("users_fts").op("MATCH")(match))
+        )
+        ranked = query.order_by(func.bm25(literal_column("users_fts")), User.id)
+    elif dialect == "postgresql":
+        # Must compile to the indexed expression exactly (a bound ' ' would not match it)
+        document = func.lower(User.full_name) + literal_column("' '", String) + func.lower(User.email)
+        query = select(User).where(and_(*[document.like(f"%{_escape_like(t)}%", escape="\\") for t in tokens]))
+        ranked = query.order_by(func.similarity(document, " ".join(tokens)).desc(), User.id)
+    else:
+        patterns = [f"%{_escape_like(t)}%" for t in tokens]
+        query = select(User).where(and_(*[
+            User.full_name.ilike(p, escape="\\") | User.email.ilike(p, escape="\\") for p in patterns
+        ]))
+        ranked = query.order_by(User.created_at.desc(), User.id)
+
+    result = await db.execute(ranked.offset(offset).limit(limit + 1))
+    users = list(result.scalars().all())
+    has_more = len(users) > limit
+    total = None
+    if with_total:
+        count_result = await db.execute(select(func.count()).select_from(query.subquery()))
+        total = count_result.scalar() or 0
+    return users[:limit], has_more, total
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
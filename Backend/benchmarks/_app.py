@@ -0,0 +1,55 @@
+"""
+Shared setup for the benchmarks: a throwaway SQLite database and an in-process
+HTTP client bound to the ASGI app. Call `prepare_env` before importing `app`.
+"""
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_env(**overrides: str) -> str:
+    """Point the app at a fresh SQLite file; returns its path."""
+    path = os.path.join(tempfile.mkdtemp(prefix="mindpulse-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ["DEBUG"] = "false"
+    os.environ.update(overrides)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return path
+
+
+async def make_client():
+    import httpx
+    from app.database.session import init_db
+    from app.main import app
+
+    await init_db()
+    # https so the secure auth cookies are sent back
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://bench")
+
+
+async def signup(client, email: str, password: str = "benchmark-password") -> Dict:
+    response = await client.post(
+        "/api/v1/auth/signup", json={"email": email, "password": password, "full_name": "Bench User"}
+    )
+    response.raise_for_status()
+    return response.json()["data"]["user"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label: str, seconds: List[float]) -> str:
+    ms = [s * 1000 for s in seconds]
+    return (
+        f"{label:<28} n={len(ms):<6} p50={percentile(ms, 50):8.2f}ms "
+        f"p99={percentile(ms, 99):8.2f}ms max={max(ms) if ms else 0:8.2f}ms"
+    )
@@ -0,0 +1,90 @@
+"""
+End-to-end latency of the list endpoints' serialization path.
+
+    checkins 365d    GET /checkins?range=365d&limit=365 over a year of daily check-ins
+    alerts cold      GET /alerts with the response cache cleared before each request
+    alerts warm      GET /alerts served from the response cache
+
+    python benchmarks/bench_lists.py --iterations 300 --alerts 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _app import prepare_env, make_client, signup, summarize  # noqa: E402
+
+
+async def run(args):
+    prepare_env(MAX_PAGE_SIZE="1000")
+    from sqlalchemy import insert
+    from app.core.cache import response_cache
+    from app.database.session import async_session
+    from app.models.models import Alert, AlertType
+
+    client = await make_client()
+    user = await signup(client, "bench-lists@example.com")
+    now = datetime.now(timezone.utc)
+    history = "\n".join(
+        json.dumps({
+            "mood": day % 10 + 1,
+            "sleep_hours": 5 + day % 5,
+            "notes": "Long day at work, went for a walk in the evening and slept reasonably well.",
+            "created_at": (now - timedelta(days=day, hours=1)).isoformat(),
+        })
+        for day in range(365)
+    )
+    response = await client.post("/api/v1/checkins/import?format=ndjson", content=history.encode())
+    response.raise_for_status()
+
+    types = list(AlertType)
+    async with async_session() as db:
+        await db.execute(insert(Alert), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user["id"],
+                "type": types[i % len(types)],
+                "payload": {"message": "Sleep was only 4.5h", "sleep_hours": 4.5, "risk_score": i % 10},
+                "occurrence_count": 1 + i % 3,
+                "created_at": now - timedelta(hours=i),
+                "last_seen_at": now - timedelta(hours=i),
+            }
+            for i in range(args.alerts)
+        ])
+        await db.commit()
+
+    async def measure(label, url, before=None):
+        timings = []
+        size = 0
+        for i in range(args.iterations + 10):
+            if before:
+                before()
+            started = time.perf_counter()
+            response = await client.get(url)
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            size = len(response.content)
+            if i >= 10:  # warm-up
+                timings.append(elapsed)
+        print(f"{summarize(label, timings)} body={size / 1024:.0f}KiB")
+
+    await measure("checkins 365d", "/api/v1/checkins?range=365d&limit=365")
+    await measure("alerts cold", f"/api/v1/alerts?limit={args.alerts}", response_cache.clear)
+    await measure("alerts warm", f"/api/v1/alerts?limit={args.alerts}")
+    await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--alerts", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Login burst benchmark: login throughput and the latency other endpoints see meanwhile.
+
+Runs concurrent logins while a probe keeps calling `GET /health` on the same event
+loop. With hashing inline (PASSWORD_HASH_WORKERS=0) each bcrypt call stalls the probe;
+with the hashing pool it should stay in the low milliseconds.
+
+    python benchmarks/bench_login.py --compare
+    python benchmarks/bench_login.py --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _app import prepare_env, make_client, signup, summarize  # noqa: E402
+
+
+async def run(args):
+    prepare_env(BCRYPT_ROUNDS=str(args.rounds))
+    from app.core.config import settings
+
+    client = await make_client()
+    users = [f"bench{i}@example.com" for i in range(args.users)]
+    for email in users:
+        await signup(client, email)
+
+    login_latency, probe_latency = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    done = asyncio.Event()
+
+    async def login(i):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/auth/login", json={"email": users[i % len(users)], "password": "benchmark-password"}
+            )
+            if response.status_code == 200:
+                login_latency.append(time.perf_counter() - started)
+
+    async def probe():
+        # Latency is measured from when the probe was *due*, so time spent waiting for
+        # a blocked event loop counts, not just the request itself.
+        due = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await client.get("/health")
+            finished = time.perf_counter()
+            probe_latency.append(finished - due)
+            due = max(due + args.probe_interval, finished)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    await client.aclose()
+
+    mode = f"pool({settings.PASSWORD_HASH_WORKERS})" if settings.PASSWORD_HASH_WORKERS else "inline"
+    print(f"[{mode}] bcrypt rounds={args.rounds}: {len(login_latency)}/{args.logins} logins "
+          f"in {elapsed:.2f}s ({len(login_latency) / elapsed:.1f}/s)")
+    print(summarize(f"[{mode}] login", login_latency))
+    print(summarize(f"[{mode}] GET /health during burst", probe_latency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--probe-interval", type=float, default=0.005)
+    parser.add_argument("--compare", action="store_true", help="Run inline hashing and the hashing pool back to back")
+    args = parser.parse_args()
+
+    if args.compare:
+        argv = [a for a in sys.argv[1:] if a != "--compare"]
+        for workers in ("0", os.environ.get("PASSWORD_HASH_WORKERS", "4")):
+            env = dict(os.environ, PASSWORD_HASH_WORKERS=workers)
+            subprocess.run([sys.executable, os.path.abspath(__file__), *argv], env=env, check=True)
+        return
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
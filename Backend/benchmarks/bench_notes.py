@@ -0,0 +1,89 @@
+"""
+Throughput of the notes lexicon scan (`app.ai.notes`).
+
+    signals       one process, one note at a time (the analysis worker path)
+    pool          the process pool `rescore` uses, one slice of the chunk per worker
+
+Notes are synthetic: random words mixed with lexicon terms and negations, up to
+the 1000 characters a check-in allows.
+
+    python benchmarks/bench_notes.py --notes 50000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _app import prepare_env  # noqa: E402
+
+FILLER = (
+    "today work went fine and then i had lunch with friends before a long meeting about the project "
+    "in the evening we walked the dog and i read a book for a while"
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Notes per pool round (as in rescore)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    prepare_env()
+    import asyncio
+    import random
+    from app.ai.batch import _notes_pool, _pool_signals
+    from app.ai.rules import current_rules
+
+    rules = current_rules()
+    analyzer = rules.notes
+    terms = [term for name in analyzer.categories for term in analyzer.spec["categories"][name]["terms"]]
+    negations = sorted(analyzer.negations)
+    rng = random.Random(args.seed)
+
+    def note() -> str:
+        words = []
+        for _ in range(rng.randint(5, 180)):
+            roll = rng.random()
+            words.append(rng.choice(terms) if roll < 0.08 else rng.choice(negations) if roll < 0.12 else rng.choice(FILLER))
+            if rng.random() < 0.1:
+                words[-1] += "."
+        return " ".join(words)[:1000]
+
+    notes = [note() for _ in range(args.notes)]
+    chars = sum(len(text) for text in notes)
+    print(f"{len(analyzer.categories)} categories, {len(terms)} terms; "
+          f"{args.notes} notes, {chars / args.notes:.0f} chars on average")
+
+    def report(label: str, seconds: float):
+        print(f"{label:<18} {seconds * 1000:9.1f}ms  {args.notes / seconds:>10,.0f} notes/s")
+
+    started = time.perf_counter()
+    expected = analyzer.signals_many(notes)
+    report("signals", time.perf_counter() - started)
+
+    async def pooled():
+        pool = _notes_pool(rules, args.workers)
+        if pool is None:
+            return None
+        try:
+            await _pool_signals(pool, args.workers, notes[:args.workers])  # start the workers
+            started = time.perf_counter()
+            results = []
+            for i in range(0, len(notes), args.chunk_size):
+                results += await _pool_signals(pool, args.workers, notes[i:i + args.chunk_size])
+            report(f"pool x{args.workers}", time.perf_counter() - started)
+            return results
+        finally:
+            pool.shutdown()
+
+    results = asyncio.run(pooled())
+    if results is not None and results != expected:
+        print("pool/in-process results differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Throughput of the compiled wellness rules (`app.ai.rules`).
+
+    evaluate        one check-in at a time (the analysis worker path)
+    evaluate_batch  NumPy columns (bulk import and `rescore`)
+    batch_results   evaluate_batch plus shaping rows for the bulk insert
+
+Also checks that both paths agree on every row.
+
+    python benchmarks/bench_rules.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _app import prepare_env  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per evaluate_batch call")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    prepare_env()
+    import numpy as np
+    from app.ai.batch import batch_results
+    from app.ai.rules import current_rules
+
+    rules = current_rules()
+    rng = np.random.default_rng(args.seed)
+    mood = rng.integers(1, 11, args.rows)
+    sleep = np.round(rng.uniform(0, 14, args.rows), 1)
+    print(f"rules {rules.model_version}, {args.rows} rows")
+    no_notes = rules.note_inputs(rules.notes.signals(None))  # notes are covered by bench_notes.py
+
+    def chunk_inputs(start: int):
+        chunk = mood[start:start + args.chunk_size]
+        return {"mood": chunk, "sleep": sleep[start:start + args.chunk_size],
+                **{name: np.zeros_like(chunk) for name in no_notes}}
+
+    def report(label: str, seconds: float):
+        print(f"{label:<16} {seconds * 1000:9.1f}ms  {args.rows / seconds:>12,.0f} rows/s")
+
+    started = time.perf_counter()
+    scalar = [rules.evaluate({"mood": m, "sleep": s, **no_notes}) for m, s in zip(mood.tolist(), sleep.tolist())]
+    report("evaluate", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    chunks = [
+        rules.evaluate_batch(chunk_inputs(i))
+        for i in range(0, args.rows, args.chunk_size)
+    ]
+    report("evaluate_batch", time.perf_counter() - started)
+
+    ids = [str(i) for i in range(args.rows)]
+    started = time.perf_counter()
+    for i in range(0, args.rows, args.chunk_size):
+        batch_results(ids[i:i + args.chunk_size], ids[i:i + args.chunk_size],
+                      mood[i:i + args.chunk_size], sleep[i:i + args.chunk_size], rules)
+    report("batch_results", time.perf_counter() - started)
+
+    mismatches = 0
+    for n, chunk in enumerate(chunks):
+        for name, column in chunk.items():
+            values = column.tolist() if isinstance(column, np.ndarray) else column
+            for offset, value in enumerate(values):
+                if scalar[n * args.chunk_size + offset][name] != value:
+                    mismatches += 1
+    print(f"scalar/batch mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Alembic environment (async engine).
+
+Runs against `settings.DATABASE_URL`. When the app applies migrations itself
+(`init_db` with `DB_AUTO_MIGRATE`), it passes its open connection in
+`config.attributes["connection"]` and no second engine is created.
+"""
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.database.session import Base
+import app.models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Search index objects managed outside the ORM metadata (see app/users/search.py)
+EXTERNAL_TABLES = {
+    "users_fts", "users_fts_data", "users_fts_idx", "users_fts_docsize", "users_fts_config", "users_fts_content",
+    "users_fts_keys",
+}
+EXTERNAL_INDEXES = {"ix_users_search_trgm"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table":
+        return name not in EXTERNAL_TABLES
+    if type_ == "index":
+        return name not in EXTERNAL_INDEXES
+    return True
+
+
+def _configure(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+    )
+
+
+def do_run_migrations(connection: Connection) -> None:
+    _configure(connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,172 @@
+"""baseline schema
+
+The tables `Base.metadata.create_all` produced before migrations were introduced.
+Databases created that way are adopted by the first `alembic upgrade head`, which
+only creates the tables they are missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 12:29:06.252058
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created by `create_all` before migrations existed already have some or all
+    # of these tables: only the missing ones are created, so `upgrade head` adopts them.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table('users',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('full_name', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.Enum('USER', 'COACH', 'ADMIN', name='userrole'), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if 'daily_checkins' not in existing:
+        op.create_table('daily_checkins',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('mood', sa.Integer(), nullable=False),
+        sa.Column('sleep_hours', sa.Float(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_daily_checkins_user_id', 'daily_checkins', ['user_id'], unique=False)
+
+    if 'daily_rollups' not in existing:
+        op.create_table('daily_rollups',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('checkin_count', sa.Integer(), nullable=False),
+        sa.Column('mood_sum', sa.Integer(), nullable=False),
+        sa.Column('mood_min', sa.Integer(), nullable=False),
+        sa.Column('mood_max', sa.Integer(), nullable=False),
+        sa.Column('sleep_sum', sa.Float(), nullable=False),
+        sa.Column('sleep_min', sa.Float(), nullable=False),
+        sa.Column('sleep_max', sa.Float(), nullable=False),
+        sa.Column('stress_low', sa.Integer(), nullable=False),
+        sa.Column('stress_medium', sa.Integer(), nullable=False),
+        sa.Column('stress_high', sa.Integer(), nullable=False),
+        sa.Column('stress_critical', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', name='uq_daily_rollups_user_day')
+        )
+        op.create_index('ix_daily_rollups_user_id', 'daily_rollups', ['user_id'], unique=False)
+
+    if 'user_settings' not in existing:
+        op.create_table('user_settings',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('preferences', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+        )
+
+    if 'user_streaks' not in existing:
+        op.create_table('user_streaks',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('current_streak', sa.Integer(), nullable=False),
+        sa.Column('longest_streak', sa.Integer(), nullable=False),
+        sa.Column('last_checkin_day', sa.Date(), nullable=True),
+        sa.Column('tz_name', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+        )
+
+    if 'ai_analysis_results' not in existing:
+        op.create_table('ai_analysis_results',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('checkin_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('model_version', sa.String(length=50), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('labels', sa.JSON(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['checkin_id'], ['daily_checkins.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('checkin_id')
+        )
+        op.create_index('ix_ai_analysis_results_user_id', 'ai_analysis_results', ['user_id'], unique=False)
+
+    if 'analysis_jobs' not in existing:
+        op.create_table('analysis_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('checkin_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DEAD', name='jobstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('claimed_by', sa.String(length=36), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['checkin_id'], ['daily_checkins.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('checkin_id')
+        )
+        op.create_index('ix_analysis_jobs_status_run_after', 'analysis_jobs', ['status', 'run_after'], unique=False)
+
+    if 'alerts' not in existing:
+        op.create_table('alerts',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('ai_result_id', sa.String(length=36), nullable=True),
+        sa.Column('type', sa.Enum('LOW_SLEEP', 'HIGH_STRESS', 'RISK_DETECTED', 'POSITIVE_TREND', name='alerttype'), nullable=False),
+        sa.Column('status', sa.Enum('OPEN', 'ACKNOWLEDGED', 'CLOSED', name='alertstatus'), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['ai_result_id'], ['ai_analysis_results.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_alerts_user_id', 'alerts', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_user_id', table_name='alerts')
+    op.drop_table('alerts')
+    op.drop_index('ix_analysis_jobs_status_run_after', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
+    op.drop_index('ix_ai_analysis_results_user_id', table_name='ai_analysis_results')
+    op.drop_table('ai_analysis_results')
+    op.drop_table('user_streaks')
+    op.drop_table('user_settings')
+    op.drop_index('ix_daily_rollups_user_id', table_name='daily_rollups')
+    op.drop_table('daily_rollups')
+    op.drop_index('ix_daily_checkins_user_id', table_name='daily_checkins')
+    op.drop_table('daily_checkins')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in ('alertstatus', 'alerttype', 'jobstatus', 'userrole'):
+            sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,118 @@
+"""query indexes
+
+Per-user lists and the dashboard filter on `user_id` and page by `created_at`;
+the open-alerts count filters on `(user_id, status)`. The composite indexes
+replace the single-column `user_id` indexes, which they cover. The admin user
+list pages over `(created_at, id)` and searches through the dialect's search
+index: an external-content FTS5 table on SQLite (skipped when SQLite lacks FTS5)
+and a trigram GIN index on Postgres. The DDL is idempotent, so databases whose
+index `init_db` already created are fine.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:29:33.441466
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        full_name, email, content='users', content_rowid='rowid', tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, full_name, email) VALUES (new.rowid, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, full_name, email)
+        VALUES ('delete', old.rowid, old.full_name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF full_name, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, full_name, email)
+        VALUES ('delete', old.rowid, old.full_name, old.email);
+        INSERT INTO users_fts(rowid, full_name, email) VALUES (new.rowid, new.full_name, new.email);
+    END
+    """,
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+)
+
+POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users
+    USING gin ((lower(full_name) || ' ' || lower(email)) gin_trgm_ops)
+    """,
+)
+
+
+def _create_search_index() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        try:
+            op.execute(SQLITE_SEARCH_DDL[0])
+        except sa.exc.OperationalError:  # SQLite built without FTS5: search falls back to LIKE
+            return
+        for statement in SQLITE_SEARCH_DDL[1:]:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+
+
+def _drop_search_index() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('users_fts_ai', 'users_fts_ad', 'users_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS users_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_users_search_trgm')
+
+
+def upgrade() -> None:
+    op.create_index('ix_daily_checkins_user_created', 'daily_checkins', ['user_id', 'created_at'], unique=False)
+    op.drop_index('ix_daily_checkins_user_id', table_name='daily_checkins')
+
+    op.create_index('ix_ai_analysis_results_user_created', 'ai_analysis_results', ['user_id', 'created_at'], unique=False)
+    op.drop_index('ix_ai_analysis_results_user_id', table_name='ai_analysis_results')
+
+    op.create_index('ix_alerts_user_created', 'alerts', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_alerts_user_status', 'alerts', ['user_id', 'status'], unique=False)
+    op.drop_index('ix_alerts_user_id', table_name='alerts')
+
+    # Covered by uq_daily_rollups_user_day
+    op.drop_index('ix_daily_rollups_user_id', table_name='daily_rollups')
+
+    op.create_index('ix_users_created_at', 'users', ['created_at', 'id'], unique=False)
+    _create_search_index()
+
+
+def downgrade() -> None:
+    _drop_search_index()
+    op.drop_index('ix_users_created_at', table_name='users')
+
+    op.create_index('ix_daily_rollups_user_id', 'daily_rollups', ['user_id'], unique=False)
+
+    op.create_index('ix_alerts_user_id', 'alerts', ['user_id'], unique=False)
+    op.drop_index('ix_alerts_user_status', table_name='alerts')
+    op.drop_index('ix_alerts_user_created', table_name='alerts')
+
+    op.create_index('ix_ai_analysis_results_user_id', 'ai_analysis_results', ['user_id'], unique=False)
+    op.drop_index('ix_ai_analysis_results_user_created', table_name='ai_analysis_results')
+
+    op.create_index('ix_daily_checkins_user_id', 'daily_checkins', ['user_id'], unique=False)
+    op.drop_index('ix_daily_checkins_user_created', table_name='daily_checkins')
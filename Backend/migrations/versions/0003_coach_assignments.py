@@ -0,0 +1,35 @@
+"""coach assignments
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:36:41.205715
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('coach_assignments',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('coach_id', sa.String(length=36), nullable=False),
+    sa.Column('client_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('coach_id', 'client_id', name='uq_coach_assignments_coach_client')
+    )
+    op.create_index('ix_coach_assignments_client_id', 'coach_assignments', ['client_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_coach_assignments_client_id', table_name='coach_assignments')
+    op.drop_table('coach_assignments')
@@ -0,0 +1,53 @@
+"""platform snapshots
+
+Daily platform aggregates for admin analytics, plus the per-day indexes the
+snapshot job reads `ai_analysis_results` and `daily_rollups` through.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:39:58.794893
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('platform_snapshots',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('new_users', sa.Integer(), nullable=False),
+    sa.Column('total_users', sa.Integer(), nullable=False),
+    sa.Column('active_users', sa.Integer(), nullable=False),
+    sa.Column('checkins', sa.Integer(), nullable=False),
+    sa.Column('total_checkins', sa.Integer(), nullable=False),
+    sa.Column('mood_sum', sa.Integer(), nullable=False),
+    sa.Column('sleep_sum', sa.Float(), nullable=False),
+    sa.Column('stress_low', sa.Integer(), nullable=False),
+    sa.Column('stress_medium', sa.Integer(), nullable=False),
+    sa.Column('stress_high', sa.Integer(), nullable=False),
+    sa.Column('stress_critical', sa.Integer(), nullable=False),
+    sa.Column('analyses', sa.Integer(), nullable=False),
+    sa.Column('risk_low', sa.Integer(), nullable=False),
+    sa.Column('risk_moderate', sa.Integer(), nullable=False),
+    sa.Column('risk_high', sa.Integer(), nullable=False),
+    sa.Column('risk_critical', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day')
+    )
+    op.create_index('ix_ai_analysis_results_created_at', 'ai_analysis_results', ['created_at'], unique=False)
+    op.create_index('ix_daily_rollups_day', 'daily_rollups', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_rollups_day', table_name='daily_rollups')
+    op.drop_index('ix_ai_analysis_results_created_at', table_name='ai_analysis_results')
+    op.drop_table('platform_snapshots')
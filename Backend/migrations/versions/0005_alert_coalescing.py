@@ -0,0 +1,33 @@
+"""alert coalescing
+
+Existing alerts are single occurrences last seen when they were created.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:44:15.516922
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('occurrence_count', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('alerts', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute('UPDATE alerts SET last_seen_at = created_at')
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.alter_column('occurrence_count', server_default=None)
+        batch_op.alter_column('last_seen_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.drop_column('last_seen_at')
+        batch_op.drop_column('occurrence_count')
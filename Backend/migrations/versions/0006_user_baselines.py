@@ -0,0 +1,43 @@
+"""user baselines
+
+Empty until `python -m app.cli rebuild-baselines` or the next analysis of each user.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:48:45.846603
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_baselines',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('mood_mean', sa.Float(), nullable=False),
+    sa.Column('mood_m2', sa.Float(), nullable=False),
+    sa.Column('sleep_mean', sa.Float(), nullable=False),
+    sa.Column('sleep_m2', sa.Float(), nullable=False),
+    sa.Column('mood_ewma_7', sa.Float(), nullable=False),
+    sa.Column('mood_ewma_30', sa.Float(), nullable=False),
+    sa.Column('sleep_ewma_7', sa.Float(), nullable=False),
+    sa.Column('sleep_ewma_30', sa.Float(), nullable=False),
+    sa.Column('last_checkin_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_baselines')
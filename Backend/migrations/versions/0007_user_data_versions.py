@@ -0,0 +1,49 @@
+"""user data versions
+
+Every existing user starts at version 1.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 12:58:48.934767
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_data_versions',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+
+    versions = sa.table(
+        'user_data_versions',
+        sa.column('id', sa.String), sa.column('user_id', sa.String),
+        sa.column('version', sa.Integer), sa.column('updated_at', sa.DateTime(timezone=True)),
+    )
+    now = datetime.now(timezone.utc)
+    user_ids = [row[0] for row in op.get_bind().execute(sa.text('SELECT id FROM users'))]
+    for start in range(0, len(user_ids), 1000):
+        op.bulk_insert(versions, [
+            {'id': str(uuid.uuid4()), 'user_id': user_id, 'version': 1, 'updated_at': now}
+            for user_id in user_ids[start:start + 1000]
+        ])
+
+
+def downgrade() -> None:
+    op.drop_table('user_data_versions')
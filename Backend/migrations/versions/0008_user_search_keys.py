@@ -0,0 +1,113 @@
+"""user search keys
+
+The SQLite search index keyed its rows on the implicit rowid of `users`, which
+VACUUM may renumber. It is rebuilt as a regular FTS5 table whose rows are keyed by
+`users_fts_keys`, a table with a stable INTEGER PRIMARY KEY per user. Postgres is
+unaffected, as are SQLite builds without FTS5 (no index was created in 0002).
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 13:40:12.518204
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_FTS_KEY = "(SELECT id FROM users_fts_keys WHERE user_id = {}.id)"
+
+KEYED_DDL = (
+    """
+    CREATE TABLE users_fts_keys (
+        id INTEGER PRIMARY KEY,
+        user_id VARCHAR(36) NOT NULL UNIQUE
+    )
+    """,
+    "CREATE VIRTUAL TABLE users_fts USING fts5(full_name, email, tokenize='unicode61')",
+    """
+    CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts_keys(user_id) VALUES (new.id);
+        INSERT INTO users_fts(rowid, full_name, email) VALUES (last_insert_rowid(), new.full_name, new.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = {_FTS_KEY.format("old")};
+        DELETE FROM users_fts_keys WHERE user_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER users_fts_au AFTER UPDATE OF full_name, email ON users BEGIN
+        UPDATE users_fts SET full_name = new.full_name, email = new.email WHERE rowid = {_FTS_KEY.format("new")};
+    END
+    """,
+    "INSERT INTO users_fts_keys(user_id) SELECT id FROM users",
+    """
+    INSERT INTO users_fts(rowid, full_name, email)
+    SELECT users_fts_keys.id, users.full_name, users.email
+    FROM users_fts_keys JOIN users ON users.id = users_fts_keys.user_id
+    """,
+)
+
+# The external-content index of revision 0002
+ROWID_DDL = (
+    """
+    CREATE VIRTUAL TABLE users_fts USING fts5(
+        full_name, email, content='users', content_rowid='rowid', tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, full_name, email) VALUES (new.rowid, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, full_name, email)
+        VALUES ('delete', old.rowid, old.full_name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER users_fts_au AFTER UPDATE OF full_name, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, full_name, email)
+        VALUES ('delete', old.rowid, old.full_name, old.email);
+        INSERT INTO users_fts(rowid, full_name, email) VALUES (new.rowid, new.full_name, new.email);
+    END
+    """,
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+)
+
+
+def _has_search_index() -> bool:
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return False
+    found = bind.execute(sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"))
+    return found.first() is not None
+
+
+def _drop_index() -> None:
+    for trigger in ('users_fts_ai', 'users_fts_ad', 'users_fts_au'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS users_fts')
+    op.execute('DROP TABLE IF EXISTS users_fts_keys')
+
+
+def upgrade() -> None:
+    if _has_search_index():
+        _drop_index()
+        for statement in KEYED_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if _has_search_index():
+        _drop_index()
+        for statement in ROWID_DDL:
+            op.execute(statement)
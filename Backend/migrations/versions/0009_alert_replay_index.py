@@ -0,0 +1,26 @@
+"""alert replay index
+
+The alert stream replays by `(last_seen_at, id)` per user.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 16:05:41.208113
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_alerts_user_last_seen', 'alerts', ['user_id', 'last_seen_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_user_last_seen', table_name='alerts')
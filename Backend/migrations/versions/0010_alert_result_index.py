@@ -0,0 +1,26 @@
+"""alert result index
+
+The history export joins alerts to their analysis on `ai_result_id`.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 13:58:20.671094
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_alerts_ai_result_id', 'alerts', ['ai_result_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_ai_result_id', table_name='alerts')
@@ -0,0 +1,40 @@
+"""
+Tests run against a scratch database, never the one in DATABASE_URL: a fresh SQLite
+file, or the (empty) database in TEST_DATABASE_URL, e.g. a Postgres test instance.
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="mindpulse-tests-"), "test.db")
+)
+os.environ["DATABASE_READ_URL"] = ""
+os.environ["DB_AUTO_MIGRATE"] = "true"
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop.
+
+    Pooled connections are bound to the loop that opened them, so the engines are
+    disposed before each loop closes.
+    """
+    from app.database.session import engine, read_engine
+
+    def runner(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await engine.dispose()
+                if read_engine is not engine:
+                    await read_engine.dispose()
+
+        return asyncio.run(main())
+
+    return runner
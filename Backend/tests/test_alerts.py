@@ -0,0 +1,163 @@
+"""
+Alert coalescing (`raise_alerts`), history compaction (`compact-alerts`) and the
+`GET /alerts` order, which follows `last_seen_at` so a recurring alert resurfaces.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+import httpx
+from sqlalchemy import select, update
+
+from app.alerts.coalesce import raise_alerts
+from app.cli import main
+from app.database.session import async_session, init_db
+from app.main import app
+from app.models.models import Alert, AlertStatus, AlertType
+
+API = "/api/v1"
+WINDOW_HOURS = 24.0
+
+
+async def _signup(email: str) -> Tuple[httpx.AsyncClient, str]:
+    await init_db()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test")
+    response = await client.post(
+        f"{API}/auth/signup", json={"email": email, "password": "password123", "full_name": "Alert Tester"}
+    )
+    assert response.status_code == 200, response.text
+    return client, response.json()["data"]["user"]["id"]
+
+
+async def _raise(user_id: str) -> Alert:
+    async with async_session() as db:
+        alerts = await raise_alerts(db, user_id, None, [(AlertType.LOW_SLEEP, {"sleep_hours": 4.0})], WINDOW_HOURS)
+        await db.commit()
+        return alerts[0]
+
+
+async def _insert(user_id: str, hours: float, status: AlertStatus = AlertStatus.OPEN) -> str:
+    """An alert as written before coalescing: one row per occurrence, `hours` after a fixed start."""
+    seen = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=hours)
+    async with async_session() as db:
+        alert = Alert(
+            user_id=user_id, type=AlertType.LOW_SLEEP, status=status,
+            payload={"hours": hours}, created_at=seen, last_seen_at=seen,
+        )
+        db.add(alert)
+        await db.commit()
+        return alert.id
+
+
+async def _alerts(user_id: str) -> List[Tuple[str, AlertStatus, int]]:
+    async with async_session() as db:
+        result = await db.execute(
+            select(Alert.id, Alert.status, Alert.occurrence_count)
+            .where(Alert.user_id == user_id)
+            .order_by(Alert.created_at)
+        )
+        return [tuple(row) for row in result.all()]
+
+
+def test_repeat_inside_window_coalesces(run):
+    async def scenario():
+        client, user_id = await _signup("alerts-window@example.com")
+        await client.aclose()
+        first = await _raise(user_id)
+        second = await _raise(user_id)
+        return first.id, second.id, await _alerts(user_id)
+
+    first, second, alerts = run(scenario())
+    assert first == second
+    assert alerts == [(first, AlertStatus.OPEN, 2)]
+
+
+def test_repeat_outside_window_starts_new_alert(run):
+    async def scenario():
+        client, user_id = await _signup("alerts-stale@example.com")
+        await client.aclose()
+        stale = await _raise(user_id)
+        long_ago = datetime.now(timezone.utc) - timedelta(hours=WINDOW_HOURS + 1)
+        async with async_session() as db:
+            await db.execute(update(Alert).where(Alert.id == stale.id).values(created_at=long_ago, last_seen_at=long_ago))
+            await db.commit()
+        fresh = await _raise(user_id)
+        return stale.id, fresh.id, await _alerts(user_id)
+
+    stale, fresh, alerts = run(scenario())
+    assert fresh != stale
+    assert alerts == [(stale, AlertStatus.OPEN, 1), (fresh, AlertStatus.OPEN, 1)]
+
+
+def test_acknowledged_alert_is_not_coalesced_into(run):
+    async def scenario():
+        client, user_id = await _signup("alerts-ack@example.com")
+        first = await _raise(user_id)
+        response = await client.patch(f"{API}/alerts/{first.id}", json={"status": "acknowledged"})
+        assert response.status_code == 200, response.text
+        await client.aclose()
+        second = await _raise(user_id)
+        return first.id, second.id, await _alerts(user_id)
+
+    first, second, alerts = run(scenario())
+    assert alerts == [(first, AlertStatus.ACKNOWLEDGED, 1), (second, AlertStatus.OPEN, 1)]
+
+
+def test_compact_alerts_merges_runs_inside_window(run):
+    async def setup():
+        client, user_id = await _signup("alerts-compact@example.com")
+        await client.aclose()
+        ids = {
+            # Inside the window of each other: one run
+            "run": [await _insert(user_id, 0), await _insert(user_id, 10), await _insert(user_id, 30)],
+            # More than a window after the run ends
+            "gap": await _insert(user_id, 30 + WINDOW_HOURS + 1),
+            # Acknowledged, then the pattern came back: two runs despite the short gap
+            "acknowledged": await _insert(user_id, 200, AlertStatus.ACKNOWLEDGED),
+            "reopened": await _insert(user_id, 205),
+        }
+        return user_id, ids
+
+    user_id, ids = run(setup())
+    main(["compact-alerts", "--window-hours", str(WINDOW_HOURS), "--user-id", user_id])
+    alerts = run(_alerts(user_id))
+
+    assert alerts == [
+        (ids["run"][0], AlertStatus.OPEN, 3),
+        (ids["gap"], AlertStatus.OPEN, 1),
+        (ids["acknowledged"], AlertStatus.ACKNOWLEDGED, 1),
+        (ids["reopened"], AlertStatus.OPEN, 1),
+    ]
+
+    # Compacted history is stable
+    main(["compact-alerts", "--window-hours", str(WINDOW_HOURS), "--user-id", user_id])
+    assert run(_alerts(user_id)) == alerts
+
+
+def test_list_orders_by_last_seen(run):
+    async def scenario():
+        client, user_id = await _signup("alerts-order@example.com")
+        recurring = await _insert(user_id, 0)
+        recent = await _insert(user_id, 48)
+        async with async_session() as db:
+            await db.execute(
+                update(Alert).where(Alert.id == recurring).values(
+                    last_seen_at=datetime(2026, 1, 10, tzinfo=timezone.utc), occurrence_count=4
+                )
+            )
+            await db.commit()
+
+        pages = []
+        cursor = None
+        while True:
+            params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+            response = await client.get(f"{API}/alerts", params=params)
+            assert response.status_code == 200, response.text
+            pages.append([alert["id"] for alert in response.json()["data"]])
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        await client.aclose()
+        return recurring, recent, pages
+
+    recurring, recent, pages = run(scenario())
+    assert pages == [[recurring], [recent]]
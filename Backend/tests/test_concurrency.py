@@ -0,0 +1,86 @@
+"""
+Concurrent check-ins for one user, then several analysis workers taking one job each.
+
+Every per-user aggregate is a read-modify-write of a single row: the daily rollup
+(check-in and analysis counts), the streak and the baseline. Rows are created with
+INSERT ... ON CONFLICT DO NOTHING and updated under a row lock, so no update may be
+lost and no duplicate row may appear however the requests and workers interleave.
+SQLite serializes writers, so the races only surface with TEST_DATABASE_URL on Postgres.
+"""
+import asyncio
+from statistics import fmean
+
+import httpx
+from sqlalchemy import func, select
+
+from app.ai.queue import AnalysisWorkerPool
+from app.database.session import async_session, init_db
+from app.main import app
+from app.models.models import AIAnalysisResult, AnalysisJob, DailyRollup, UserBaseline, UserStreak
+
+API = "/api/v1"
+CHECKINS = 40
+WORKERS = 4
+
+
+async def _drain(pool: AnalysisWorkerPool, timeout: float = 60.0) -> None:
+    pool.start()
+    try:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            async with async_session() as db:
+                if not (await db.execute(select(func.count()).select_from(AnalysisJob))).scalar():
+                    return
+            await asyncio.sleep(0.05)
+        raise AssertionError("analysis jobs were not drained")
+    finally:
+        await pool.stop()
+
+
+def test_concurrent_checkins_keep_aggregates_consistent(run):
+    moods = [1 + i % 10 for i in range(CHECKINS)]
+
+    async def scenario():
+        await init_db()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test")
+        response = await client.post(
+            f"{API}/auth/signup",
+            json={"email": "race@example.com", "password": "password123", "full_name": "Race Tester"},
+        )
+        assert response.status_code == 200, response.text
+        user_id = response.json()["data"]["user"]["id"]
+
+        responses = await asyncio.gather(*[
+            client.post(f"{API}/checkins", json={"mood": mood, "sleep_hours": 4 + i % 5})
+            for i, mood in enumerate(moods)
+        ])
+        await client.aclose()
+        assert [r.status_code for r in responses if r.status_code != 200] == [], responses[0].text
+
+        pool = AnalysisWorkerPool(workers=WORKERS, batch_size=1, poll_interval=0.05)
+        await _drain(pool)
+        assert pool.dead == 0
+
+        async with async_session() as db:
+            rollups = (await db.execute(select(DailyRollup).where(DailyRollup.user_id == user_id))).scalars().all()
+            streaks = (await db.execute(select(UserStreak).where(UserStreak.user_id == user_id))).scalars().all()
+            baselines = (await db.execute(select(UserBaseline).where(UserBaseline.user_id == user_id))).scalars().all()
+            analyses = (await db.execute(
+                select(func.count()).select_from(AIAnalysisResult).where(AIAnalysisResult.user_id == user_id)
+            )).scalar()
+        return rollups, streaks, baselines, analyses
+
+    rollups, streaks, baselines, analyses = run(scenario())
+
+    assert analyses == CHECKINS
+    # ===== Rollups (one row per day, every check-in and analysis counted once) =====
+    assert sum(r.checkin_count for r in rollups) == CHECKINS
+    assert sum(r.mood_sum for r in rollups) == sum(moods)
+    assert sum(r.stress_low + r.stress_medium + r.stress_high + r.stress_critical for r in rollups) == CHECKINS
+    # ===== Streak (one row; a run straddling midnight spans two days) =====
+    assert len(streaks) == 1
+    assert streaks[0].current_streak == streaks[0].longest_streak == len(rollups)
+    # ===== Baseline (one row that folded in every check-in) =====
+    assert len(baselines) == 1
+    assert baselines[0].count == CHECKINS
+    assert abs(baselines[0].mood_mean - fmean(moods)) < 1e-9
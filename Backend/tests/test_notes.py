@@ -0,0 +1,121 @@
+"""
+The notes lexicon matcher (`app.ai.notes`): whole-word matching, negation scope,
+clause breaks and non-negatable categories. Note signals are a label only and
+never move the scores. The process pool `rescore` uses finds the same signals as
+the in-process scan.
+"""
+import asyncio
+import random
+
+import pytest
+
+from app.ai.batch import _notes_pool, _pool_signals
+from app.ai.notes import NotesAnalyzer, note_label
+from app.ai.rules import DEFAULT_RULES_PATH, load_rules
+from app.ai.service import score_checkin
+from app.models.models import AlertType
+
+LEXICON = {
+    "negation_scope": 3,
+    "negations": ["not", "no", "never"],
+    "categories": {
+        "stress": {"terms": ["stress", "stressed", "panic", "panic attack", "on edge"]},
+        "sleep": {"terms": ["tired", "couldn't sleep"]},
+        "positive": {"terms": ["happy", "good day"]},
+        "crisis": {"terms": ["suicidal", "hurt myself"], "negatable": False},
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return NotesAnalyzer(LEXICON)
+
+
+def _matched(analyzer: NotesAnalyzer, text: str):
+    return note_label(analyzer.signals(text))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Stressed and tired.", {"stress": 1, "sleep": 1}),
+    ("STRESS, Stress!", {"stress": 2}),
+    ("I couldn’t sleep", {"sleep": 1}),  # typographic apostrophe
+    # Whole words only: no match inside longer words
+    ("a stressor at work, unhappy and retired", {}),
+    ("had a good daytime nap", {}),
+    ("sitting on the edge", {}),
+    # Overlapping terms of one category count once
+    ("had a panic attack", {"stress": 1}),
+])
+def test_whole_word_matching(analyzer, text, expected):
+    assert _matched(analyzer, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("not stressed", {}),
+    ("never really that stressed", {}),
+    ("I didn't feel tired", {}),  # any n't word negates
+    ("not in the least bit stressed", {"stress": 1}),  # cue more than three words back
+    ("no panic attack", {}),  # the cue scopes over the start of a multi-word term
+    ("not happy at all today and tired", {"sleep": 1}),
+])
+def test_negation_scope(analyzer, text, expected):
+    assert _matched(analyzer, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("not tired, stressed", {"stress": 1}),
+    ("not tired. stressed", {"stress": 1}),
+    ("not tired but stressed", {"stress": 1}),
+    ("not tired although happy", {"positive": 1}),
+    ("not tired (happy)", {"positive": 1}),
+])
+def test_clause_breaks_end_negation(analyzer, text, expected):
+    assert _matched(analyzer, text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "I am not suicidal",
+    "I would never hurt myself",
+    "no, I'm not suicidal",
+])
+def test_non_negatable_category_counts_negated_matches(analyzer, text):
+    assert _matched(analyzer, text) == {"crisis": 1}
+
+
+@pytest.mark.parametrize("text", [
+    "I am not suicidal at all",
+    "I would never hurt myself",
+    "my friend talked about suicide prevention",
+])
+def test_note_signals_do_not_raise_risk(text):
+    rules = load_rules(DEFAULT_RULES_PATH)
+    signals = rules.notes.signals(text)
+    assert signals["crisis"] == 1
+    scores = score_checkin(7, 8.0, rules, signals)
+    assert scores == score_checkin(7, 8.0, rules)
+    assert AlertType.RISK_DETECTED not in [alert_type for alert_type, _ in rules.alerts(scores)]
+
+
+def test_invalid_terms_are_rejected():
+    with pytest.raises(ValueError):
+        NotesAnalyzer({"categories": {"stress": {"terms": ["stressed, anxious"]}}})
+    with pytest.raises(ValueError):
+        NotesAnalyzer({"categories": {"stress": {"terms": ["..."]}}})
+
+
+def test_pool_matches_in_process():
+    rules = load_rules(DEFAULT_RULES_PATH)
+    terms = [term for category in rules.notes.spec["categories"].values() for term in category["terms"]]
+    words = terms + rules.notes.spec["negations"] + "today work , . but fine and i".split()
+    rng = random.Random(7)
+    notes = [None, ""] + [" ".join(rng.choice(words) for _ in range(rng.randint(1, 60))) for _ in range(300)]
+
+    pool = _notes_pool(rules, 2)
+    assert pool is not None
+    try:
+        pooled = asyncio.run(_pool_signals(pool, 2, notes))
+    finally:
+        pool.shutdown()
+    assert pooled == rules.notes.signals_many(notes)
+    assert any(note_label(row) for row in pooled)
@@ -0,0 +1,149 @@
+"""
+Every query the API issues must be able to use an index.
+
+The test signs up a user, a coach and an admin. It calls each endpoint (all but the
+SSE stream) and runs the analysis worker and the snapshot job, recording every SELECT
+the engine executes. Each statement is then run under EXPLAIN with the parameters it
+was issued with. A table scan fails the test unless it is listed in EXPECTED_SCANS, and
+queries served by a dialect-specific index (REQUIRED_INDEXES) must use that index.
+Run it against Postgres by pointing TEST_DATABASE_URL at an empty database.
+"""
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy import update
+
+from app.admin.snapshots import snapshot_job
+from app.ai.queue import worker_pool
+from app.database.query_plans import QueryRecorder, explain
+from app.database.session import async_session, engine, init_db, read_engine
+from app.main import app
+from app.models.models import User, UserRole
+
+API = "/api/v1"
+
+# Statements allowed to scan, keyed by a fragment of their SQL, with the reason
+EXPECTED_SCANS: Dict[str, str] = {
+    "FROM sqlite_master": "schema lookup for the search index (a handful of rows)",
+}
+
+# Per dialect, statements containing a fragment must name the index in their plan
+REQUIRED_INDEXES: Dict[str, Dict[str, str]] = {
+    "sqlite": {"MATCH": "users_fts"},
+    "postgresql": {"similarity(": "ix_users_search_trgm"},
+}
+
+
+async def _signup(email: str, name: str) -> Tuple[httpx.AsyncClient, str]:
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test")
+    response = await client.post(
+        f"{API}/auth/signup", json={"email": email, "password": "password123", "full_name": name}
+    )
+    assert response.status_code == 200, response.text
+    return client, response.json()["data"]["user"]["id"]
+
+
+async def _set_role(user_id: str, role: UserRole) -> None:
+    async with async_session() as db:
+        await db.execute(update(User).where(User.id == user_id).values(role=role))
+        await db.commit()
+
+
+def _ok(response: httpx.Response) -> httpx.Response:
+    assert response.status_code < 400, f"{response.request.method} {response.request.url}: {response.text}"
+    return response
+
+
+async def _exercise() -> None:
+    user, user_id = await _signup("user@example.com", "Pat User")
+    coach, coach_id = await _signup("coach@example.com", "Sam Coach")
+    admin, admin_id = await _signup("admin@example.com", "Alex Admin")
+    other, other_id = await _signup("other@example.com", "Kim Other")
+    await _set_role(coach_id, UserRole.COACH)
+    await _set_role(admin_id, UserRole.ADMIN)
+
+    # ===== Auth =====
+    _ok(await user.post(f"{API}/auth/login", json={"email": "user@example.com", "password": "password123"}))
+    _ok(await user.post(f"{API}/auth/refresh"))
+    _ok(await user.get(f"{API}/auth/me"))
+
+    # ===== Check-ins and analysis =====
+    for mood, sleep, notes in ((2, 4.0, "couldn't sleep, so stressed"), (3, 5.0, ""), (8, 8.0, "great day")):
+        _ok(await user.post(f"{API}/checkins", json={"mood": mood, "sleep_hours": sleep, "notes": notes}))
+    while await worker_pool.run_once():
+        pass
+    _ok(await user.post(
+        f"{API}/checkins/import?format=csv",
+        content=b"mood,sleep_hours,notes,created_at\n5,7,fine,2026-01-02T08:00:00+00:00\n",
+    ))
+
+    page = _ok(await user.get(f"{API}/checkins", params={"limit": 2, "include_total": "true"}))
+    checkin_id = page.json()["data"][0]["id"]
+    _ok(await user.get(f"{API}/checkins", params={"limit": 2, "cursor": page.headers["x-next-cursor"]}))
+    _ok(await user.get(f"{API}/checkins", headers={"if-none-match": page.headers["etag"]}))
+    _ok(await user.get(f"{API}/checkins/{checkin_id}"))
+    _ok(await user.get(f"{API}/checkins/export", params={"format": "csv"}))
+
+    # ===== Dashboard, insights, alerts =====
+    _ok(await user.get(f"{API}/dashboard", params={"range": "7d"}))
+    insights = _ok(await user.get(f"{API}/insights/recent", params={"limit": 1}))
+    _ok(await user.get(f"{API}/insights/recent", params={"limit": 1, "cursor": insights.headers["x-next-cursor"]}))
+    _ok(await user.get(f"{API}/insights/{insights.json()['data'][0]['id']}"))
+    alerts = _ok(await user.get(f"{API}/alerts", params={"include_total": "true"}))
+    _ok(await user.patch(f"{API}/alerts/{alerts.json()['data'][0]['id']}", json={"status": "acknowledged"}))
+
+    # ===== Profile and settings =====
+    _ok(await user.get(f"{API}/users/profile"))
+    _ok(await user.put(f"{API}/users/profile", json={"full_name": "Pat Q User"}))
+    _ok(await user.get(f"{API}/users/settings"))
+    _ok(await user.put(f"{API}/users/settings", json={"timezone": "Asia/Kolkata"}))
+
+    # ===== Coach =====
+    _ok(await admin.post(f"{API}/admin/coaches/{coach_id}/clients", json={"client_id": user_id}))
+    _ok(await admin.get(f"{API}/admin/coaches/{coach_id}/clients"))
+    _ok(await coach.get(f"{API}/coach/cohort", params={"range": "7d"}))
+    _ok(await coach.get(f"{API}/coach/clients", params={"range": "7d"}))
+    _ok(await admin.get(f"{API}/coach/cohort", params={"range": "7d", "coach_id": coach_id}))
+    _ok(await admin.get(f"{API}/coach/clients", params={"range": "7d", "coach_id": coach_id}))
+    _ok(await admin.delete(f"{API}/admin/coaches/{coach_id}/clients/{user_id}"))
+
+    # ===== Admin =====
+    users = _ok(await admin.get(f"{API}/admin/users", params={"per_page": 2, "include_total": "true"}))
+    _ok(await admin.get(f"{API}/admin/users", params={"per_page": 2, "cursor": users.json()["data"]["next_cursor"]}))
+    _ok(await admin.get(f"{API}/admin/users", params={"search": "pat", "include_total": "true"}))
+    _ok(await admin.patch(f"{API}/admin/users/{other_id}/role", json={"role": "coach"}))
+    _ok(await admin.delete(f"{API}/admin/users/{other_id}"))
+    _ok(await admin.post(f"{API}/admin/analytics/refresh"))
+    await snapshot_job.run_once()
+    _ok(await admin.get(f"{API}/admin/analytics", params={"range": "7d"}))
+    _ok(await admin.get(f"{API}/admin/cache/stats"))
+    _ok(await admin.get(f"{API}/admin/queue/stats"))
+
+    for client in (user, coach, admin, other):
+        await client.aclose()
+
+
+def test_request_path_queries_use_indexes(run):
+    async def plans() -> Tuple[int, List[str]]:
+        await init_db()
+        with QueryRecorder(engine, read_engine) as recorder:
+            await _exercise()
+        required = REQUIRED_INDEXES.get(engine.dialect.name, {})
+        unseen = set(required)
+        failures = []
+        for statement, parameters in recorder.statements.items():
+            plan, scans = await explain(engine, statement, parameters)
+            problems = [] if any(fragment in statement for fragment in EXPECTED_SCANS) else scans
+            for fragment, index in required.items():
+                if fragment in statement:
+                    unseen.discard(fragment)
+                    if not any(index in line for line in plan):
+                        problems.append(f"does not use {index}")
+            if problems:
+                failures.append(f"{'; '.join(problems)}\n    {' '.join(statement.split())}\n    plan: {' | '.join(plan)}")
+        failures += [f"no statement containing {fragment!r} was recorded" for fragment in sorted(unseen)]
+        return len(recorder.statements), failures
+
+    count, failures = run(plans())
+    assert count > 40, f"only {count} distinct queries recorded"
+    assert not failures, f"{len(failures)} of {count} queries do not use their index:\n" + "\n".join(failures)
@@ -0,0 +1,155 @@
+"""
+The compiled wellness rules (`app.ai.rules`): one check-in and NumPy columns score
+alike, the bundled file reproduces the scoring that used to be hard-coded in
+`app.ai.service`, and a broken file is rejected without replacing the active rules.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from app.ai.batch import score_batch
+from app.ai.rules import DEFAULT_RULES_PATH, RuleError, RuleStore, load_rules, parse_rules
+from app.ai.service import score_checkin
+from app.models.models import AlertType
+
+MOODS = list(range(1, 11))
+SLEEPS = [tenths / 10 for tenths in range(0, 141)]
+GRID = [(mood, sleep) for mood in MOODS for sleep in SLEEPS]
+
+
+def _hard_coded(mood: int, sleep: float) -> Tuple[Dict[str, Any], List[Tuple[AlertType, Dict[str, Any]]]]:
+    """Scores and alerts as `app.ai.service` computed them before the rules file existed."""
+    stress_level = max(1, 11 - mood)
+
+    risk_score = 0
+    if mood <= 3:
+        risk_score += 4
+    elif mood <= 5:
+        risk_score += 2
+    if sleep < 5:
+        risk_score += 3
+    elif sleep < 6:
+        risk_score += 1
+    if mood <= 3 and sleep < 5:
+        risk_score += 2
+    risk_score = min(10, risk_score)
+
+    sleep_score = min(10, sleep / 8 * 10)
+    overall_wellness = round(mood * 0.6 + sleep_score * 0.4, 1)
+    confidence = 0.85 if (mood <= 3 or mood >= 8 or sleep < 5 or sleep > 9) else 0.75
+
+    if mood >= 8:
+        mood_summary = "Your mood is excellent today!"
+    elif mood >= 6:
+        mood_summary = "Your mood is fairly good."
+    elif mood >= 4:
+        mood_summary = "Your mood is moderate today. Consider activities that uplift you."
+    else:
+        mood_summary = "Your mood is quite low. Please take care and consider reaching out to someone."
+    if sleep >= 7:
+        sleep_summary = f"Great sleep at {sleep}h."
+    elif sleep >= 5:
+        sleep_summary = f"Sleep at {sleep}h is below recommended. Try to improve your sleep routine."
+    else:
+        sleep_summary = f"Only {sleep}h of sleep is concerning. Prioritize rest tonight."
+
+    alerts = []
+    if sleep < 5:
+        alerts.append((AlertType.LOW_SLEEP, {"sleep_hours": sleep, "message": f"Sleep was only {sleep}h"}))
+    if stress_level >= 7:
+        alerts.append((AlertType.HIGH_STRESS, {"stress_level": stress_level, "mood": mood, "message": "High stress detected"}))
+    if risk_score >= 6:
+        alerts.append((AlertType.RISK_DETECTED, {"risk_score": risk_score, "message": "Elevated risk indicators detected"}))
+    if mood >= 8 and sleep >= 7:
+        alerts.append((AlertType.POSITIVE_TREND, {"message": "Excellent mood and sleep!"}))
+
+    scores = {
+        "stress_level": stress_level,
+        "risk_score": risk_score,
+        "overall_wellness": overall_wellness,
+        "confidence": confidence,
+        "summary": f"{mood_summary} {sleep_summary}",
+    }
+    return scores, alerts
+
+
+def _bundled_spec() -> Dict[str, Any]:
+    with open(DEFAULT_RULES_PATH) as f:
+        return json.load(f)
+
+
+def test_evaluate_matches_evaluate_batch():
+    rules = load_rules(DEFAULT_RULES_PATH)
+    mood, sleep = (np.array(column) for column in zip(*GRID))
+    columns = score_batch(mood, sleep, rules)
+
+    mismatches = []
+    for row, (m, s) in enumerate(GRID):
+        single = score_checkin(m, s, rules)
+        for name, column in columns.items():
+            value = column[row].item() if isinstance(column, np.ndarray) else column[row]
+            if single[name] != value:
+                mismatches.append(f"mood={m} sleep={s} {name}: {single[name]!r} != {value!r}")
+    assert not mismatches, "\n".join(mismatches[:20])
+
+
+def test_bundled_rules_match_hard_coded_scoring():
+    rules = load_rules(DEFAULT_RULES_PATH)
+    mismatches = []
+    for mood, sleep in GRID:
+        expected, expected_alerts = _hard_coded(mood, sleep)
+        scores = score_checkin(mood, sleep, rules)
+        for name, value in expected.items():
+            if scores[name] != value:
+                mismatches.append(f"mood={mood} sleep={sleep} {name}: {scores[name]!r} != {value!r}")
+        if rules.alerts(scores) != expected_alerts:
+            mismatches.append(f"mood={mood} sleep={sleep} alerts: {rules.alerts(scores)!r} != {expected_alerts!r}")
+    assert not mismatches, "\n".join(mismatches[:20])
+
+
+@pytest.mark.parametrize("where", ["template", "table", "alert text", "alert value"])
+def test_unknown_placeholder_is_rejected(where):
+    spec = _bundled_spec()
+    outputs = {output["name"]: output for output in spec["outputs"]}
+    if where == "template":
+        outputs["summary"]["template"] = "{mood_summary} {sleep_sumary}"
+    elif where == "table":
+        outputs["sleep_summary"]["default"] = "Only {sleep_hours}h of sleep is concerning."
+    elif where == "alert text":
+        spec["alerts"][0]["payload"]["message"] = "Sleep was only {hours}h"
+    else:
+        spec["alerts"][0]["payload"]["sleep_hours"] = "$hours"
+    with pytest.raises(RuleError):
+        parse_rules(json.dumps(spec).encode())
+
+
+def _write(path: str, spec: Dict[str, Any], mtime_ns: int) -> None:
+    with open(path, "w") as f:
+        json.dump(spec, f)
+    # Explicit mtimes: the store only re-reads a file whose mtime changed
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_hot_reload_keeps_rules_when_file_is_invalid(tmp_path):
+    path = str(tmp_path / "rules.json")
+    spec = _bundled_spec()
+    _write(path, spec, 1_000_000_000)
+    store = RuleStore(path, reload_seconds=0.001)
+    original = store.get()
+
+    spec["version"] = "rule-v9"
+    _write(path, spec, 2_000_000_000)
+    time.sleep(0.01)
+    reloaded = store.get()
+    assert reloaded is not original
+    assert reloaded.version == "rule-v9"
+
+    spec["outputs"][-1]["template"] = "{mood_summary} {unknown}"
+    _write(path, spec, 3_000_000_000)
+    time.sleep(0.01)
+    assert store.get() is reloaded
+    assert score_checkin(5, 7.0, store.get())["summary"].startswith("Your mood is moderate")
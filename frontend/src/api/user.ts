@@ -13,9 +13,9 @@ export const userApi = {
         api.put<UserSettings>('/users/settings', data),
 
     // Admin endpoints
-    listUsers: (page = 1, perPage = 20, search = '') =>
+    listUsers: (cursor = '', perPage = 20, search = '') =>
         api.get<PaginatedResponse<User>>(
-            `/admin/users?page=${page}&per_page=${perPage}&search=${search}`
+            `/admin/users?cursor=${encodeURIComponent(cursor)}&per_page=${perPage}&search=${encodeURIComponent(search)}`
         ),
 
     updateUserRole: (userId: string, role: string) =>
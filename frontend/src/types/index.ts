@@ -124,8 +124,8 @@ export interface ApiError {
 
 export interface PaginatedResponse<T> {
     items: T[];
-    total: number;
-    page: number;
+    total: number | null;
     per_page: number;
     has_next: boolean;
+    next_cursor: string | null;
 }